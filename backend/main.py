@@ -1,15 +1,15 @@
 # server/main.py
+from aigen.common.hooks import NODE_STARTED, NodeEvent
+from aigen.common.jobs import JobQueue, compile_batch_plan
 from aigen.common.pipeline import process_actions
-from aigen.core.file_handler import FileHandler
-from fastapi import FastAPI
+from aigen.common.telemetry import RunReport
+from aigen.config import AigenConfig
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Any, Dict, List
-import yaml, tempfile, os, io, traceback, contextlib
-from fastapi.responses import JSONResponse
-
-# TODO: import your real executor here
-# from aigen.core.executor import execute_yaml_path  # or execute_from_steps
+import yaml, json, queue, threading, traceback
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
 app = FastAPI()
 app.add_middleware(
@@ -22,6 +22,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Node timings and token usage of every run served by this process.
+METRICS = RunReport(max_samples=1000)
+
 class RunReq(BaseModel):
     yaml_text: str
 
@@ -29,87 +32,150 @@ class RunReq(BaseModel):
 def health():
     return {"ok": True}
 
-@app.post("/run")
-def run_graph(req: RunReq):
-    steps: List[Dict[str, Any]] = yaml.safe_load(req.yaml_text) or []
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of per-node timings and token usage."""
+    return PlainTextResponse(
+        METRICS.to_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+def _recording(hook):
+    def record(event: NodeEvent) -> None:
+        METRICS.record(event)
+        hook(event)
+    return record
+
+def _event_line(event: NodeEvent) -> str:
+    if event.type == NODE_STARTED:
+        return f"[{event.index}] {event.node_name} started"
+    status = "finished" if event.ok else f"failed: {event.error}"
+    return f"[{event.index}] {event.node_name} {status} in {event.duration_seconds:.3f}s"
+
+def _logs(events: List[NodeEvent]) -> str:
+    """Event lines with the output each step printed (e.g. PrintVariable)."""
+    lines: List[str] = []
+    for event in events:
+        if event.output:
+            lines.append(event.output)
+        lines.append(_event_line(event))
+    return "\n".join(lines)
 
-    # If your executor needs a file path:
-    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
-        yaml.safe_dump(steps, f)
-        tmp = f.name
+def _errors(events: List[NodeEvent]) -> str:
+    return "\n".join(_event_line(event) for event in events if event.ok is False)
 
-    stdout_buf, stderr_buf = io.StringIO(), io.StringIO()
+@app.post("/run")
+def run_graph(req: RunReq):
+    # Node events come from a hook owned by this run, so concurrent requests
+    # never see each other's output (unlike redirecting the global stdout).
+    events: List[NodeEvent] = []
     try:
-        with contextlib.redirect_stdout(stdout_buf), contextlib.redirect_stderr(stderr_buf):
-            # ---- Call your real executor here ----
-            # outputs = execute_yaml_path(tmp)
-            instructions = FileHandler.read_yaml(tmp)
-            context: Dict = {}
-            process_actions(context, instructions)
-            outputs = {"count": len(steps)}  # stub so UI works now
+        steps: List[Dict[str, Any]] = yaml.safe_load(req.yaml_text) or []
+        context: Dict[str, Any] = {}
+        process_actions(context, steps, hook=_recording(events.append))
+        outputs = {"count": len(steps)}  # stub so UI works now
 
         return {
             "ok": True,
             "outputs": outputs,
-            "logs": stdout_buf.getvalue(),
-            "errors": stderr_buf.getvalue(),
+            "events": [event.to_dict() for event in events],
+            "logs": _logs(events),
+            "errors": _errors(events),
         }
     except Exception as e:
         tb = traceback.format_exc()
         err_payload = {
             "message": str(e),
             "traceback": tb,
-            "logs": stdout_buf.getvalue(),
-            "stderr": stderr_buf.getvalue(),
+            "events": [event.to_dict() for event in events],
+            "logs": _logs(events),
+            "stderr": _errors(events),
         }
         # Return 200 so UI doesn't have to branch on HTTP error vs success
         return JSONResponse(status_code=200, content={"ok": False, "error": err_payload})
-    finally:
+
+def _sse(event_type: str, payload: Dict[str, Any]) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+@app.post("/run/stream")
+def run_graph_stream(req: RunReq):
+    """Server-sent events: node_started/node_finished per step, then run_finished."""
+    events: "queue.Queue[NodeEvent | Dict[str, Any]]" = queue.Queue()
+
+    def run() -> None:
         try:
-            os.remove(tmp)
-        except OSError:
-            pass
+            steps: List[Dict[str, Any]] = yaml.safe_load(req.yaml_text) or []
+            process_actions({}, steps, hook=_recording(events.put))
+            events.put({"type": "run_finished", "ok": True, "count": len(steps)})
+        except Exception as e:
+            events.put({
+                "type": "run_finished",
+                "ok": False,
+                "error": str(e),
+                "traceback": traceback.format_exc(),
+            })
+
+    threading.Thread(target=run, name="aigen-run-stream", daemon=True).start()
+
+    def stream():
+        while True:
+            item = events.get()
+            payload = item.to_dict() if isinstance(item, NodeEvent) else item
+            yield _sse(payload["type"], payload)
+            if payload["type"] == "run_finished":
+                return
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 class BatchReq(BaseModel):
     yaml_text: str
     var_name: str
     values: List[str]
 
+# One bounded pool for all batch jobs, so concurrent /batch calls queue up
+# instead of each starting its own threads.
+JOB_QUEUE = JobQueue(max_workers=AigenConfig().job_workers, hook=METRICS.record)
+
+
 @app.post("/batch")
 def run_batch(req: BatchReq):
-    results = []
-    logs_all, errs_all = [], []
+    """Queue one item per value, with `var_name` bound in the item's context.
 
-    for i, val in enumerate(req.values):
-        # Just literal replace — works for ${var} or {{var}} if you pass correct var_name
-        yaml_text_i = req.yaml_text.replace(f"${{{req.var_name}}}", val)\
-                                    .replace(f"{{{{{req.var_name}}}}}", val)
+    The pipeline is compiled once, so `${var_name}` (or `{{var_name}}`) is
+    rendered into node params as text. Unlike the old per-value text
+    substitution, it is not replaced in node names or param keys.
+    """
+    try:
+        plan = compile_batch_plan(req.yaml_text, req.var_name)
+    except Exception as e:
+        err_payload = {"message": str(e), "traceback": traceback.format_exc()}
+        return JSONResponse(status_code=200, content={"ok": False, "error": err_payload})
 
-        steps = yaml.safe_load(yaml_text_i) or []
-        with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
-            yaml.safe_dump(steps, f)
-            tmp = f.name
+    job = JOB_QUEUE.submit(plan, [{req.var_name: val} for val in req.values])
+    return {"ok": True, "job_id": job.id, "total": job.total}
 
-        stdout_buf, stderr_buf = io.StringIO(), io.StringIO()
-        try:
-            with contextlib.redirect_stdout(stdout_buf), contextlib.redirect_stderr(stderr_buf):
-                instructions = FileHandler.read_yaml(tmp)
-                context: Dict[str, Any] = {}
-                process_actions(context, instructions)
-            results.append({"index": i, "ok": True, "outputs": context})
-        except Exception as e:
-            results.append({"index": i, "ok": False, "error": str(e), "traceback": traceback.format_exc()})
-        finally:
-            logs_all.append(stdout_buf.getvalue())
-            errs_all.append(stderr_buf.getvalue())
-            try:
-                os.remove(tmp)
-            except OSError:
-                pass
-
-    return {
-        "ok": True,
-        "results": results,
-        "logs": "\n".join(logs_all),
-        "errors": "\n".join(errs_all),
-    }
+def _get_job(job_id: str):
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+@app.get("/batch/{job_id}")
+def batch_progress(job_id: str):
+    return {"ok": True, **_get_job(job_id).progress()}
+
+@app.get("/batch/{job_id}/results")
+def batch_results(job_id: str, offset: int = 0):
+    # Items are listed in completion order; pass offset=<results seen> to poll
+    # only for items that finished since the last call.
+    job = _get_job(job_id)
+    return {"ok": True, **job.progress(), "offset": offset, "results": job.results(offset)}
+
+@app.delete("/batch/{job_id}")
+def cancel_batch(job_id: str):
+    job = _get_job(job_id)
+    job.cancel()
+    return {"ok": True, **job.progress()}
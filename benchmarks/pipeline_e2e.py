@@ -0,0 +1,392 @@
+"""End-to-end benchmark: the example article pipeline against a fake LLM.
+
+Builds a synthetic CSV of N rows from `examples/article_generator` and runs it
+through `process_actions` ("pipeline" mode) and the `aigen-article-generator`
+entry point ("cli" mode). GPT steps go to `FakeLLMClient`, which sleeps for a
+latency drawn from `--latency` and returns canned replies, so no network or
+API key is involved. Each case runs in a fresh interpreter so peak RSS is its
+own; results are written as JSON and can be compared against a baseline.
+
+Run with `PYTHONPATH=src python benchmarks/pipeline_e2e.py`, e.g.:
+
+    PYTHONPATH=src python benchmarks/pipeline_e2e.py --rows 10 100 1000 \\
+        --latency lognormal:0.05,0.5 --workers 32 --output baseline.json
+    PYTHONPATH=src python benchmarks/pipeline_e2e.py --compare baseline.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from aigen.client.stub_server import LatencyModel
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+EXAMPLE_DIR = REPO_ROOT / "examples" / "article_generator"
+MODES = ("pipeline", "cli")
+
+META_JSON = json.dumps(
+    {
+        "article_title": "Pixel Art Landscapes",
+        "description_for_html": "How pixel artists build depth with a few colors.",
+    }
+)
+BODY_HTML = "".join(
+    f'<p class="article_text">Paragraph {i} about layered pixel landscapes.</p>'
+    for i in range(12)
+)
+CRITIQUE = "- Strong silhouettes\n- Limited palette\n- Clear depth\n- Calm mood"
+
+
+def fake_llm_factory(latency: LatencyModel):
+    """LLM client factory for `set_llm_client_factory`."""
+    from aigen.common.llm_client import GenerationStats, LLMClient
+    from aigen.common.tokens import estimate_message_tokens, estimate_text_tokens
+
+    class FakeLLMClient(LLMClient):
+        """Answers like the example pipeline expects, after a sampled delay."""
+
+        def generate(self, content, **kwargs):
+            messages = content if isinstance(content, list) else [content]
+            prompt = json.dumps(messages[-1], default=str)
+            if "Return ONLY valid JSON" in prompt:
+                text = META_JSON
+            elif "HTML only" in prompt:
+                text = BODY_HTML
+            elif "meta description" in prompt:
+                text = "Layered pixel landscapes with calm, limited palettes."
+            else:
+                text = CRITIQUE
+            delay = latency.sample()
+            time.sleep(delay)
+            self.last_stats = GenerationStats(
+                latency_seconds=delay,
+                prompt_tokens=estimate_message_tokens(messages),
+                completion_tokens=estimate_text_tokens(text),
+            )
+            return text
+
+    return lambda model=None, max_tokens=None, **kwargs: FakeLLMClient(
+        model=model, max_tokens=max_tokens
+    )
+
+
+def build_dataset(root: Path, rows: int) -> Path:
+    """Write `rows` article folders sharing the example images and template."""
+    shared = root / "shared"
+    shutil.copytree(EXAMPLE_DIR / "article_example" / "images", shared / "images")
+    template = shutil.copy(EXAMPLE_DIR / "example_html_template.html", shared)
+    instructions = shutil.copy(EXAMPLE_DIR / "example_instructions.yaml", shared)
+
+    csv_path = root / "articles.csv"
+    with open(csv_path, "w", encoding="utf-8") as f:
+        f.write("Article,Images,HTML Template,Instructions,Section,Author Name\n")
+        for index in range(rows):
+            article_dir = root / "articles" / f"article-{index:05d}"
+            article_dir.mkdir(parents=True)
+            (article_dir / "startup_prompt.txt").write_text(
+                f"Focus on artwork {index}.", encoding="utf-8"
+            )
+            f.write(
+                f"{article_dir},{shared / 'images'},{template},{instructions},"
+                f"visual,Author {index % 7}\n"
+            )
+    return csv_path
+
+
+def _node_overhead(report: dict[str, Any]) -> dict[str, Any]:
+    """Per node type: wall time not spent waiting for the LLM."""
+    nodes = {}
+    for name, stats in report["nodes"].items():
+        runs = stats["runs"] or 1
+        overhead = stats["wall_seconds"]["total"] - stats["llm_seconds"]["total"]
+        nodes[name] = {
+            "runs": stats["runs"],
+            "mean_overhead_ms": round(overhead / runs * 1000.0, 3),
+            "p95_wall_ms": round((stats["wall_seconds"]["p95"] or 0.0) * 1000.0, 3),
+        }
+    return nodes
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux and in bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(args: argparse.Namespace) -> dict[str, Any]:
+    """Run one mode and size in this process (called in a child interpreter)."""
+    import structlog
+
+    # Log lines would dominate the timings; warnings and errors still show.
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+    from aigen.article.csv_context import read_article_contexts_from_csv
+    from aigen.cli import article_generator
+    from aigen.common.file_handler import FileHandler
+    from aigen.common.llm_client import set_llm_client_factory
+    from aigen.common.pipeline import process_actions
+    from aigen.common.plan import ExecutionPlan
+    from aigen.common.telemetry import RunReport
+
+    root = Path(args.workdir)
+    csv_path = build_dataset(root, args.case_rows)
+    set_llm_client_factory(fake_llm_factory(LatencyModel(args.latency, args.seed)))
+
+    started = time.perf_counter()
+    if args.case == "pipeline":
+        report = RunReport()
+        plan = ExecutionPlan.compile(
+            FileHandler.read_yaml(str(EXAMPLE_DIR / "example_instructions.yaml"))
+        )
+
+        def run(indexed: tuple[int, dict[str, Any]]) -> None:
+            index, context = indexed
+            generation_dir = Path(context["article_path"]) / "aigen" / "v001"
+            generation_dir.mkdir(parents=True)
+            context["generation_dir"] = str(generation_dir)
+            process_actions(
+                context,
+                plan,
+                max_workers=args.step_workers,
+                hook=report.hook(index),
+            )
+
+        contexts = read_article_contexts_from_csv(str(csv_path))
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            list(executor.map(run, enumerate(contexts)))
+        summary = report.summary()
+    else:
+        report_path = root / "report.json"
+        article_generator.main(
+            [
+                str(csv_path),
+                "--workers",
+                str(args.workers),
+                "--step-workers",
+                str(args.step_workers),
+                "--report",
+                str(report_path),
+            ]
+        )
+        summary = json.loads(report_path.read_text(encoding="utf-8"))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": args.case,
+        "rows": args.case_rows,
+        "wall_seconds": round(elapsed, 3),
+        "articles_per_second": round(args.case_rows / elapsed, 2),
+        "peak_rss_mb": _peak_rss_mb(),
+        "nodes": _node_overhead(summary),
+    }
+
+
+def _child_env() -> dict[str, str]:
+    env = dict(os.environ)
+    src = str(REPO_ROOT / "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (src, env.get("PYTHONPATH"))))
+    # Every call must reach the fake client, and nothing may touch real caches.
+    env["AIGEN_RESPONSE_CACHE"] = "off"
+    env.pop("CONFIGS_ROOT_DIR", None)
+    return env
+
+
+def spawn_case(args: argparse.Namespace, mode: str, rows: int) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="aigen-bench-") as workdir:
+        output = Path(workdir) / "result.json"
+        env = _child_env()
+        env["AIGEN_CACHE_DIR"] = str(Path(workdir) / "cache")
+        command = [
+            sys.executable,
+            __file__,
+            "--case",
+            mode,
+            "--case-rows",
+            str(rows),
+            "--case-output",
+            str(output),
+            "--workdir",
+            workdir,
+            "--latency",
+            args.latency,
+            "--seed",
+            str(args.seed),
+            "--workers",
+            str(args.workers),
+            "--step-workers",
+            str(args.step_workers),
+        ]
+        completed = subprocess.run(
+            command,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(
+                f"{mode} case with {rows} rows failed:\n{completed.stderr.decode()}"
+            )
+        return json.loads(output.read_text(encoding="utf-8"))
+
+
+def measure_startup(runs: int) -> dict[str, float]:
+    """Median seconds to import the CLI module and to print its help."""
+    commands = {
+        "import_seconds": [
+            sys.executable,
+            "-c",
+            "import aigen.cli.article_generator",
+        ],
+        "cli_help_seconds": [
+            sys.executable,
+            "-m",
+            "aigen.cli.article_generator",
+            "--help",
+        ],
+    }
+    results = {}
+    for name, command in commands.items():
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(
+                command, env=_child_env(), stdout=subprocess.DEVNULL, check=True
+            )
+            timings.append(time.perf_counter() - started)
+        results[name] = round(statistics.median(timings), 4)
+    return results
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float):
+    """Print changes against `baseline`; return the regressions found."""
+    regressions = []
+    rows = [
+        ("startup", name, baseline["startup"].get(name), value, False)
+        for name, value in current["startup"].items()
+    ]
+    previous = {(case["mode"], case["rows"]): case for case in baseline["cases"]}
+    for case in current["cases"]:
+        old = previous.get((case["mode"], case["rows"]))
+        if old is None:
+            continue
+        label = f"{case['mode']}/{case['rows']}"
+        rows.append(
+            (
+                label,
+                "articles_per_second",
+                old["articles_per_second"],
+                case["articles_per_second"],
+                True,
+            )
+        )
+        rows.append(
+            (label, "peak_rss_mb", old["peak_rss_mb"], case["peak_rss_mb"], False)
+        )
+
+    print(f"{'case':<16}{'metric':<22}{'baseline':>12}{'current':>12}{'change':>9}")
+    for label, metric, old, new, higher_is_better in rows:
+        if not old:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        flag = " !" if worse > tolerance else ""
+        if flag:
+            regressions.append(f"{label} {metric}")
+        print(f"{label:<16}{metric:<22}{old:>12}{new:>12}{change:>+8.0%}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--latency", default="fixed:0")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--step-workers", type=int, default=1)
+    parser.add_argument("--startup-runs", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON (a new baseline).")
+    parser.add_argument("--compare", help="Baseline JSON to compare against.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Relative slowdown that counts as a regression (default: 0.2).",
+    )
+    # Internal: run a single case in this process.
+    parser.add_argument("--case", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--case-rows", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--case-output", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        result = run_case(args)
+        Path(args.case_output).write_text(json.dumps(result), encoding="utf-8")
+        return
+
+    LatencyModel(args.latency)  # Fail early on a bad spec.
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "latency": args.latency,
+            "seed": args.seed,
+            "workers": args.workers,
+            "step_workers": args.step_workers,
+        },
+        "startup": measure_startup(args.startup_runs),
+        "cases": [],
+    }
+    print(
+        f"startup: import {results['startup']['import_seconds']:.3f}s, "
+        f"--help {results['startup']['cli_help_seconds']:.3f}s"
+    )
+    print(f"{'mode':<10}{'rows':>7}{'seconds':>10}{'articles/s':>12}{'peak MB':>10}")
+    for rows in args.rows:
+        for mode in args.modes:
+            case = spawn_case(args, mode, rows)
+            results["cases"].append(case)
+            print(
+                f"{mode:<10}{rows:>7}{case['wall_seconds']:>10.2f}"
+                f"{case['articles_per_second']:>12.1f}{case['peak_rss_mb']:>10.1f}"
+            )
+
+    largest = max(results["cases"], key=lambda case: case["rows"])
+    print(f"\nper-node overhead ({largest['mode']}, {largest['rows']} rows):")
+    for name, stats in sorted(largest["nodes"].items()):
+        print(
+            f"  {name:<22}{stats['mean_overhead_ms']:>10.3f} ms mean"
+            f"{stats['p95_wall_ms']:>10.3f} ms p95"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if baseline.get("settings") != results["settings"]:
+            print("warning: baseline was recorded with different settings")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            raise SystemExit(f"Regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
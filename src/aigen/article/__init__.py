@@ -1,3 +1,6 @@
-from aigen.article.csv_context import read_article_contexts_from_csv
+from aigen.article.csv_context import (
+    iter_article_contexts_from_csv,
+    read_article_contexts_from_csv,
+)
 
-__all__ = ["read_article_contexts_from_csv"]
+__all__ = ["iter_article_contexts_from_csv", "read_article_contexts_from_csv"]
@@ -1,7 +1,44 @@
 import csv
+from collections.abc import Iterator
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+_PATH_CACHE_SIZE = 4096
+
+
+class _PathCache:
+    """Memoizes path syscalls for one CSV read.
+
+    Rows usually share template, instruction and image folders, so resolving
+    them once per distinct path avoids repeating the same filesystem calls.
+    """
+
+    def __init__(self) -> None:
+        self.resolve = lru_cache(maxsize=_PATH_CACHE_SIZE)(self._resolve)
+        self.exists = lru_cache(maxsize=_PATH_CACHE_SIZE)(self._exists)
+        self.read_startup_prompt = lru_cache(maxsize=_PATH_CACHE_SIZE)(
+            self._read_startup_prompt
+        )
+
+    @staticmethod
+    def _resolve(path: Path) -> Path:
+        return path.resolve()
+
+    @staticmethod
+    def _exists(path: Path) -> bool:
+        return path.exists()
+
+    @staticmethod
+    def _read_startup_prompt(
+        article_dir: Path, filenames: tuple[str, ...]
+    ) -> str | None:
+        for filename in filenames:
+            startup_prompt = article_dir / filename
+            if startup_prompt.exists():
+                return startup_prompt.read_text(encoding="utf-8").strip()
+        return None
+
 
 def read_article_contexts_from_csv(
     csv_path: str, *, config_root_dir: str | None = None
@@ -11,12 +48,33 @@ def read_article_contexts_from_csv(
     Expected CSV: either a named path column (`article_path`, `path`, `article`)
     or a single unnamed first column containing article folder paths.
     """
+    return list(
+        iter_article_contexts_from_csv(csv_path, config_root_dir=config_root_dir)
+    )
+
+
+def iter_article_contexts_from_csv(
+    csv_path: str, *, config_root_dir: str | None = None
+) -> Iterator[dict[str, Any]]:
+    """Lazily yield per-article contexts, one CSV row at a time.
+
+    Same format as `read_article_contexts_from_csv`; a missing CSV is reported
+    immediately rather than on first iteration.
+    """
     csv_file = Path(csv_path)
     if not csv_file.exists():
         raise FileNotFoundError(f"CSV file not found: {csv_path}")
+    return _iter_contexts(csv_file, config_root_dir)
+
+
+def _iter_contexts(
+    csv_file: Path, config_root_dir: str | None
+) -> Iterator[dict[str, Any]]:
     config_root = (
         Path(config_root_dir).expanduser().resolve() if config_root_dir else None
     )
+    paths = _PathCache()
+    cwd = Path.cwd()
 
     path_keys = ("article_path", "path", "article")
     images_keys = ("images_path", "images_dir", "images_folder", "images")
@@ -48,7 +106,6 @@ def read_article_contexts_from_csv(
                 return str(value).strip()
         return None
 
-    contexts: list[dict[str, Any]] = []
     with open(csv_file, "r", newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
@@ -71,17 +128,17 @@ def read_article_contexts_from_csv(
 
             article_dir = Path(article_path_value).expanduser()
             if not article_dir.is_absolute():
-                by_cwd = (Path.cwd() / article_dir).resolve()
-                by_csv = (csv_file.parent / article_dir).resolve()
-                if by_cwd.exists():
+                by_cwd = paths.resolve(cwd / article_dir)
+                by_csv = paths.resolve(csv_file.parent / article_dir)
+                if paths.exists(by_cwd):
                     article_dir = by_cwd
-                elif by_csv.exists():
+                elif paths.exists(by_csv):
                     article_dir = by_csv
                 else:
                     # Default new/uncreated article paths to CWD, not CSV dir.
                     article_dir = by_cwd
             else:
-                article_dir = article_dir.resolve()
+                article_dir = paths.resolve(article_dir)
 
             context: dict[str, Any] = {
                 "article_path": str(article_dir),
@@ -93,16 +150,16 @@ def read_article_contexts_from_csv(
             if images_path_value:
                 candidate = Path(images_path_value)
                 if not candidate.is_absolute():
-                    by_cwd = (Path.cwd() / candidate).resolve()
-                    by_article = (article_dir / candidate).resolve()
-                    by_csv = (csv_file.parent / candidate).resolve()
-                    if by_cwd.exists():
+                    by_cwd = paths.resolve(cwd / candidate)
+                    by_article = paths.resolve(article_dir / candidate)
+                    by_csv = paths.resolve(csv_file.parent / candidate)
+                    if paths.exists(by_cwd):
                         candidate = by_cwd
-                    elif by_article.exists():
+                    elif paths.exists(by_article):
                         candidate = by_article
                     else:
                         candidate = by_csv
-                if candidate.exists():
+                if paths.exists(candidate):
                     context["images_path"] = str(candidate)
 
             template_path_value = first_non_empty_value(normalized, template_keys)
@@ -110,16 +167,16 @@ def read_article_contexts_from_csv(
             if template_path_value:
                 candidate = Path(template_path_value).expanduser()
                 if candidate.is_absolute():
-                    candidate = candidate.resolve()
+                    candidate = paths.resolve(candidate)
                 elif config_root is not None:
-                    candidate = (config_root / candidate).resolve()
+                    candidate = paths.resolve(config_root / candidate)
                 else:
-                    by_cwd = (Path.cwd() / candidate).resolve()
-                    by_article = (article_dir / candidate).resolve()
-                    by_csv = (csv_file.parent / candidate).resolve()
-                    if by_cwd.exists():
+                    by_cwd = paths.resolve(cwd / candidate)
+                    by_article = paths.resolve(article_dir / candidate)
+                    by_csv = paths.resolve(csv_file.parent / candidate)
+                    if paths.exists(by_cwd):
                         candidate = by_cwd
-                    elif by_article.exists():
+                    elif paths.exists(by_article):
                         candidate = by_article
                     else:
                         candidate = by_csv
@@ -133,19 +190,19 @@ def read_article_contexts_from_csv(
                     candidate = candidate.with_suffix(".yaml")
 
                 if candidate.is_absolute():
-                    candidate = candidate.resolve()
+                    candidate = paths.resolve(candidate)
                 elif config_root is not None:
-                    candidate = (config_root / candidate).resolve()
+                    candidate = paths.resolve(config_root / candidate)
                 else:
-                    by_cwd = (Path.cwd() / candidate).resolve()
-                    by_article = (article_dir / candidate).resolve()
-                    by_csv = (csv_file.parent / candidate).resolve()
+                    by_cwd = paths.resolve(cwd / candidate)
+                    by_article = paths.resolve(article_dir / candidate)
+                    by_csv = paths.resolve(csv_file.parent / candidate)
 
-                    if by_cwd.exists():
+                    if paths.exists(by_cwd):
                         candidate = by_cwd
-                    elif by_article.exists():
+                    elif paths.exists(by_article):
                         candidate = by_article
-                    elif by_csv.exists():
+                    elif paths.exists(by_csv):
                         candidate = by_csv
                     else:
                         candidate = by_csv
@@ -186,14 +243,10 @@ def read_article_contexts_from_csv(
             if prompt_step_1_value:
                 context["prompt_step_1"] = prompt_step_1_value
 
-            for filename in startup_prompt_files:
-                startup_prompt = article_dir / filename
-                if startup_prompt.exists():
-                    context["startup_prompt"] = startup_prompt.read_text(
-                        encoding="utf-8"
-                    ).strip()
-                    break
-
-            contexts.append(context)
+            startup_prompt = paths.read_startup_prompt(
+                article_dir, startup_prompt_files
+            )
+            if startup_prompt is not None:
+                context["startup_prompt"] = startup_prompt
 
-    return contexts
+            yield context
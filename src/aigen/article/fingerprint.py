@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from aigen.common.file_handler import FileHandler
+
+MANIFEST_FILE = "manifest.json"
+_CHUNK_SIZE = 1024 * 1024
+
+
+@lru_cache(maxsize=4096)
+def _hash_file(path: str, mtime_ns: int, size: int) -> str:
+    # Keyed by mtime and size so shared templates and instructions are read
+    # once per run, and edited files are read again.
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_digest(path: str | Path | None) -> str | None:
+    """SHA-256 of a file's contents, or `None` if there is no such file."""
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return _hash_file(str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def _images_digest(images_path: str | None) -> str | None:
+    if not images_path:
+        return None
+    root = Path(images_path)
+    images = sorted(FileHandler.search_images(images_path)) if root.is_dir() else [root]
+    digest = hashlib.sha256()
+    for image in images:
+        name = Path(image).relative_to(root) if root.is_dir() else Path(image).name
+        digest.update(f"{name}\0{file_digest(image)}\n".encode())
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class ArticleFingerprint:
+    """Digests of everything an article is generated from."""
+
+    inputs: dict[str, str | None]
+
+    @classmethod
+    def compute(
+        cls, context: dict[str, Any], instruction_path: str | None
+    ) -> "ArticleFingerprint":
+        """Fingerprint a CSV context (before any step ran) and its files.
+
+        The context already holds the row values and the startup prompt text.
+        """
+        row = json.dumps(dict(context), sort_keys=True, ensure_ascii=False, default=str)
+        return cls(
+            {
+                "row": hashlib.sha256(row.encode("utf-8")).hexdigest(),
+                "instructions": file_digest(instruction_path),
+                "template": file_digest(context.get("template_path")),
+                "images": _images_digest(context.get("images_path")),
+            }
+        )
+
+    @property
+    def digest(self) -> str:
+        data = json.dumps(self.inputs, sort_keys=True)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"fingerprint": self.digest, "inputs": self.inputs}
+
+    def write_manifest(self, generation_dir: str | Path) -> None:
+        path = Path(generation_dir) / MANIFEST_FILE
+        # Write then rename, so a crash never leaves a truncated manifest.
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def read_manifest(generation_dir: str | Path) -> dict[str, Any] | None:
+        path = Path(generation_dir) / MANIFEST_FILE
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
@@ -1,13 +1,26 @@
 import argparse
+import re
+import time
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-import re
+from typing import Any
 
 import structlog
 
-from aigen.article.csv_context import read_article_contexts_from_csv
+from aigen.article.csv_context import iter_article_contexts_from_csv
+from aigen.article.fingerprint import ArticleFingerprint
+from aigen.client.batch import BatchDispatcher, LocalBatchBackend, OpenAIBatchBackend
+from aigen.common.checkpoint import CHECKPOINT_FILE, Checkpoint
 from aigen.common.file_handler import FileHandler
+from aigen.common.graph import PipelineGraph
+from aigen.common.llm_client import set_llm_client_factory
 from aigen.common.pipeline import process_actions
+from aigen.common.plan import ExecutionPlan
+from aigen.common.telemetry import RunReport
 from aigen.config import AigenConfig
 
 LOGGER = structlog.get_logger(__name__)
@@ -30,10 +43,81 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Optional default instructions YAML. If omitted, each CSV row must provide Instructions.",
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=_positive_int,
+        default=1,
+        help="Number of articles to generate concurrently (default: 1).",
+    )
+    parser.add_argument(
+        "--step-workers",
+        type=_positive_int,
+        default=1,
+        help="Run independent instruction steps of an article concurrently (default: 1).",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the inferred step graph and its critical path without running.",
+    )
+    parser.add_argument(
+        "--batch",
+        choices=("openai", "local"),
+        default=None,
+        help=(
+            "Collect GPT steps of all running articles into Batch API jobs "
+            "('local' runs batch files in-process). Pair with a high --workers."
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Continue each article in its latest interrupted version dir, "
+            "skipping steps that already finished."
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Skip articles whose CSV row, instructions, template, images and "
+            "startup prompt are unchanged since their latest generation."
+        ),
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help="Write per-node and per-article timing and token usage as JSON.",
+    )
     return parser
 
 
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be a positive integer")
+    return number
+
+
+@dataclass
+class ArticleResult:
+    """Outcome of generating a single CSV row."""
+
+    index: int
+    article_path: str | None
+    generation_dir: str | None
+    ok: bool
+    duration_seconds: float
+    error: str | None = None
+    skipped: bool = False
+
+
 def reserve_generation_dir(article_path: str | Path) -> Path:
+    # mkdir(exist_ok=False) is atomic, so concurrent workers that compute the
+    # same next version simply move on to the following one.
     article_dir = Path(article_path).expanduser().resolve()
     output_base = article_dir / "aigen"
     output_base.mkdir(parents=True, exist_ok=True)
@@ -57,6 +141,48 @@ def reserve_generation_dir(article_path: str | Path) -> Path:
             next_version += 1
 
 
+def find_latest_generation_dir(article_path: str | Path) -> Path | None:
+    """Newest `aigen/vNNN` dir of an article, if any."""
+    output_base = Path(article_path).expanduser().resolve() / "aigen"
+    if not output_base.is_dir():
+        return None
+    versions = [
+        (int(match.group(1)), child)
+        for child in output_base.iterdir()
+        if (match := _VERSION_DIR_RE.match(child.name)) and child.is_dir()
+    ]
+    return max(versions)[1] if versions else None
+
+
+def find_latest_checkpoint(article_path: str | Path) -> Checkpoint | None:
+    """Checkpoint of the newest version dir, if it has one.
+
+    Older versions are never resumed: a newer one supersedes them even when it
+    stopped before its first checkpoint.
+    """
+    generation_dir = find_latest_generation_dir(article_path)
+    if generation_dir is None or not (generation_dir / CHECKPOINT_FILE).is_file():
+        return None
+    return Checkpoint.load(generation_dir / CHECKPOINT_FILE)
+
+
+def find_unchanged_generation(
+    article_path: str | Path, fingerprint: ArticleFingerprint
+) -> Path | None:
+    """Latest generation dir if it was made from the same inputs.
+
+    Only the newest version counts, so an older match never hides a newer
+    generation that failed or was made from other inputs.
+    """
+    generation_dir = find_latest_generation_dir(article_path)
+    if generation_dir is None:
+        return None
+    manifest = ArticleFingerprint.read_manifest(generation_dir)
+    if manifest is None or manifest.get("fingerprint") != fingerprint.digest:
+        return None
+    return generation_dir
+
+
 def resolve_config_path(path_value: str, config_root_dir: Path | None) -> Path:
     candidate = Path(path_value).expanduser()
     if candidate.is_absolute():
@@ -68,74 +194,355 @@ def resolve_config_path(path_value: str, config_root_dir: Path | None) -> Path:
     return (Path.cwd() / candidate).resolve()
 
 
-def main() -> None:
-    parser = build_parser()
-    args = parser.parse_args()
+def prepare_article_context(context: dict[str, Any]) -> Path:
+    article_path = context.get("article_path")
+    if not article_path:
+        raise ValueError("Article context is missing 'article_path'.")
 
-    config = AigenConfig()
-    config_root_dir = config.get_config_root_dir()
-    default_instructions_path: Path | None = None
-    default_instructions: list[dict] | None = None
-    if args.instructions:
-        default_instructions_path = resolve_config_path(
-            args.instructions, config_root_dir
-        )
-        default_instructions = FileHandler.read_yaml(str(default_instructions_path))
+    generation_dir = reserve_generation_dir(str(article_path))
+    LOGGER.info("Output dir resolved", output=generation_dir)
 
-    article_contexts = read_article_contexts_from_csv(
-        args.articles_csv,
-        config_root_dir=str(config_root_dir) if config_root_dir else None,
+    context["generation_dir"] = str(generation_dir)
+    context["generation_version"] = generation_dir.name
+
+    now = datetime.now()
+    current_year = str(now.year)
+    current_date = now.date().isoformat()
+    current_date_human = f"{now.strftime('%B')} {now.day}, {now.year}"
+    context.setdefault("current_year", current_year)
+    context.setdefault("current_date", current_date)
+    context.setdefault("current_date_human", current_date_human)
+    context.setdefault("copyright_year", f"© {current_year}")
+    return generation_dir
+
+
+@lru_cache(maxsize=64)
+def load_instruction_plan(instruction_path: str) -> ExecutionPlan:
+    """Read and compile an instructions YAML once per run."""
+    return ExecutionPlan.compile(FileHandler.read_yaml(instruction_path))
+
+
+def resolve_article_instructions(
+    context: dict[str, Any],
+    default_instructions: ExecutionPlan | None,
+    default_instructions_path: Path | None,
+) -> tuple[ExecutionPlan, str]:
+    instruction_path = context.get("instruction_path")
+    if instruction_path:
+        return load_instruction_plan(str(instruction_path)), str(instruction_path)
+    if default_instructions is not None:
+        return default_instructions, (
+            str(default_instructions_path) if default_instructions_path else ""
+        )
+    raise ValueError(
+        "No instructions provided. Pass --instructions or set Instructions in CSV row."
     )
 
-    if not article_contexts:
-        LOGGER.warning("No article rows found in CSV", csv=args.articles_csv)
-        return
 
-    for index, context in enumerate(article_contexts, start=1):
+def run_article(
+    index: int,
+    total: int | None,
+    context: dict[str, Any],
+    default_instructions: ExecutionPlan | None,
+    default_instructions_path: Path | None,
+    step_workers: int = 1,
+    report: RunReport | None = None,
+    resume: bool = False,
+    incremental: bool = False,
+) -> ArticleResult:
+    """Generate one article, reporting failures instead of raising them.
+
+    The context is checkpointed into the generation dir after every step; with
+    `resume` the latest unfinished version is continued instead of a new one.
+    With `incremental`, articles whose inputs match the manifest of their
+    latest generation are skipped, and a manifest is written for the others.
+    """
+    started = time.perf_counter()
+
+    def skipped(generation_dir: str | Path | None, reason: str) -> ArticleResult:
+        LOGGER.info(
+            "Skipping article",
+            index=index,
+            reason=reason,
+            generation_dir=str(generation_dir),
+        )
+        return ArticleResult(
+            index=index,
+            article_path=context.get("article_path"),
+            generation_dir=str(generation_dir),
+            ok=True,
+            duration_seconds=time.perf_counter() - started,
+            skipped=True,
+        )
+
+    try:
         article_path = context.get("article_path")
         if not article_path:
             raise ValueError("Article context is missing 'article_path'.")
+        instructions, resolved_instruction_path = resolve_article_instructions(
+            context, default_instructions, default_instructions_path
+        )
+        # Taken before any step runs, from the inputs as the CSV gave them.
+        fingerprint = (
+            ArticleFingerprint.compute(context, resolved_instruction_path)
+            if incremental
+            else None
+        )
+        if fingerprint is not None:
+            unchanged_dir = find_unchanged_generation(article_path, fingerprint)
+            if unchanged_dir is not None:
+                return skipped(unchanged_dir, "inputs unchanged")
 
-        generation_dir = reserve_generation_dir(str(article_path))
-        LOGGER.info("Output dir resolved", output=generation_dir)
-
-        context["generation_dir"] = str(generation_dir)
-        context["generation_version"] = generation_dir.name
-
-        now = datetime.now()
-        current_year = str(now.year)
-        current_date = now.date().isoformat()
-        current_date_human = f"{now.strftime('%B')} {now.day}, {now.year}"
-        context.setdefault("current_year", current_year)
-        context.setdefault("current_date", current_date)
-        context.setdefault("current_date_human", current_date_human)
-        context.setdefault("copyright_year", f"© {current_year}")
-
-        instruction_path = context.get("instruction_path")
-        if instruction_path:
-            instructions = FileHandler.read_yaml(str(instruction_path))
-            resolved_instruction_path = str(instruction_path)
-        elif default_instructions is not None:
-            instructions = default_instructions
-            resolved_instruction_path = (
-                str(default_instructions_path) if default_instructions_path else ""
+        checkpoint = find_latest_checkpoint(article_path) if resume else None
+        if checkpoint is not None and not checkpoint.matches(
+            len(instructions), instructions.digest
+        ):
+            LOGGER.warning(
+                "Instructions changed since the checkpoint, starting over",
+                index=index,
+                checkpoint=str(checkpoint.path),
             )
+            checkpoint = None
+        if checkpoint is not None:
+            context.update(checkpoint.context)
+            if checkpoint.finished:
+                return skipped(context.get("generation_dir"), "finished")
         else:
-            raise ValueError(
-                "No instructions provided. Pass --instructions or set Instructions in CSV row."
-            )
+            generation_dir = prepare_article_context(context)
+            checkpoint = Checkpoint(generation_dir / CHECKPOINT_FILE)
+        # Steps write into `article_context`, a copy of `context` layered over
+        # the plan's static defaults; its own values are copied back after.
+        article_context = instructions.new_context(context)
+        checkpoint.start(article_context, len(instructions), instructions.digest)
         LOGGER.info(
             "Processing article",
             index=index,
-            total=len(article_contexts),
+            # Streamed CSVs are not counted up front.
+            **({"total": total} if total is not None else {}),
             article_path=context.get("article_path"),
             generation_dir=context.get("generation_dir"),
             images_path=context.get("images_path"),
             template_path=context.get("template_path"),
             instruction_path=resolved_instruction_path,
             has_startup_prompt="startup_prompt" in context,
+            resumed_steps=len(checkpoint.completed),
+        )
+        try:
+            process_actions(
+                article_context,
+                instructions,
+                max_workers=step_workers,
+                hook=checkpoint.hook(
+                    article_context,
+                    report.hook(index) if report is not None else None,
+                ),
+                completed=checkpoint.completed,
+            )
+        finally:
+            context.update(article_context.overlay)
+        checkpoint.finish(article_context)
+        if fingerprint is not None:
+            fingerprint.write_manifest(context["generation_dir"])
+    except Exception as error:
+        LOGGER.exception(
+            "Article generation failed",
+            index=index,
+            article_path=context.get("article_path"),
+            generation_dir=context.get("generation_dir"),
+            error=str(error),
+        )
+        return ArticleResult(
+            index=index,
+            article_path=context.get("article_path"),
+            generation_dir=context.get("generation_dir"),
+            ok=False,
+            duration_seconds=time.perf_counter() - started,
+            error=f"{type(error).__name__}: {error}",
+        )
+
+    return ArticleResult(
+        index=index,
+        article_path=context.get("article_path"),
+        generation_dir=context.get("generation_dir"),
+        ok=True,
+        duration_seconds=time.perf_counter() - started,
+    )
+
+
+def run_articles(
+    article_contexts: Iterable[dict[str, Any]],
+    *,
+    workers: int = 1,
+    default_instructions: list[dict] | ExecutionPlan | None = None,
+    default_instructions_path: Path | None = None,
+    step_workers: int = 1,
+    report: RunReport | None = None,
+    resume: bool = False,
+    incremental: bool = False,
+) -> list[ArticleResult]:
+    """Run every article context, concurrently when `workers` > 1.
+
+    Contexts are consumed lazily and at most `2 * workers` are in flight, so a
+    streamed CSV keeps memory flat. Each context is only ever touched by the
+    worker that owns it; only the compiled instruction plans are shared.
+    """
+    total = len(article_contexts) if isinstance(article_contexts, list) else None
+    if isinstance(default_instructions, list):
+        default_instructions = ExecutionPlan.compile(default_instructions)
+
+    def run(indexed: tuple[int, dict[str, Any]]) -> ArticleResult:
+        index, context = indexed
+        return run_article(
+            index,
+            total,
+            context,
+            default_instructions,
+            default_instructions_path,
+            step_workers,
+            report,
+            resume,
+            incremental,
+        )
+
+    indexed_contexts = enumerate(article_contexts, start=1)
+    if workers <= 1:
+        return [run(item) for item in indexed_contexts]
+
+    results: list[ArticleResult] = []
+    in_flight: set[Future] = set()
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="aigen-article"
+    ) as executor:
+        for item in indexed_contexts:
+            if len(in_flight) >= 2 * workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                results.extend(future.result() for future in done)
+            in_flight.add(executor.submit(run, item))
+        done, _ = wait(in_flight)
+        results.extend(future.result() for future in done)
+    return sorted(results, key=lambda result: result.index)
+
+
+def describe_instruction_graphs(
+    article_contexts: Iterable[dict[str, Any]],
+    default_instructions: ExecutionPlan | None,
+    default_instructions_path: Path | None,
+) -> str:
+    """Describe the step graph of every distinct instructions file once."""
+    sections: list[str] = []
+    seen: set[str] = set()
+    for context in article_contexts:
+        instructions, instruction_path = resolve_article_instructions(
+            context, default_instructions, default_instructions_path
+        )
+        if instruction_path in seen:
+            continue
+        seen.add(instruction_path)
+        graph = PipelineGraph.build(instructions, context)
+        sections.append(f"Instructions: {instruction_path}\n{graph.describe()}")
+    return "\n\n".join(sections)
+
+
+def summarize_results(
+    results: list[ArticleResult], elapsed_seconds: float
+) -> dict[str, Any]:
+    succeeded = sum(1 for result in results if result.ok)
+    minutes = elapsed_seconds / 60.0
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "skipped": sum(1 for result in results if result.skipped),
+        "elapsed_seconds": round(elapsed_seconds, 3),
+        "articles_per_minute": round(succeeded / minutes, 2) if minutes > 0 else 0.0,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    config = AigenConfig()
+    config_root_dir = config.get_config_root_dir()
+    default_instructions_path: Path | None = None
+    default_instructions: ExecutionPlan | None = None
+    if args.instructions:
+        default_instructions_path = resolve_config_path(
+            args.instructions, config_root_dir
         )
-        process_actions(context, instructions)
+        default_instructions = load_instruction_plan(str(default_instructions_path))
+
+    article_contexts = iter_article_contexts_from_csv(
+        args.articles_csv,
+        config_root_dir=str(config_root_dir) if config_root_dir else None,
+    )
+
+    if args.dry_run:
+        print(
+            describe_instruction_graphs(
+                article_contexts, default_instructions, default_instructions_path
+            )
+        )
+        return
+
+    dispatcher: BatchDispatcher | None = None
+    if args.batch:
+        if args.workers == 1:
+            LOGGER.warning(
+                "Batch mode with one worker submits one request per batch; "
+                "raise --workers to fill batches"
+            )
+        backend = (
+            OpenAIBatchBackend() if args.batch == "openai" else LocalBatchBackend()
+        )
+        dispatcher = BatchDispatcher(backend)
+        set_llm_client_factory(dispatcher.client)
+
+    report = RunReport()
+    started = time.perf_counter()
+    try:
+        results = run_articles(
+            article_contexts,
+            workers=args.workers,
+            default_instructions=default_instructions,
+            default_instructions_path=default_instructions_path,
+            step_workers=args.step_workers,
+            report=report,
+            resume=args.resume,
+            incremental=args.incremental,
+        )
+    finally:
+        if dispatcher is not None:
+            set_llm_client_factory(None)
+            dispatcher.close()
+    if not results:
+        LOGGER.warning("No article rows found in CSV", csv=args.articles_csv)
+        return
+    summary = summarize_results(results, time.perf_counter() - started)
+    print(report.format_table())
+    if args.report:
+        report.write_json(args.report)
+        LOGGER.info("Run report written", report=args.report)
+
+    for result in results:
+        if not result.ok:
+            LOGGER.error(
+                "Article failed",
+                index=result.index,
+                article_path=result.article_path,
+                generation_dir=result.generation_dir,
+                error=result.error,
+            )
+    LOGGER.info(
+        "Article generation finished",
+        workers=args.workers,
+        step_workers=args.step_workers,
+        batch=args.batch,
+        **summary,
+    )
+
+    if summary["failed"]:
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
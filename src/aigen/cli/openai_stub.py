@@ -0,0 +1,94 @@
+import argparse
+
+import structlog
+
+from aigen.client.stub_server import LatencyModel, StubOpenAIServer, StubServerConfig
+from aigen.common.file_handler import FileHandler
+
+LOGGER = structlog.get_logger(__name__)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Local OpenAI-compatible chat completions server for load tests. "
+            "Point OPENAI_BASE_URL at the printed URL."
+        )
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8400)
+    parser.add_argument(
+        "--latency",
+        type=str,
+        default="fixed:0",
+        help=(
+            "Delay before each reply in seconds: fixed:S, uniform:LOW,HIGH, "
+            "normal:MEAN,STD or lognormal:MEDIAN,SIGMA (default: fixed:0)."
+        ),
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--tokens-per-second",
+        type=float,
+        default=0.0,
+        help="Generation speed after the first token (default: instant).",
+    )
+    parser.add_argument(
+        "--rpm", type=int, default=0, help="Requests per minute before 429s."
+    )
+    parser.add_argument(
+        "--tpm", type=int, default=0, help="Tokens per minute before 429s."
+    )
+    parser.add_argument(
+        "--error-every",
+        type=int,
+        default=0,
+        help="Fail the last --error-burst of every N requests (default: never).",
+    )
+    parser.add_argument("--error-burst", type=int, default=1)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument(
+        "--responses",
+        type=str,
+        default=None,
+        help="YAML/JSON mapping of prompt substrings to canned replies.",
+    )
+    parser.add_argument(
+        "--reply-tokens",
+        type=int,
+        default=64,
+        help="Length of generated replies in words (default: 64).",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    responses = FileHandler.read_yaml(args.responses) if args.responses else {}
+    if not isinstance(responses, dict):
+        raise TypeError("Responses file must contain a mapping.")
+
+    config = StubServerConfig(
+        latency=LatencyModel(args.latency, args.seed),
+        tokens_per_second=args.tokens_per_second,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        error_every=args.error_every,
+        error_burst=args.error_burst,
+        error_status=args.error_status,
+        responses={str(key): str(value) for key, value in responses.items()},
+        reply_tokens=args.reply_tokens,
+    )
+    server = StubOpenAIServer(config, host=args.host, port=args.port)
+    LOGGER.info("OpenAI stub server listening", base_url=server.url)
+    print(f"OPENAI_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+import itertools
+import json
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+import structlog
+from openai import OpenAIError
+
+from aigen.client.openai import (
+    OpenAIClient,
+    _OpenAIClientBase,
+    get_shared_openai_client,
+)
+from aigen.common.llm_client import GenerationStats
+from aigen.config import AigenConfig
+
+LOGGER = structlog.get_logger(__name__)
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+# The Batch API accepts at most this many requests per input file.
+MAX_BATCH_REQUESTS = 50_000
+_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+@dataclass(frozen=True)
+class BatchStatus:
+    """Progress of a submitted batch as reported by its backend."""
+
+    batch_id: str
+    status: str
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.status in _FINAL_STATUSES
+
+
+class BatchBackend(ABC):
+    """Where batch files are submitted: the Batch API or a local stand-in."""
+
+    @abstractmethod
+    def submit(self, input_path: Path) -> str:
+        """Submit a JSONL request file and return the batch id."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> BatchStatus: ...
+
+    @abstractmethod
+    def results(self, batch_id: str) -> str:
+        """Return the JSONL output (and error) lines of a finished batch."""
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """Submits batches through the OpenAI Files and Batches endpoints."""
+
+    _config = AigenConfig()
+
+    def __init__(self) -> None:
+        self._client = get_shared_openai_client(self._config)
+
+    def submit(self, input_path: Path) -> str:
+        with open(input_path, "rb") as f:
+            uploaded = self._client.files.create(file=f, purpose="batch")
+        batch = self._client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=CHAT_COMPLETIONS_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> BatchStatus:
+        batch = self._client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return BatchStatus(
+            batch_id=batch_id,
+            status=batch.status,
+            total=counts.total if counts else 0,
+            completed=counts.completed if counts else 0,
+            failed=counts.failed if counts else 0,
+        )
+
+    def results(self, batch_id: str) -> str:
+        batch = self._client.batches.retrieve(batch_id)
+        parts = [
+            self._client.files.content(file_id).text
+            for file_id in (batch.output_file_id, batch.error_file_id)
+            if file_id
+        ]
+        return "\n".join(parts)
+
+
+class LocalBatchBackend(BatchBackend):
+    """Runs batch files in-process, writing output in the Batch API format.
+
+    `responder` turns a request body into the reply text; by default each
+    request is sent through the regular chat completions client.
+    """
+
+    def __init__(self, responder: Callable[[dict[str, Any]], str] | None = None):
+        self._responder = responder or self._chat_completion
+        self._outputs: dict[str, Path] = {}
+        self._statuses: dict[str, BatchStatus] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _chat_completion(body: dict[str, Any]) -> str:
+        params = {key: value for key, value in body.items() if key != "messages"}
+        client = OpenAIClient(
+            model=params.get("model"), max_tokens=params.get("max_tokens")
+        )
+        return client.generate(body["messages"], **params) or ""
+
+    def submit(self, input_path: Path) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        output_path = input_path.with_name(f"{input_path.stem}.output.jsonl")
+        total = failed = 0
+        with (
+            open(input_path, encoding="utf-8") as source,
+            open(output_path, "w", encoding="utf-8") as output,
+        ):
+            for line in source:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                total += 1
+                try:
+                    content = self._responder(request["body"])
+                    record = {
+                        "custom_id": request["custom_id"],
+                        "response": {
+                            "status_code": 200,
+                            "body": {
+                                "choices": [
+                                    {
+                                        "index": 0,
+                                        "message": {
+                                            "role": "assistant",
+                                            "content": content,
+                                        },
+                                    }
+                                ]
+                            },
+                        },
+                        "error": None,
+                    }
+                except (OpenAIError, httpx.HTTPError, OSError, ValueError) as error:
+                    failed += 1
+                    record = {
+                        "custom_id": request["custom_id"],
+                        "response": None,
+                        "error": {"code": "local_error", "message": str(error)},
+                    }
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        with self._lock:
+            self._outputs[batch_id] = output_path
+            self._statuses[batch_id] = BatchStatus(
+                batch_id=batch_id,
+                status="completed",
+                total=total,
+                completed=total - failed,
+                failed=failed,
+            )
+        return batch_id
+
+    def status(self, batch_id: str) -> BatchStatus:
+        with self._lock:
+            return self._statuses[batch_id]
+
+    def results(self, batch_id: str) -> str:
+        with self._lock:
+            output_path = self._outputs[batch_id]
+        return output_path.read_text(encoding="utf-8")
+
+
+def parse_batch_output(text: str) -> dict[str, str | Exception]:
+    """Map each `custom_id` to its reply text or the error it failed with."""
+    results: dict[str, str | Exception] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = record.get("custom_id")
+        response = record.get("response") or {}
+        error = record.get("error")
+        if error or response.get("status_code") != 200:
+            body_error = (response.get("body") or {}).get("error")
+            detail = error or body_error or {}
+            message = detail.get("message") if isinstance(detail, dict) else detail
+            results[custom_id] = ValueError(
+                f"Batch request {custom_id} failed: {message or 'unknown error'}"
+            )
+            continue
+        choices = response["body"].get("choices") or [{}]
+        results[custom_id] = (choices[0].get("message") or {}).get("content") or ""
+    return results
+
+
+class BatchDispatcher:
+    """Collects chat requests from many pipelines into batch files.
+
+    Requests wait until `max_requests` are queued or no new request arrived for
+    `flush_seconds`; the batch is then written as JSONL, submitted, polled
+    every `poll_seconds` and each waiting caller receives its own reply.
+    """
+
+    _config = AigenConfig()
+
+    def __init__(
+        self,
+        backend: BatchBackend,
+        *,
+        batch_dir: str | Path | None = None,
+        max_requests: int | None = None,
+        flush_seconds: float | None = None,
+        poll_seconds: float | None = None,
+    ) -> None:
+        self._backend = backend
+        self._batch_dir = Path(batch_dir or self._config.get_cache_dir() / "batches")
+        self._max_requests = min(
+            max_requests or self._config.batch_max_requests, MAX_BATCH_REQUESTS
+        )
+        self._flush_seconds = (
+            self._config.batch_flush_seconds if flush_seconds is None else flush_seconds
+        )
+        self._poll_seconds = (
+            self._config.batch_poll_seconds if poll_seconds is None else poll_seconds
+        )
+        self._pending: list[tuple[str, dict[str, Any], Future]] = []
+        self._last_submit = 0.0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._ids = itertools.count(1)
+        self._workers: list[threading.Thread] = []
+        self._thread = threading.Thread(
+            target=self._collect, name="aigen-batch", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, body: dict[str, Any]) -> Future:
+        """Queue one chat completions request body; the future gets the reply."""
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise ValueError("Batch dispatcher is closed.")
+            self._pending.append((f"request-{next(self._ids)}", body, future))
+            self._last_submit = time.monotonic()
+            self._condition.notify_all()
+        return future
+
+    def client(self, *, model: str | None = None, max_tokens: int | None = None):
+        """LLM client factory to install with `set_llm_client_factory`."""
+        return BatchClient(self, model=model, max_tokens=max_tokens)
+
+    def close(self) -> None:
+        """Submit what is still queued and wait for all batches to finish."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        for worker in list(self._workers):
+            worker.join()
+
+    def _collect(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                while len(self._pending) < self._max_requests and not self._closed:
+                    idle = self._last_submit + self._flush_seconds - time.monotonic()
+                    if idle <= 0:
+                        break
+                    self._condition.wait(idle)
+                batch = self._pending[: self._max_requests]
+                del self._pending[: self._max_requests]
+            # Poll in a separate thread so the next batch can fill up meanwhile.
+            worker = threading.Thread(
+                target=self._run_batch, args=(batch,), name="aigen-batch-poll"
+            )
+            self._workers = [w for w in self._workers if w.is_alive()]
+            self._workers.append(worker)
+            worker.start()
+
+    def _run_batch(self, batch: list[tuple[str, dict[str, Any], Future]]) -> None:
+        try:
+            input_path = self._write_input(batch)
+            batch_id = self._backend.submit(input_path)
+            LOGGER.info(
+                "Submitted batch",
+                batch_id=batch_id,
+                requests=len(batch),
+                file=str(input_path),
+            )
+            status = self._backend.status(batch_id)
+            while not status.done:
+                time.sleep(self._poll_seconds)
+                status = self._backend.status(batch_id)
+                LOGGER.info(
+                    "Batch progress",
+                    batch_id=batch_id,
+                    status=status.status,
+                    completed=status.completed,
+                    failed=status.failed,
+                    total=status.total,
+                )
+            results = parse_batch_output(self._backend.results(batch_id))
+        except Exception as error:
+            LOGGER.exception("Batch failed", requests=len(batch))
+            for _, _, future in batch:
+                future.set_exception(error)
+            return
+
+        LOGGER.info(
+            "Batch finished",
+            batch_id=batch_id,
+            status=status.status,
+            completed=status.completed,
+            failed=status.failed,
+        )
+        for custom_id, _, future in batch:
+            result = results.get(custom_id)
+            if result is None:
+                future.set_exception(
+                    ValueError(
+                        f"Batch {batch_id} ({status.status}) returned no result "
+                        f"for {custom_id}."
+                    )
+                )
+            elif isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _write_input(self, batch: list[tuple[str, dict[str, Any], Future]]) -> Path:
+        self._batch_dir.mkdir(parents=True, exist_ok=True)
+        input_path = self._batch_dir / (
+            f"batch-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.jsonl"
+        )
+        with open(input_path, "w", encoding="utf-8") as f:
+            for custom_id, body, _ in batch:
+                request = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": CHAT_COMPLETIONS_ENDPOINT,
+                    "body": body,
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+        return input_path
+
+
+class BatchClient(_OpenAIClientBase):
+    """Chat client whose requests go through a `BatchDispatcher`.
+
+    `generate` blocks until the batch holding the request has finished, so
+    `last_stats` reports the time spent waiting for the batch.
+    """
+
+    def __init__(
+        self,
+        dispatcher: BatchDispatcher,
+        *,
+        model: str | None = None,
+        max_tokens: int | None = None,
+    ) -> None:
+        super().__init__(model=model, max_tokens=max_tokens)
+        self._dispatcher = dispatcher
+
+    def generate(
+        self, content: list[dict[str, Any]] | dict[str, Any] | str, **kwargs
+    ) -> str | None:
+        body = {
+            "messages": self._format_messages(content),
+            **self._request_params(kwargs),
+        }
+        started = time.perf_counter()
+        try:
+            return self._dispatcher.submit(body).result()
+        finally:
+            self.last_stats = GenerationStats(
+                latency_seconds=time.perf_counter() - started
+            )
@@ -1,13 +1,27 @@
+import asyncio
 import re
+import threading
 import time
+import weakref
+from collections.abc import Callable
 from typing import Any
 
-from aigen.common.llm_client import LLMClient
+from aigen.client.rate_limiter import RateLimiter
+from aigen.common.llm_client import GenerationStats, LLMClient
+from aigen.common.tokens import estimate_message_tokens, estimate_text_tokens
+from aigen.config import AigenConfig
 from aigen.constants import MAX_TOKENS
 from aigen.models import GPTModel, Role, TemperaturePresets
 
+import httpx
 import structlog
-from openai import OpenAI, RateLimitError
+from openai import (
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    OpenAI,
+    RateLimitError,
+)
 from openai.types import Model
 from openai.types.chat import (
     ChatCompletionUserMessageParam,
@@ -17,17 +31,91 @@ from openai.types.chat import (
 
 LOGGER = structlog.get_logger(__name__)
 
+_SHARED_CLIENTS_LOCK = threading.Lock()
+_SHARED_CLIENTS: dict[tuple[str, str, int, int], OpenAI] = {}
+# Keyed by event loop: async connection pools cannot be shared across loops.
+_SHARED_ASYNC_CLIENTS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _pool_key(
+    config: AigenConfig, max_connections: int | None
+) -> tuple[str, str, int, int]:
+    connections = max_connections or config.openai_max_connections
+    keepalive = min(config.openai_max_keepalive_connections, connections)
+    return (config.openai_api_key, config.openai_base_url, connections, keepalive)
+
+
+def get_shared_openai_client(
+    config: AigenConfig, *, max_connections: int | None = None
+) -> OpenAI:
+    """Return the process-wide OpenAI client for the given credentials and pool size.
+
+    All callers share one HTTP connection pool, so keep-alive connections are
+    reused across nodes, articles and worker threads.
+    """
+    key = _pool_key(config, max_connections)
+    with _SHARED_CLIENTS_LOCK:
+        client = _SHARED_CLIENTS.get(key)
+        if client is None:
+            api_key, base_url, connections, keepalive = key
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url or None,
+                http_client=DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=connections,
+                        max_keepalive_connections=keepalive,
+                    )
+                ),
+            )
+            _SHARED_CLIENTS[key] = client
+        return client
+
+
+def get_shared_async_openai_client(
+    config: AigenConfig, *, max_connections: int | None = None
+) -> AsyncOpenAI:
+    """Return the shared AsyncOpenAI client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    key = _pool_key(config, max_connections)
+    with _SHARED_CLIENTS_LOCK:
+        clients = _SHARED_ASYNC_CLIENTS.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            api_key, base_url, connections, keepalive = key
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url or None,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=connections,
+                        max_keepalive_connections=keepalive,
+                    )
+                ),
+            )
+            clients[key] = client
+        return client
+
+
+def reset_shared_clients() -> None:
+    """Forget shared clients, e.g. after the API key changed or in tests."""
+    with _SHARED_CLIENTS_LOCK:
+        _SHARED_CLIENTS.clear()
+        _SHARED_ASYNC_CLIENTS.clear()
+
+
+class _OpenAIClientBase(LLMClient):
+    """Message formatting and retry policy shared by sync and async clients."""
 
-class OpenAIClient(LLMClient):
     def __init__(
-        self, *, model: str | None = None, max_tokens: int | None = None
+        self,
+        *,
+        model: str | None = None,
+        max_tokens: int | None = None,
+        max_connections: int | None = None,
     ) -> None:
         super().__init__(model=model, max_tokens=max_tokens)
-        self._client = OpenAI(api_key=getattr(self.config, "openai_api_key"))
-
-    def list_models(self) -> list[Model]:
-        models = self._client.models.list().data if self._client else []
-        return [m for m in models]
+        self._max_connections = max_connections
 
     def _format_message(self, msg: dict[str, Any]) -> Any:
         role = msg.get("role")
@@ -40,6 +128,88 @@ class OpenAIClient(LLMClient):
         else:
             raise ValueError(f"Unknown role: {role}")
 
+    def _format_messages(
+        self, content: list[dict[str, Any]] | dict[str, Any] | str
+    ) -> list[Any]:
+        if isinstance(content, str):
+            content = [{"content": content, "role": Role.USER.value}]
+        if isinstance(content, dict):
+            content = [content]
+        return [self._format_message(msg) for msg in content]
+
+    def _request_params(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        params = {
+            "model": kwargs.get("model") or self.model or GPTModel.best().value,
+            "max_tokens": kwargs.get("max_tokens") or self._max_tokens or MAX_TOKENS,
+            "temperature": kwargs.get("temperature", TemperaturePresets.GENERAL.value),
+        }
+        if kwargs.get("prompt_cache_key"):
+            # Routes requests sharing a prompt prefix to the same cache.
+            params["prompt_cache_key"] = kwargs["prompt_cache_key"]
+        if kwargs.get("response_format"):
+            params["response_format"] = kwargs["response_format"]
+        return params
+
+    def _generation_params(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        params = self._request_params(kwargs)
+        if kwargs.get("stream"):
+            params.update(stream=True, stream_options={"include_usage": True})
+        return params
+
+    def _record_stats(
+        self,
+        started: float,
+        usage: Any,
+        text: str | None,
+        *,
+        ttft_seconds: float | None = None,
+        streamed: bool = False,
+    ) -> None:
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if completion_tokens is None and text:
+            completion_tokens = estimate_text_tokens(text)
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.last_stats = GenerationStats(
+            latency_seconds=time.perf_counter() - started,
+            ttft_seconds=ttft_seconds,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=completion_tokens,
+            cached_tokens=getattr(details, "cached_tokens", None),
+            streamed=streamed,
+        )
+
+    def _read_response(self, response: Any, started: float) -> str | None:
+        text = response.choices[0].message.content
+        self._record_stats(started, getattr(response, "usage", None), text)
+        return text
+
+    @staticmethod
+    def _read_chunk(chunk: Any) -> str | None:
+        if not chunk.choices:
+            return None
+        return chunk.choices[0].delta.content or None
+
+    def _finish_stream(
+        self, parts: list[str], started: float, usage: Any, ttft: float | None
+    ) -> str | None:
+        # Joined deltas are the same text a non-streaming call returns.
+        text = "".join(parts) if parts else None
+        self._record_stats(started, usage, text, ttft_seconds=ttft, streamed=True)
+        return text
+
+    def _rate_limiter(self, model: str) -> RateLimiter:
+        return RateLimiter.shared(
+            self._config.openai_api_key,
+            model,
+            requests_per_minute=self._config.openai_rpm_limit,
+            tokens_per_minute=self._config.openai_tpm_limit,
+        )
+
+    @staticmethod
+    def _estimated_tokens(messages: list[Any], params: dict[str, Any]) -> int:
+        # The API counts `max_tokens` against the token limit up front.
+        return estimate_message_tokens(messages) + int(params["max_tokens"])
+
     def _retry_delay_seconds(self, error: RateLimitError, attempt: int) -> float:
         delay_seconds = min(0.5 * (2**attempt), 8.0)
 
@@ -66,6 +236,48 @@ class OpenAIClient(LLMClient):
 
         return delay_seconds
 
+    def _back_off(
+        self,
+        limiter: RateLimiter,
+        error: RateLimitError,
+        attempt: int,
+        max_retries: int,
+    ) -> None:
+        """Pause every caller sharing `limiter` instead of just this one."""
+        response = getattr(error, "response", None)
+        limiter.update_from_headers(getattr(response, "headers", None))
+        delay_seconds = self._retry_delay_seconds(error, attempt)
+        limiter.pause(delay_seconds)
+        self._log_retry(attempt, max_retries, delay_seconds)
+
+    def _log_retry(self, attempt: int, max_retries: int, delay_seconds: float) -> None:
+        LOGGER.warning(
+            "OpenAI rate limit reached, retrying",
+            attempt=attempt + 1,
+            max_retries=max_retries,
+            wait_seconds=round(delay_seconds, 3),
+        )
+
+
+class OpenAIClient(_OpenAIClientBase):
+    def __init__(
+        self,
+        *,
+        model: str | None = None,
+        max_tokens: int | None = None,
+        max_connections: int | None = None,
+    ) -> None:
+        super().__init__(
+            model=model, max_tokens=max_tokens, max_connections=max_connections
+        )
+        self._client = get_shared_openai_client(
+            self._config, max_connections=max_connections
+        )
+
+    def list_models(self) -> list[Model]:
+        models = self._client.models.list().data if self._client else []
+        return [m for m in models]
+
     def generate(
         self, content: list[dict[str, Any]] | dict[str, Any] | str, **kwargs
     ) -> str | None:
@@ -74,42 +286,153 @@ class OpenAIClient(LLMClient):
             **kwargs:
             max_tokens: The maximum number of tokens to generate.
             temperature: The temperature for the generation.
+            stream: Receive the reply as server-sent deltas.
+            on_delta: Called with each text delta while streaming.
+            response_format: Structured output format, e.g. a JSON schema.
+        Timing and token usage of the call are kept in `last_stats`.
         """
 
         if not self._client:
             raise ValueError("OpenAI client is not initialized.")
 
-        if isinstance(content, str):
-            content = [{"content": content, "role": Role.USER.value}]
-        if isinstance(content, dict):
-            content = [content]
+        formatted_messages = self._format_messages(content)
+        params = self._generation_params(kwargs)
+        max_retries = int(kwargs.get("max_retries", 6))
+        limiter = self._rate_limiter(params["model"])
+        tokens = self._estimated_tokens(formatted_messages, params)
 
-        formatted_messages = [self._format_message(msg) for msg in content]
+        for attempt in range(max_retries + 1):
+            wait_seconds = limiter.reserve(tokens)
+            if wait_seconds > 0:
+                time.sleep(wait_seconds)
+            started = time.perf_counter()
+            try:
+                response, headers = self._create(formatted_messages, params)
+            except RateLimitError as error:
+                # The rejected request consumed no tokens; only the retry will.
+                limiter.refund(tokens)
+                if attempt >= max_retries:
+                    raise
+                self._back_off(limiter, error, attempt, max_retries)
+                continue
+            limiter.update_from_headers(headers)
+            if params.get("stream"):
+                text = self._read_stream(response, started, kwargs.get("on_delta"))
+            else:
+                text = self._read_response(response, started)
+            self.last_stats.retries = attempt
+            return text
+
+        return None
+
+    def _read_stream(
+        self, stream: Any, started: float, on_delta: Callable[[str], None] | None
+    ) -> str | None:
+        parts: list[str] = []
+        usage = None
+        ttft = None
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            delta = self._read_chunk(chunk)
+            if delta is None:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            parts.append(delta)
+            if on_delta is not None:
+                on_delta(delta)
+        return self._finish_stream(parts, started, usage, ttft)
+
+    def _create(self, messages: list[Any], params: dict[str, Any]) -> tuple[Any, Any]:
+        """Create a completion and return it with the HTTP response headers."""
+        completions = self._client.chat.completions
+        raw_api = getattr(completions, "with_raw_response", None)
+        if raw_api is None:
+            # Stand-in clients without raw response access report no headers.
+            return completions.create(messages=messages, **params), None
+        raw = raw_api.create(messages=messages, **params)
+        return raw.parse(), raw.headers
+
+
+class AsyncOpenAIClient(_OpenAIClientBase):
+    """OpenAI client whose `generate` is a coroutine.
+
+    Connections come from a pool shared by every client on the same event loop;
+    `max_connections` caps how many requests are in flight at once.
+    """
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = get_shared_async_openai_client(
+                self._config, max_connections=self._max_connections
+            )
+        return self._client
+
+    async def list_models(self) -> list[Model]:
+        page = await self.client.models.list()
+        return [m for m in page.data]
+
+    async def generate(
+        self, content: list[dict[str, Any]] | dict[str, Any] | str, **kwargs
+    ) -> str | None:
+        """Async counterpart of `OpenAIClient.generate` with the same kwargs."""
+        formatted_messages = self._format_messages(content)
+        params = self._generation_params(kwargs)
         max_retries = int(kwargs.get("max_retries", 6))
+        limiter = self._rate_limiter(params["model"])
+        tokens = self._estimated_tokens(formatted_messages, params)
 
         for attempt in range(max_retries + 1):
+            wait_seconds = limiter.reserve(tokens)
+            if wait_seconds > 0:
+                await asyncio.sleep(wait_seconds)
+            started = time.perf_counter()
             try:
-                response = self._client.chat.completions.create(
-                    model=kwargs.get("model") or self.model or GPTModel.best().value,
-                    messages=formatted_messages,
-                    max_tokens=kwargs.get("max_tokens")
-                    or self._max_tokens
-                    or MAX_TOKENS,
-                    temperature=kwargs.get(
-                        "temperature", TemperaturePresets.GENERAL.value
-                    ),
-                )
-                return response.choices[0].message.content
+                response, headers = await self._create(formatted_messages, params)
             except RateLimitError as error:
+                # The rejected request consumed no tokens; only the retry will.
+                limiter.refund(tokens)
                 if attempt >= max_retries:
                     raise
-                delay_seconds = self._retry_delay_seconds(error, attempt)
-                LOGGER.warning(
-                    "OpenAI rate limit reached, retrying",
-                    attempt=attempt + 1,
-                    max_retries=max_retries,
-                    wait_seconds=round(delay_seconds, 3),
+                self._back_off(limiter, error, attempt, max_retries)
+                continue
+            limiter.update_from_headers(headers)
+            if params.get("stream"):
+                text = await self._read_stream(
+                    response, started, kwargs.get("on_delta")
                 )
-                time.sleep(delay_seconds)
+            else:
+                text = self._read_response(response, started)
+            self.last_stats.retries = attempt
+            return text
 
         return None
+
+    async def _read_stream(
+        self, stream: Any, started: float, on_delta: Callable[[str], None] | None
+    ) -> str | None:
+        parts: list[str] = []
+        usage = None
+        ttft = None
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            delta = self._read_chunk(chunk)
+            if delta is None:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            parts.append(delta)
+            if on_delta is not None:
+                on_delta(delta)
+        return self._finish_stream(parts, started, usage, ttft)
+
+    async def _create(
+        self, messages: list[Any], params: dict[str, Any]
+    ) -> tuple[Any, Any]:
+        completions = self.client.chat.completions
+        raw_api = getattr(completions, "with_raw_response", None)
+        if raw_api is None:
+            return await completions.create(messages=messages, **params), None
+        raw = await raw_api.create(messages=messages, **params)
+        return await raw.parse(), raw.headers
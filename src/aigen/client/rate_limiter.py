@@ -0,0 +1,195 @@
+import threading
+import time
+from collections.abc import Mapping
+
+import structlog
+
+LOGGER = structlog.get_logger(__name__)
+
+_SHARED_LIMITERS_LOCK = threading.Lock()
+_SHARED_LIMITERS: dict[tuple[str, str], "RateLimiter"] = {}
+
+
+class TokenBucket:
+    """Per-minute budget that refills continuously; `limit=0` means unlimited.
+
+    Reservations may drive the level below zero; later callers then wait for
+    the debt to refill, which spaces requests out instead of bursting them.
+    """
+
+    def __init__(self, limit: int = 0) -> None:
+        self._limit = limit
+        self._level = float(limit)
+        self._updated = time.monotonic()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def level(self) -> float:
+        return self._level
+
+    def _refill(self, now: float) -> None:
+        if self._limit:
+            elapsed = max(0.0, now - self._updated)
+            self._level = min(
+                float(self._limit), self._level + elapsed * self._limit / 60.0
+            )
+        self._updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` and return how long to wait before using it."""
+        self._refill(now)
+        if not self._limit:
+            return 0.0
+        self._level -= min(amount, self._limit)
+        if self._level >= 0:
+            return 0.0
+        return -self._level * 60.0 / self._limit
+
+    def take(self, amount: float, now: float) -> float:
+        """Take `amount` if it is available now, else return seconds until it is.
+
+        Unlike `reserve`, a refused request leaves the level unchanged.
+        """
+        self._refill(now)
+        if not self._limit:
+            return 0.0
+        amount = min(amount, self._limit)
+        if self._level >= amount:
+            self._level -= amount
+            return 0.0
+        return (amount - self._level) * 60.0 / self._limit
+
+    def refund(self, amount: float, now: float) -> None:
+        """Give back a reservation that was not used, e.g. a rejected request."""
+        self._refill(now)
+        if self._limit:
+            self._level = min(
+                float(self._limit), self._level + min(amount, self._limit)
+            )
+
+    def observe(self, limit: int | None, remaining: int | None, now: float) -> None:
+        """Adopt the server's view of the limit and what is left of it."""
+        self._refill(now)
+        if limit and limit != self._limit:
+            if not self._limit:
+                self._level = float(limit)
+            self._limit = limit
+        if remaining is not None and self._limit:
+            self._level = min(self._level, float(remaining))
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> int | None:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Client-side requests-per-minute and tokens-per-minute limiter.
+
+    Callers reserve capacity before each request and sleep for the returned
+    delay. Limits start from the configured values (or unlimited) and follow the
+    `x-ratelimit-*` response headers; a 429 pauses every caller at once so
+    retries do not arrive together.
+    """
+
+    def __init__(
+        self, *, requests_per_minute: int = 0, tokens_per_minute: int = 0
+    ) -> None:
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._configured = (requests_per_minute, tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(
+        cls,
+        api_key: str,
+        model: str,
+        *,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+    ) -> "RateLimiter":
+        """Process-wide limiter per API key and model (limits are per model)."""
+        key = (api_key, model)
+        with _SHARED_LIMITERS_LOCK:
+            limiter = _SHARED_LIMITERS.get(key)
+            if limiter is None:
+                limiter = cls(
+                    requests_per_minute=requests_per_minute,
+                    tokens_per_minute=tokens_per_minute,
+                )
+                _SHARED_LIMITERS[key] = limiter
+            return limiter
+
+    @staticmethod
+    def reset_shared() -> None:
+        with _SHARED_LIMITERS_LOCK:
+            _SHARED_LIMITERS.clear()
+
+    @property
+    def requests_per_minute(self) -> int:
+        return self._requests.limit
+
+    @property
+    def tokens_per_minute(self) -> int:
+        return self._tokens.limit
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request and `tokens`; return seconds to wait first."""
+        with self._lock:
+            now = time.monotonic()
+            wait_seconds = max(
+                self._paused_until - now,
+                self._requests.reserve(1, now),
+                self._tokens.reserve(tokens, now),
+                0.0,
+            )
+        if wait_seconds > 0:
+            LOGGER.debug(
+                "Waiting for OpenAI rate limit budget",
+                wait_seconds=round(wait_seconds, 3),
+                tokens=tokens,
+            )
+        return wait_seconds
+
+    def refund(self, tokens: int) -> None:
+        """Return `tokens` of a reservation whose request was rejected.
+
+        The request itself still counts, as the server counts rejected ones.
+        """
+        with self._lock:
+            self._tokens.refund(tokens, time.monotonic())
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds`, e.g. after a 429."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str] | None) -> None:
+        """Adapt to `x-ratelimit-limit-*` and `x-ratelimit-remaining-*` headers."""
+        if not headers:
+            return
+        configured_requests, configured_tokens = self._configured
+        request_limit = _header_int(headers, "x-ratelimit-limit-requests")
+        token_limit = _header_int(headers, "x-ratelimit-limit-tokens")
+        with self._lock:
+            now = time.monotonic()
+            self._requests.observe(
+                min(filter(None, (request_limit, configured_requests)), default=None),
+                _header_int(headers, "x-ratelimit-remaining-requests"),
+                now,
+            )
+            self._tokens.observe(
+                min(filter(None, (token_limit, configured_tokens)), default=None),
+                _header_int(headers, "x-ratelimit-remaining-tokens"),
+                now,
+            )
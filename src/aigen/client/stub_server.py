@@ -0,0 +1,458 @@
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+from aigen.client.rate_limiter import TokenBucket
+from aigen.common.tokens import estimate_message_tokens, estimate_text_tokens
+from aigen.constants import MAX_TOKENS
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+LOGGER = structlog.get_logger(__name__)
+
+_WORDS = (
+    "pixel",
+    "light",
+    "layer",
+    "color",
+    "depth",
+    "horizon",
+    "texture",
+    "calm",
+    "bold",
+    "shape",
+    "line",
+    "contrast",
+    "palette",
+    "mood",
+    "frame",
+    "detail",
+)
+_LATENCY_PARAM_COUNTS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+
+
+class LatencyModel:
+    """Samples delays in seconds from a `dist:params` spec.
+
+    `fixed:S`, `uniform:LOW,HIGH`, `normal:MEAN,STD` (clipped at 0) or
+    `lognormal:MEDIAN,SIGMA`.
+    """
+
+    def __init__(self, spec: str = "fixed:0", seed: int = 0) -> None:
+        name, _, params = spec.partition(":")
+        try:
+            values = [float(value) for value in params.split(",") if value]
+        except ValueError:
+            values = []
+        if _LATENCY_PARAM_COUNTS.get(name) != len(values):
+            raise ValueError(f"Invalid latency spec: {spec}")
+        self._spec = spec
+        self._name = name
+        self._params = values
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def spec(self) -> str:
+        return self._spec
+
+    def sample(self) -> float:
+        with self._lock:
+            if self._name == "fixed":
+                return self._params[0]
+            if self._name == "uniform":
+                return self._random.uniform(*self._params)
+            if self._name == "normal":
+                return max(0.0, self._random.gauss(*self._params))
+            median, sigma = self._params
+            return self._random.lognormvariate(0.0, sigma) * median
+
+
+@dataclass
+class StubServerConfig:
+    """Behaviour of the stand-in server.
+
+    `responses` maps a substring of the last user message to a canned reply;
+    other requests get a reply derived from a hash of the request, so the same
+    request always gets the same text. Every `error_every` requests, the next
+    `error_burst` ones fail with `error_status`.
+    """
+
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    tokens_per_second: float = 0.0
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    error_every: int = 0
+    error_burst: int = 1
+    error_status: int = 503
+    responses: dict[str, str] = field(default_factory=dict)
+    reply_tokens: int = 64
+
+
+class _Refused(Exception):
+    def __init__(self, status: int, body: dict[str, Any], headers: dict[str, str]):
+        super().__init__(body["error"]["message"])
+        self.status = status
+        self.body = body
+        self.headers = headers
+
+
+class StubOpenAIServer:
+    """Local server speaking the `chat.completions` wire format.
+
+    Point `OPENAI_BASE_URL` at `url` to run the CLI or backend against it.
+    """
+
+    def __init__(
+        self,
+        config: StubServerConfig | None = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self._config = config or StubServerConfig()
+        self._requests = TokenBucket(self._config.requests_per_minute)
+        self._tokens = TokenBucket(self._config.tokens_per_minute)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as `OPENAI_BASE_URL`."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def request_count(self) -> int:
+        with self._lock:
+            return self._count
+
+    def start(self) -> "Self":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="aigen-openai-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "Self":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                LOGGER.debug("Stub request", line=format % args)
+
+            def do_GET(self) -> None:
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(
+                        HTTPStatus.OK,
+                        {
+                            "object": "list",
+                            "data": [
+                                {
+                                    "id": "stub-model",
+                                    "object": "model",
+                                    "created": 0,
+                                    "owned_by": "aigen",
+                                }
+                            ],
+                        },
+                    )
+                    return
+                self._send_error(HTTPStatus.NOT_FOUND, "Unknown path.")
+
+            def do_POST(self) -> None:
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_error(HTTPStatus.NOT_FOUND, "Unknown path.")
+                    return
+                try:
+                    length = int(self.headers.get("content-length") or 0)
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_error(HTTPStatus.BAD_REQUEST, "Invalid JSON body.")
+                    return
+                try:
+                    reply, headers = server._admit(request)
+                except _Refused as refused:
+                    self._send_json(refused.status, refused.body, refused.headers)
+                    return
+                server._complete(self, request, reply, headers)
+
+            def _send_json(
+                self,
+                status: int,
+                body: dict[str, Any],
+                headers: dict[str, str] | None = None,
+            ) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_error(self, status: int, message: str) -> None:
+                self._send_json(
+                    status,
+                    {"error": {"message": message, "type": "invalid_request_error"}},
+                )
+
+        return Handler
+
+    def _admit(self, request: dict[str, Any]) -> tuple[str, dict[str, str]]:
+        """Apply error bursts and rate limits; return the reply and headers."""
+        config = self._config
+        messages = request.get("messages") or []
+        max_tokens = int(
+            request.get("max_tokens") or request.get("max_completion_tokens") or 0
+        )
+        cost = estimate_message_tokens(messages) + (max_tokens or MAX_TOKENS)
+        with self._lock:
+            self._count += 1
+            number = self._count
+            if config.error_every and (number - 1) % config.error_every >= (
+                config.error_every - config.error_burst
+            ):
+                raise _Refused(
+                    config.error_status,
+                    {
+                        "error": {
+                            "message": "The server had an error processing your "
+                            "request (injected by the stub server).",
+                            "type": "server_error",
+                            "param": None,
+                            "code": None,
+                        }
+                    },
+                    {},
+                )
+            now = time.monotonic()
+            request_wait = self._requests.take(1, now)
+            token_wait = 0.0 if request_wait else self._tokens.take(cost, now)
+            headers = self._rate_limit_headers()
+        if request_wait or token_wait:
+            kind = "requests" if request_wait else "tokens"
+            wait_ms = max(1, int((request_wait or token_wait) * 1000))
+            limit = (
+                config.requests_per_minute if request_wait else config.tokens_per_minute
+            )
+            raise _Refused(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                {
+                    "error": {
+                        "message": (
+                            f"Rate limit reached for {request.get('model')} on "
+                            f"{kind} per min (RPM/TPM): Limit {limit}. "
+                            f"Please try again in {wait_ms}ms."
+                        ),
+                        "type": kind,
+                        "param": None,
+                        "code": "rate_limit_exceeded",
+                    }
+                },
+                {
+                    **headers,
+                    "retry-after-ms": str(wait_ms),
+                    "retry-after": str(max(1, -(-wait_ms // 1000))),
+                },
+            )
+        return self._reply(
+            messages, max_tokens, request.get("response_format")
+        ), headers
+
+    def _rate_limit_headers(self) -> dict[str, str]:
+        headers = {}
+        for kind, bucket in (("requests", self._requests), ("tokens", self._tokens)):
+            if bucket.limit:
+                headers[f"x-ratelimit-limit-{kind}"] = str(bucket.limit)
+                headers[f"x-ratelimit-remaining-{kind}"] = str(
+                    max(0, int(bucket.level))
+                )
+        return headers
+
+    def _reply(
+        self,
+        messages: list[dict[str, Any]],
+        max_tokens: int,
+        response_format: dict[str, Any] | None = None,
+    ) -> str:
+        prompt = _last_user_text(messages)
+        for match, reply in self._config.responses.items():
+            if match in prompt:
+                return reply
+        digest = hashlib.sha256(
+            json.dumps(messages, sort_keys=True, default=str).encode("utf-8")
+        ).digest()
+        words = [_WORDS[byte % len(_WORDS)] for byte in digest]
+        schema = ((response_format or {}).get("json_schema") or {}).get("schema")
+        if isinstance(schema, dict):
+            return json.dumps(_schema_instance(schema, schema, words))
+        count = self._config.reply_tokens
+        if max_tokens:
+            count = min(count, max_tokens)
+        return " ".join(words[index % len(words)] for index in range(count))
+
+    def _complete(
+        self,
+        handler: BaseHTTPRequestHandler,
+        request: dict[str, Any],
+        reply: str,
+        headers: dict[str, str],
+    ) -> None:
+        time.sleep(self._config.latency.sample())
+        completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+        model = request.get("model") or "stub-model"
+        created = int(time.time())
+        usage = {
+            "prompt_tokens": estimate_message_tokens(request.get("messages") or []),
+            "completion_tokens": estimate_text_tokens(reply),
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        delay = (
+            1.0 / self._config.tokens_per_second
+            if self._config.tokens_per_second
+            else 0.0
+        )
+        if not request.get("stream"):
+            time.sleep(delay * usage["completion_tokens"])
+            handler._send_json(
+                HTTPStatus.OK,
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": reply},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": usage,
+                },
+                headers,
+            )
+            return
+
+        handler.send_response(HTTPStatus.OK)
+        handler.send_header("content-type", "text/event-stream")
+        handler.send_header("cache-control", "no-cache")
+        handler.send_header("connection", "close")
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.close_connection = True
+
+        def send(choices: list[dict[str, Any]], usage: dict | None = None) -> None:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": choices,
+            }
+            if usage is not None:
+                chunk["usage"] = usage
+            handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            handler.wfile.flush()
+
+        words = reply.split(" ")
+        for index, word in enumerate(words):
+            if index and delay:
+                time.sleep(delay)
+            delta = word if index == 0 else f" {word}"
+            send([{"index": 0, "delta": {"content": delta}, "finish_reason": None}])
+        send([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (request.get("stream_options") or {}).get("include_usage"):
+            send([], usage)
+        handler.wfile.write(b"data: [DONE]\n\n")
+        handler.wfile.flush()
+
+
+def _schema_instance(
+    schema: dict[str, Any], root: dict[str, Any], words: list[str]
+) -> Any:
+    """Smallest value matching a structured-output schema, filled with `words`."""
+    if "$ref" in schema:
+        target: Any = root
+        for part in schema["$ref"].lstrip("#/").split("/"):
+            target = target[part]
+        return _schema_instance(target, root, words)
+    if "anyOf" in schema:
+        return _schema_instance(schema["anyOf"][0], root, words)
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    kind = schema.get("type", "string")
+    if isinstance(kind, list):
+        kind = kind[0]
+    if kind == "object":
+        return {
+            key: _schema_instance(value, root, words[index:] + words[:index])
+            for index, (key, value) in enumerate(
+                (schema.get("properties") or {}).items()
+            )
+        }
+    if kind == "array":
+        items = schema.get("items") or {}
+        return [
+            _schema_instance(items, root, words)
+            for _ in range(max(1, schema.get("minItems", 0)))
+        ]
+    if kind in ("integer", "number"):
+        return len(words[0])
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    return " ".join(words[:4])
+
+
+def _last_user_text(messages: list[dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        if message.get("role") != "user":
+            continue
+        content = message.get("content")
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            return "\n".join(
+                part.get("text", "")
+                for part in content
+                if isinstance(part, dict) and part.get("type") == "text"
+            )
+    return ""
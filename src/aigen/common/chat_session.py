@@ -3,6 +3,7 @@ import uuid
 from typing import Any
 
 from aigen.common.file_handler import FileHandler
+from aigen.common.history_store import ChatHistoryStore
 from aigen.common.prompt import Prompt
 from aigen.config import AigenConfig
 
@@ -13,27 +14,43 @@ class ChatSession:
     _config = AigenConfig()
 
     def __init__(self, id: str | None = None) -> None:
-        self._id = id if id else str(uuid.uuid4())
+        self._id = id or None
         self._history: list[dict[str, Any]] = []
+        self._store: ChatHistoryStore | None = None
+        self._saved_count = 0
 
     @property
     def id(self) -> str:
-        """Unique identifier for this chat session."""
+        """Unique identifier for this chat session, generated on first use."""
+        if self._id is None:
+            self._id = str(uuid.uuid4())
         return self._id
 
     @property
     def cache_dir_path(self) -> Path:
         """Path to the cache directory for this chat session."""
-        return self._config.get_cache_dir() / self._id
+        return self._config.get_cache_dir() / self.id
 
     @property
     def history(self) -> list[dict[str, Any]]:
         """Chat history as a list of message dictionaries."""
         return self._history
 
+    def request_history(
+        self, messages: list[dict[str, Any]] | None = None
+    ) -> list[dict[str, Any]]:
+        """History (or `messages` taken from it) as sent to the model, with
+        stored images inlined again."""
+        messages = self._history if messages is None else messages
+        if self._store is None:
+            return messages
+        return [self._store.rehydrate(message) for message in messages]
+
     def set_history(self, history: list[dict[str, Any]]) -> None:
         """Set the chat history."""
         self._history = history
+        self._store = None
+        self._saved_count = 0
 
     def add_dict(self, message: dict[str, Any]) -> None:
         """Add a message dictionary to the chat history."""
@@ -44,9 +61,28 @@ class ChatSession:
         self._history.extend(prompt.to_dict())
 
     def load_from_file(self, file_path: str) -> None:
-        """Load chat history from a file."""
+        """Load chat history from a file (`.jsonl` histories are append-only)."""
+        if ChatHistoryStore.handles(file_path):
+            self._store = ChatHistoryStore(file_path)
+            self._history = self._store.load()
+            self._saved_count = len(self._history)
+            return
+        self._store = None
         self._history = FileHandler.read_yaml(file_path) or []
 
     def save_to_file(self, file_path: str) -> None:
-        """Save chat history to a file."""
-        FileHandler.write_yaml(file_path, self._history)
+        """Save chat history to a file.
+
+        `.jsonl` files loaded by this session only get the messages added since.
+        """
+        if ChatHistoryStore.handles(file_path):
+            if self._store is not None and self._store.path == Path(file_path):
+                new_messages = self._history[self._saved_count :]
+                self._history[self._saved_count :] = self._store.append(new_messages)
+            else:
+                history = self.request_history()
+                self._store = ChatHistoryStore(file_path)
+                self._history = self._store.write(history)
+            self._saved_count = len(self._history)
+            return
+        FileHandler.write_yaml(file_path, self.request_history())
@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from aigen.common.hooks import NODE_FINISHED, NodeEvent, NodeHook
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+class Checkpoint:
+    """Snapshot of a context and the steps that finished on it.
+
+    The snapshot is rewritten after every finished step, so a run that dies
+    part-way can continue from it: steps in `completed` already left their
+    outputs in the saved context and are not run (or paid for) again. The
+    digest of the plan is saved too, so a checkpoint is never continued with
+    edited instructions.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        context: dict[str, Any] | None = None,
+        completed: list[int] | None = None,
+        steps: int | None = None,
+        plan: str | None = None,
+        finished: bool = False,
+    ) -> None:
+        self._path = Path(path)
+        self._context = context or {}
+        self._completed = set(completed or ())
+        self._steps = steps
+        self._plan = plan
+        self._finished = finished
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Checkpoint":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not isinstance(data.get("context"), dict):
+            raise TypeError(f"Invalid checkpoint file: {path}")
+        return cls(
+            path,
+            context=data["context"],
+            completed=data.get("completed") or [],
+            steps=data.get("steps"),
+            plan=data.get("plan"),
+            finished=bool(data.get("finished")),
+        )
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def context(self) -> dict[str, Any]:
+        """Context as of the last save."""
+        return self._context
+
+    @property
+    def completed(self) -> frozenset[int]:
+        with self._lock:
+            return frozenset(self._completed)
+
+    @property
+    def steps(self) -> int | None:
+        """Number of steps of the instructions the checkpoint belongs to."""
+        return self._steps
+
+    @property
+    def plan(self) -> str | None:
+        """Digest of the plan the checkpoint belongs to."""
+        return self._plan
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def matches(self, steps: int, plan: str) -> bool:
+        """Whether the checkpoint was written for this plan."""
+        return self._steps == steps and self._plan == plan
+
+    def start(self, context: dict[str, Any], steps: int, plan: str) -> None:
+        """Save the context before the first (or next) step runs."""
+        if self._steps is not None and not self.matches(steps, plan):
+            raise ValueError(
+                f"Checkpoint {self._path} was written for other instructions."
+            )
+        self._steps = steps
+        self._plan = plan
+        self.save(context)
+
+    def hook(self, context: dict[str, Any], hook: NodeHook | None = None) -> NodeHook:
+        """Hook that saves `context` after each successful step, then calls `hook`."""
+
+        def record(event: NodeEvent) -> None:
+            if event.type == NODE_FINISHED and event.ok:
+                with self._lock:
+                    self._completed.add(event.index)
+                self.save(context)
+            if hook is not None:
+                hook(event)
+
+        return record
+
+    def finish(self, context: dict[str, Any]) -> None:
+        self._finished = True
+        self.save(context)
+
+    def save(self, context: dict[str, Any]) -> None:
+        # Steps on other threads may still write to `context`; copy it first.
+        snapshot = dict(context)
+        with self._lock:
+            self._context = snapshot
+            data = {
+                "steps": self._steps,
+                "plan": self._plan,
+                "completed": sorted(self._completed),
+                "finished": self._finished,
+                "context": snapshot,
+            }
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path.with_name(f"{self._path.name}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+                # Make the data durable before the rename publishes it.
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path)
@@ -1,17 +1,34 @@
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
+from typing import Any, ClassVar
+
 import yaml
-from typing import Any
 
+from aigen.common.hooks import record_io
 from aigen.models import ImageType
 
+_IMAGE_SUFFIXES = frozenset(f".{image_type.value}" for image_type in ImageType)
+_DIR_CACHE_MAX_ENTRIES = 4096
+
 
 class FileHandler:
     """Handles reading and writing of files."""
 
+    # Directory path -> (mtime_ns, image file paths, subdirectory paths). Shared
+    # by every caller, bounded to `_DIR_CACHE_MAX_ENTRIES` and locked.
+    _dir_cache: ClassVar["OrderedDict[str, tuple[int, list[str], list[str]]]"] = (
+        OrderedDict()
+    )
+    _dir_cache_lock: ClassVar[threading.Lock] = threading.Lock()
+
     @staticmethod
     def read_text(file_path: str) -> str:
         with open(file_path, "r") as f:
-            return f.read().rstrip("\n")
+            text = f.read()
+        record_io(bytes_read=len(text.encode("utf-8")))
+        return text.rstrip("\n")
 
     @staticmethod
     def write_text(file_path: str, text: str) -> None:
@@ -19,6 +36,7 @@ class FileHandler:
         _file_path.parent.mkdir(parents=True, exist_ok=True)
         with open(_file_path, "w") as f:
             f.write(text)
+        record_io(bytes_written=len(text.encode("utf-8")))
 
     @staticmethod
     def read_yaml(file_path: str) -> Any:
@@ -30,16 +48,55 @@ class FileHandler:
         with open(file_path, "w") as f:
             yaml.dump(data, f, default_flow_style=False)
 
-    @staticmethod
-    def search_images(image_dir_path: str) -> list[str]:
-        """Find image files in a directory"""
-        images = sorted(
-            Path(image_dir_path).rglob("*"),
-            key=lambda p: str(p),
-            reverse=True,
-        )
-        return [
-            str(img)
-            for img in images
-            if img.is_file() and ImageType.validate(img.suffix.lstrip(".").lower())
-        ]
+    @classmethod
+    def search_images(cls, image_dir_path: str) -> list[str]:
+        """Find image files in a directory and its subdirectories.
+
+        Each directory listing is cached while the directory's mtime is
+        unchanged, so repeated searches cost one `stat` per directory.
+        """
+        images: list[str] = []
+        pending = [str(Path(image_dir_path))]
+        while pending:
+            try:
+                files, subdirs = cls._list_dir(pending.pop())
+            except OSError:
+                continue
+            images.extend(files)
+            pending.extend(subdirs)
+        return sorted(images, reverse=True)
+
+    @classmethod
+    def clear_dir_cache(cls) -> None:
+        with cls._dir_cache_lock:
+            cls._dir_cache.clear()
+
+    @classmethod
+    def _list_dir(cls, dir_path: str) -> tuple[list[str], list[str]]:
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+        with cls._dir_cache_lock:
+            cached = cls._dir_cache.get(dir_path)
+            if cached is not None and cached[0] == mtime_ns:
+                cls._dir_cache.move_to_end(dir_path)
+                return cached[1], cached[2]
+
+        files: list[str] = []
+        subdirs: list[str] = []
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                # Entry types come from the directory listing, so only
+                # image names may cost a `stat` (e.g. for symlinks).
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif (
+                    os.path.splitext(entry.name)[1].lower() in _IMAGE_SUFFIXES
+                    and entry.is_file()
+                ):
+                    files.append(entry.path)
+
+        with cls._dir_cache_lock:
+            cls._dir_cache[dir_path] = (mtime_ns, files, subdirs)
+            cls._dir_cache.move_to_end(dir_path)
+            while len(cls._dir_cache) > _DIR_CACHE_MAX_ENTRIES:
+                cls._dir_cache.popitem(last=False)
+        return files, subdirs
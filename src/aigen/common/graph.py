@@ -0,0 +1,263 @@
+import heapq
+from collections.abc import Collection
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+from aigen.common.hooks import NodeHook, run_step
+from aigen.common.node import Node, NodeDependencies
+from aigen.common.plan import ExecutionPlan
+
+
+@dataclass(frozen=True)
+class GraphStep:
+    """One instruction step and the earlier steps it has to wait for."""
+
+    index: int
+    node_name: str
+    node: Node
+    dependencies: NodeDependencies
+    requires: frozenset[int]
+    estimated_seconds: float
+
+    @property
+    def params(self) -> dict[str, Any]:
+        return self.node.params
+
+
+def _infer_requires(
+    dependencies: list[NodeDependencies], context: dict[str, Any] | None
+) -> list[set[int]]:
+    """Order steps by read-after-write, write-after-read and write-after-write.
+
+    Any pair of steps that could observe each other's effects keeps its
+    original relative order, so the final context matches a sequential run.
+    """
+    last_writer: dict[str, int] = {}
+    readers: dict[str, list[int]] = {}
+    refs: dict[str, frozenset[str] | None] = {}
+    writers: list[int] = []
+    read_all: list[int] = []
+    barrier: int | None = None
+    requires: list[set[int]] = []
+
+    def refs_of(var: str) -> frozenset[str] | None:
+        if var in refs:
+            return refs[var]
+        if context is not None and var in context:
+            return Node.referenced_vars(context[var])
+        return frozenset()
+
+    for index, deps in enumerate(dependencies):
+        required: set[int] = set() if barrier is None else {barrier}
+
+        reads: set[str] | None = None
+        if deps.reads is not None:
+            reads = set(deps.reads)
+            for var in deps.renders:
+                var_refs = refs_of(var)
+                if var_refs is None:
+                    reads = None
+                    break
+                reads |= var_refs
+
+        if reads is None:
+            required.update(writers)
+        else:
+            required.update(last_writer[var] for var in reads if var in last_writer)
+
+        if deps.writes is None:
+            required.update(range(index))
+        else:
+            required.update(read_all)
+            for var in deps.writes:
+                if var in last_writer:
+                    required.add(last_writer[var])
+                required.update(readers.get(var, ()))
+        required.discard(index)
+        requires.append(required)
+
+        if deps.writes is None:
+            # Everything after a full barrier only needs to wait for it.
+            barrier = index
+            last_writer.clear()
+            readers.clear()
+            read_all = []
+            writers = [index]
+            continue
+
+        if reads is None:
+            read_all.append(index)
+        else:
+            for var in reads:
+                readers.setdefault(var, []).append(index)
+
+        new_refs = {
+            var: refs_of(deps.copies[var])
+            if var in deps.copies
+            else deps.value_refs.get(var, frozenset())
+            for var in deps.writes
+        }
+        for var in deps.writes:
+            last_writer[var] = index
+            readers[var] = []
+        refs.update(new_refs)
+        if deps.writes:
+            writers.append(index)
+
+    return requires
+
+
+def _reduce(requires: list[set[int]]) -> list[frozenset[int]]:
+    """Drop requirements already implied through another requirement."""
+    ancestors: list[set[int]] = []
+    reduced: list[frozenset[int]] = []
+    for required in requires:
+        implied: set[int] = set()
+        for step in required:
+            implied |= ancestors[step]
+        reduced.append(frozenset(required - implied))
+        ancestors.append(implied | required)
+    return reduced
+
+
+class PipelineGraph:
+    """Dependency graph of instruction steps that can run them concurrently."""
+
+    def __init__(self, steps: list[GraphStep]) -> None:
+        self._steps = steps
+
+    @classmethod
+    def build(
+        cls,
+        instructions: list[dict] | ExecutionPlan,
+        context: dict[str, Any] | None = None,
+    ) -> "PipelineGraph":
+        """Infer step dependencies; `context` refines refs of initial values."""
+        plan = (
+            instructions
+            if isinstance(instructions, ExecutionPlan)
+            else ExecutionPlan.compile(instructions)
+        )
+        requires = _reduce(
+            _infer_requires([step.dependencies for step in plan.steps], context)
+        )
+        steps = [
+            GraphStep(
+                index=step.index,
+                node_name=step.node_name,
+                node=step.node,
+                dependencies=step.dependencies,
+                requires=requires[step.index],
+                estimated_seconds=step.estimated_seconds,
+            )
+            for step in plan.steps
+        ]
+        return cls(steps)
+
+    @property
+    def steps(self) -> list[GraphStep]:
+        return self._steps
+
+    def levels(self) -> list[int]:
+        """Depth of each step; steps on the same level can run together."""
+        levels: list[int] = []
+        for step in self._steps:
+            levels.append(1 + max((levels[i] for i in step.requires), default=0))
+        return levels
+
+    def critical_path(self) -> tuple[list[int], float]:
+        """Return the slowest dependency chain and its estimated duration."""
+        finish: list[float] = []
+        previous: list[int | None] = []
+        for step in self._steps:
+            before = max(step.requires, key=lambda i: finish[i], default=None)
+            start = finish[before] if before is not None else 0.0
+            finish.append(start + step.estimated_seconds)
+            previous.append(before)
+        if not finish:
+            return [], 0.0
+
+        last = max(range(len(finish)), key=lambda i: finish[i])
+        path = [last]
+        while previous[path[-1]] is not None:
+            path.append(previous[path[-1]])
+        return path[::-1], finish[last]
+
+    def describe(self) -> str:
+        """Human-readable listing of the graph and its critical path."""
+        levels = self.levels()
+        path, path_seconds = self.critical_path()
+        sequential_seconds = sum(step.estimated_seconds for step in self._steps)
+        lines = [
+            f"Pipeline graph: {len(self._steps)} steps, {max(levels, default=0)} levels"
+        ]
+        for step, level in zip(self._steps, levels):
+            writes = step.dependencies.writes
+            outputs = "*" if writes is None else ", ".join(sorted(writes)) or "-"
+            after = ", ".join(str(i) for i in sorted(step.requires)) or "start"
+            marker = "*" if step.index in path else " "
+            lines.append(
+                f"{marker} [{step.index}] L{level} {step.node_name} "
+                f"(after {after}) -> {outputs}"
+            )
+        lines.append(
+            f"Critical path (~{path_seconds:.1f}s of ~{sequential_seconds:.1f}s "
+            f"sequential): "
+            + " -> ".join(f"[{i}] {self._steps[i].node_name}" for i in path)
+        )
+        return "\n".join(lines)
+
+    def run(
+        self,
+        context: dict[str, Any],
+        *,
+        max_workers: int = 4,
+        hook: NodeHook | None = None,
+        completed: Collection[int] = (),
+    ) -> None:
+        """Run steps as soon as their requirements finished.
+
+        Steps listed in `completed` already ran on this context and are skipped.
+        On failure no new steps are started; the error of the earliest failing
+        step is raised once running steps have finished.
+        """
+        done_before = set(completed)
+        remaining = [step for step in self._steps if step.index not in done_before]
+        steps = {step.index: step for step in remaining}
+        pending = {step.index: set(step.requires) - done_before for step in remaining}
+        dependents: dict[int, list[int]] = {step.index: [] for step in remaining}
+        for step in remaining:
+            for required in step.requires:
+                if required in dependents:
+                    dependents[required].append(step.index)
+
+        ready = [index for index, required in pending.items() if not required]
+        heapq.heapify(ready)
+        running: dict[Future, int] = {}
+        errors: list[tuple[int, BaseException]] = []
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="aigen-step"
+        ) as executor:
+            while ready or running:
+                while ready and not errors:
+                    index = heapq.heappop(ready)
+                    future = executor.submit(run_step, steps[index], context, hook)
+                    running[future] = index
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        errors.append((index, error))
+                        continue
+                    for dependent in dependents[index]:
+                        pending[dependent].discard(index)
+                        if not pending[dependent]:
+                            heapq.heappush(ready, dependent)
+
+        if errors:
+            raise min(errors, key=lambda item: item[0])[1]
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+HISTORY_SUFFIX = ".jsonl"
+BLOB_REF_PREFIX = "sha256:"
+_DATA_URL_RE = re.compile(r"^data:(?P<mime>[^;,]+);base64,(?P<data>.*)$", re.DOTALL)
+# Each cached blob is a whole base64 image, so the cache is bounded by size.
+BLOB_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class _BlobCache:
+    """LRU of blob payloads by path, holding at most `max_bytes` of data.
+
+    Blobs are content-addressed and never change, so caching them is safe.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._items: OrderedDict[str, str] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def read(self, path: str) -> str:
+        with self._lock:
+            data = self._items.get(path)
+            if data is not None:
+                self._items.move_to_end(path)
+                return data
+        data = Path(path).read_text(encoding="ascii")
+        if len(data) > self._max_bytes:
+            return data
+        with self._lock:
+            if path not in self._items:
+                self._items[path] = data
+                self._bytes += len(data)
+                while self._bytes > self._max_bytes:
+                    _, evicted = self._items.popitem(last=False)
+                    self._bytes -= len(evicted)
+        return data
+
+
+_BLOBS = _BlobCache(BLOB_CACHE_MAX_BYTES)
+
+
+class BlobStore:
+    """Content-addressed files holding base64 image payloads."""
+
+    def __init__(self, root: str | Path) -> None:
+        self._root = Path(root)
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def _path(self, digest: str) -> Path:
+        return self._root / digest[:2] / digest
+
+    def put(self, data: str) -> str:
+        """Store `data` once and return its `sha256:<hex>` reference."""
+        digest = hashlib.sha256(data.encode("ascii")).hexdigest()
+        path = self._path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(
+                f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            tmp_path.write_text(data, encoding="ascii")
+            os.replace(tmp_path, path)
+        return BLOB_REF_PREFIX + digest
+
+    def get(self, ref: str) -> str:
+        if not ref.startswith(BLOB_REF_PREFIX):
+            raise ValueError(f"Invalid blob reference: {ref}")
+        return _BLOBS.read(str(self._path(ref[len(BLOB_REF_PREFIX) :])))
+
+
+class ChatHistoryStore:
+    """Append-only JSONL chat history with images kept in a `BlobStore`.
+
+    Each line is one message. Image `data:` URLs are replaced by blob
+    references when written and turned back into URLs by `rehydrate`, so
+    saving costs only the new messages and loading never parses image data.
+    """
+
+    def __init__(self, path: str | Path, blobs: BlobStore | None = None) -> None:
+        self._path = Path(path)
+        self._blobs = blobs or BlobStore(
+            self._path.with_name(self._path.name + ".blobs")
+        )
+
+    @staticmethod
+    def handles(path: str | Path) -> bool:
+        return Path(path).suffix == HISTORY_SUFFIX
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> list[dict[str, Any]]:
+        """Read messages in their compact form (images as references)."""
+        if not self._path.exists():
+            return []
+        with open(self._path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def append(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Append messages and return them in their stored (compact) form."""
+        return self._write(messages, "a")
+
+    def write(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Replace the whole history; returns the messages as stored."""
+        return self._write(messages, "w")
+
+    def _write(self, messages: list[dict[str, Any]], mode: str) -> list[dict[str, Any]]:
+        compacted = [self.compact(message) for message in messages]
+        if not compacted and mode == "a":
+            return compacted
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._path, mode, encoding="utf-8") as f:
+            f.writelines(
+                json.dumps(message, ensure_ascii=False, separators=(",", ":")) + "\n"
+                for message in compacted
+            )
+        return compacted
+
+    def compact(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Return `message` with image data URLs moved to the blob store."""
+        content = message.get("content")
+        if not isinstance(content, list):
+            return message
+        parts = []
+        for part in content:
+            image_url = part.get("image_url") if isinstance(part, dict) else None
+            url = image_url.get("url") if isinstance(image_url, dict) else None
+            match = _DATA_URL_RE.match(url) if isinstance(url, str) else None
+            if match is None:
+                parts.append(part)
+                continue
+            compact_url = {
+                key: value for key, value in image_url.items() if key != "url"
+            }
+            compact_url["blob"] = self._blobs.put(match.group("data"))
+            compact_url["mime_type"] = match.group("mime")
+            parts.append({**part, "image_url": compact_url})
+        return {**message, "content": parts}
+
+    def rehydrate(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Return `message` with blob references turned back into data URLs."""
+        content = message.get("content")
+        if not isinstance(content, list):
+            return message
+        parts = []
+        for part in content:
+            image_url = part.get("image_url") if isinstance(part, dict) else None
+            if not isinstance(image_url, dict) or "blob" not in image_url:
+                parts.append(part)
+                continue
+            full_url = {
+                key: value
+                for key, value in image_url.items()
+                if key not in {"blob", "mime_type"}
+            }
+            full_url["url"] = (
+                f"data:{image_url['mime_type']};base64,"
+                f"{self._blobs.get(image_url['blob'])}"
+            )
+            parts.append({**part, "image_url": full_url})
+        return {**message, "content": parts}
@@ -0,0 +1,75 @@
+from typing import Any
+
+from aigen.common.tokens import TOKENS_PER_MESSAGE, estimate_content_tokens
+from aigen.models import Role
+
+IMAGE_PLACEHOLDER = "[image omitted]"
+
+
+def _has_images(message: dict[str, Any]) -> bool:
+    content = message.get("content")
+    return isinstance(content, list) and any(
+        isinstance(part, dict) and part.get("type") == "image_url" for part in content
+    )
+
+
+def drop_old_images(
+    messages: list[dict[str, Any]], keep_turns: int
+) -> list[dict[str, Any]]:
+    """Replace image parts with a placeholder in all but the last `keep_turns`
+    messages that have images. Other messages are returned as they are."""
+    kept = 0
+    result = list(messages)
+    for index in range(len(result) - 1, -1, -1):
+        message = result[index]
+        if not _has_images(message):
+            continue
+        if kept < keep_turns:
+            kept += 1
+            continue
+        result[index] = {
+            **message,
+            "content": [
+                {"type": "text", "text": IMAGE_PLACEHOLDER}
+                if isinstance(part, dict) and part.get("type") == "image_url"
+                else part
+                for part in message["content"]
+            ],
+        }
+    return result
+
+
+def window_start(messages: list[dict[str, Any]], max_tokens: int) -> int:
+    """Index of the oldest message kept when the newest ones must fit `max_tokens`.
+
+    Messages are counted from the end, so the cost does not grow with the
+    length of the history. The window never starts with an assistant reply.
+    """
+    tokens = 0
+    start = len(messages)
+    while start > 0:
+        message = messages[start - 1]
+        tokens += TOKENS_PER_MESSAGE + estimate_content_tokens(message.get("content"))
+        if tokens > max_tokens:
+            break
+        start -= 1
+    while start < len(messages) and messages[start].get("role") != Role.USER.value:
+        start += 1
+    return start
+
+
+def transcript(messages: list[dict[str, Any]]) -> str:
+    """Plain-text rendering of messages, e.g. for a summarization prompt."""
+    lines = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            content = " ".join(
+                str(part.get("text", ""))
+                if part.get("type") == "text"
+                else IMAGE_PLACEHOLDER
+                for part in content
+                if isinstance(part, dict)
+            )
+        lines.append(f"{message.get('role')}: {content}")
+    return "\n".join(lines)
@@ -0,0 +1,156 @@
+import threading
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from aigen.common.llm_client import GenerationStats
+
+if TYPE_CHECKING:
+    from aigen.common.graph import GraphStep
+    from aigen.common.plan import PlanStep
+
+NODE_STARTED = "node_started"
+NODE_FINISHED = "node_finished"
+
+
+@dataclass
+class StepMetrics:
+    """Measurements reported by a node while it runs."""
+
+    llm_calls: int = 0
+    llm_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    llm_retries: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+
+
+@dataclass(frozen=True)
+class NodeEvent:
+    """Start or end of one step, passed to the hook given to `process_actions`."""
+
+    type: str
+    index: int
+    node_name: str
+    timestamp: float
+    duration_seconds: float | None = None
+    ok: bool | None = None
+    error: str | None = None
+    output_bytes: int | None = None
+    output: str | None = None
+    metrics: StepMetrics = field(default_factory=StepMetrics)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+NodeHook = Callable[[NodeEvent], None]
+
+# Metrics of the step running in the current thread (or task), if any.
+_CURRENT_STEP: ContextVar[StepMetrics | None] = ContextVar(
+    "aigen_current_step", default=None
+)
+
+# Text printed by the step running in the current thread (or task), if any.
+_CURRENT_OUTPUT: ContextVar[list[str] | None] = ContextVar(
+    "aigen_current_output", default=None
+)
+
+# A step may read files on helper threads, e.g. when encoding images.
+_IO_LOCK = threading.Lock()
+
+
+def current_step_metrics() -> StepMetrics | None:
+    return _CURRENT_STEP.get()
+
+
+def record_llm_call(stats: GenerationStats | None) -> None:
+    """Add one LLM call to the metrics of the step that is running."""
+    metrics = _CURRENT_STEP.get()
+    if metrics is None or stats is None:
+        return
+    metrics.llm_calls += 1
+    metrics.llm_seconds += stats.latency_seconds
+    metrics.prompt_tokens += stats.prompt_tokens or 0
+    metrics.completion_tokens += stats.completion_tokens or 0
+    metrics.cached_tokens += stats.cached_tokens or 0
+    metrics.llm_retries += stats.retries
+
+
+def record_io(*, bytes_read: int = 0, bytes_written: int = 0) -> None:
+    """Add file bytes read or written to the metrics of the running step."""
+    metrics = _CURRENT_STEP.get()
+    if metrics is None:
+        return
+    with _IO_LOCK:
+        metrics.bytes_read += bytes_read
+        metrics.bytes_written += bytes_written
+
+
+def record_output(text: str) -> None:
+    """Attach a line a node printed to the `node_finished` event of its step."""
+    lines = _CURRENT_OUTPUT.get()
+    if lines is not None:
+        lines.append(text)
+
+
+def _output_bytes(step: "PlanStep | GraphStep", context: dict[str, Any]) -> int | None:
+    writes = step.dependencies.writes
+    if writes is None:
+        return None
+    return sum(
+        len(str(context[var]).encode("utf-8")) for var in writes if var in context
+    )
+
+
+def run_step(
+    step: "PlanStep | GraphStep", context: dict[str, Any], hook: NodeHook | None
+) -> None:
+    """Run one step, collecting its metrics and reporting it to `hook`."""
+    if hook is None:
+        step.node.run(context)
+        return
+
+    metrics = StepMetrics()
+    output: list[str] = []
+    hook(NodeEvent(NODE_STARTED, step.index, step.node_name, time.time()))
+    token = _CURRENT_STEP.set(metrics)
+    output_token = _CURRENT_OUTPUT.set(output)
+    started = time.perf_counter()
+    try:
+        step.node.run(context)
+    except Exception as error:
+        hook(
+            NodeEvent(
+                NODE_FINISHED,
+                step.index,
+                step.node_name,
+                time.time(),
+                duration_seconds=time.perf_counter() - started,
+                ok=False,
+                error=str(error),
+                output="\n".join(output) if output else None,
+                metrics=metrics,
+            )
+        )
+        raise
+    finally:
+        _CURRENT_OUTPUT.reset(output_token)
+        _CURRENT_STEP.reset(token)
+    hook(
+        NodeEvent(
+            NODE_FINISHED,
+            step.index,
+            step.node_name,
+            time.time(),
+            duration_seconds=time.perf_counter() - started,
+            ok=True,
+            output_bytes=_output_bytes(step, context),
+            output="\n".join(output) if output else None,
+            metrics=metrics,
+        )
+    )
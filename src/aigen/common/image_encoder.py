@@ -1,17 +1,270 @@
 import base64
+import contextvars
+import hashlib
+import io
 import mimetypes
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import ClassVar
+
+import structlog
+
+from aigen.common.hooks import record_io
+from aigen.common.response_cache import ResponseCache
+from aigen.config import AigenConfig
+
+try:  # Pillow is optional; without it images are sent as they are on disk.
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+
+LOGGER = structlog.get_logger(__name__)
+
+# Sizes the vision models work with per detail level: "low" images are seen at
+# 512px, "high" ones are fitted into 2048px and then 768px on the short side.
+LOW_DETAIL_MAX_SIDE = 512
+HIGH_DETAIL_MAX_SIDE = 2048
+HIGH_DETAIL_MAX_SHORT_SIDE = 768
+JPEG_QUALITY = 85
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    """Base64 payload of an image, ready for a data URL."""
+
+    mime_type: str
+    data: str
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.data}"
 
 
 class ImageEncoder:
     """Encodes images to base64 strings."""
 
+    _config = AigenConfig()
+    # Process-wide LRU of payloads, bounded by AIGEN_IMAGE_CACHE_MAX_MB. Nodes
+    # on worker threads share it, so it is only touched under `_cache_lock`.
+    _cache: ClassVar["OrderedDict[tuple, EncodedImage]"] = OrderedDict()
+    _cache_bytes: ClassVar[int] = 0
+    _cache_lock: ClassVar[threading.Lock] = threading.Lock()
+    # Downscaled payloads on disk, evicted like LLM responses (LRU by size).
+    _disk_cache: ClassVar[ResponseCache | None] = None
+    _executor: ClassVar[ThreadPoolExecutor | None] = None
+    _executor_workers: ClassVar[int] = 0
+    _warned_no_pillow = False
+
     @staticmethod
     def encode_image(image_path: str) -> str:
         with open(image_path, "rb") as img:
-            return base64.b64encode(img.read()).decode("utf-8")
+            raw = img.read()
+        record_io(bytes_read=len(raw))
+        return base64.b64encode(raw).decode("utf-8")
 
     @staticmethod
     def get_mime_type(image_path):
         mime_type, _ = mimetypes.guess_type(image_path)
         # Fallback if not recognized
         return mime_type or "application/octet-stream"
+
+    @classmethod
+    def encode(
+        cls, image_path: str, *, detail: str = "high", downscale: bool | None = None
+    ) -> EncodedImage:
+        """Encode an image, reusing the payload while the file is unchanged.
+
+        Payloads are cached in memory by path, mtime and size. With `downscale`
+        (default `AIGEN_IMAGE_DOWNSCALE`) and Pillow installed, images are
+        shrunk to what the model sees at `detail` and recompressed; those
+        results are also kept on disk so reruns skip the resize.
+        """
+        if downscale is None:
+            downscale = cls._config.image_downscale
+        if downscale and Image is None:
+            if not cls._warned_no_pillow:
+                cls._warned_no_pillow = True
+                LOGGER.warning("Pillow is not installed; images are not downscaled")
+            downscale = False
+
+        path = Path(image_path).resolve()
+        stat = path.stat()
+        key = (
+            str(path),
+            stat.st_mtime_ns,
+            stat.st_size,
+            cls._detail_level(detail) if downscale else None,
+        )
+        with cls._cache_lock:
+            cached = cls._cache.get(key)
+            if cached is not None:
+                cls._cache.move_to_end(key)
+                return cached
+
+        encoded = cls._load(path, key, downscale)
+        cls._remember(key, encoded)
+        return encoded
+
+    @classmethod
+    def encode_many(
+        cls,
+        image_paths: list[str],
+        *,
+        detail: str = "high",
+        downscale: bool | None = None,
+    ) -> list[EncodedImage]:
+        """Encode several images, reading and resizing them in parallel.
+
+        Results keep the order of `image_paths`. Up to
+        `AIGEN_IMAGE_ENCODE_WORKERS` images are processed at once.
+        """
+        workers = cls._config.image_encode_workers
+        if len(image_paths) < 2 or workers < 2:
+            return [
+                cls.encode(path, detail=detail, downscale=downscale)
+                for path in image_paths
+            ]
+        executor = cls._shared_executor(workers)
+        futures = [
+            # Copy the context so file reads count toward the running step.
+            executor.submit(
+                contextvars.copy_context().run,
+                cls.encode,
+                path,
+                detail=detail,
+                downscale=downscale,
+            )
+            for path in image_paths
+        ]
+        return [future.result() for future in futures]
+
+    @classmethod
+    def _shared_executor(cls, workers: int) -> ThreadPoolExecutor:
+        with cls._cache_lock:
+            if cls._executor is None or cls._executor_workers != workers:
+                if cls._executor is not None:
+                    # Let queued encodes finish, then release the old threads.
+                    cls._executor.shutdown(wait=False)
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="aigen-image"
+                )
+                cls._executor_workers = workers
+            return cls._executor
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._cache_lock:
+            cls._cache.clear()
+            cls._cache_bytes = 0
+
+    @staticmethod
+    def _detail_level(detail: str) -> str:
+        return "low" if detail == "low" else "high"
+
+    @staticmethod
+    def target_size(width: int, height: int, detail: str) -> tuple[int, int]:
+        """Largest size the model uses for an image at `detail`."""
+        if ImageEncoder._detail_level(detail) == "low":
+            scale = min(1.0, LOW_DETAIL_MAX_SIDE / max(width, height))
+        else:
+            scale = min(1.0, HIGH_DETAIL_MAX_SIDE / max(width, height))
+            scale *= min(1.0, HIGH_DETAIL_MAX_SHORT_SIDE / (min(width, height) * scale))
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    @classmethod
+    def _load(cls, path: Path, key: tuple, downscale: bool) -> EncodedImage:
+        mime_type = cls.get_mime_type(str(path))
+        if not downscale:
+            return EncodedImage(mime_type, cls.encode_image(str(path)))
+
+        disk_cache = cls._shared_disk_cache()
+        disk_key = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        cached = disk_cache.get(disk_key)
+        if cached is not None and "\n" in cached:
+            cached_mime, data = cached.split("\n", 1)
+            return EncodedImage(cached_mime, data)
+
+        raw = path.read_bytes()
+        record_io(bytes_read=len(raw))
+        resized = cls._downscale(raw, key[3], str(path))
+        if resized is not None:
+            raw, mime_type = resized
+        encoded = EncodedImage(mime_type, base64.b64encode(raw).decode("utf-8"))
+        try:
+            disk_cache.put(disk_key, f"{encoded.mime_type}\n{encoded.data}")
+        except OSError as error:
+            LOGGER.warning(
+                "Could not write image cache entry",
+                cache_dir=str(disk_cache.cache_dir),
+                error=str(error),
+            )
+        return encoded
+
+    @staticmethod
+    def _downscale(
+        raw: bytes, detail: str, image_path: str
+    ) -> tuple[bytes, str] | None:
+        """Resize and recompress `raw`, or return None if nothing is gained."""
+        try:
+            with Image.open(io.BytesIO(raw)) as image:
+                if getattr(image, "is_animated", False):
+                    return None
+                size = ImageEncoder.target_size(*image.size, detail)
+                resized = size != image.size
+                if not resized and image.format == "JPEG":
+                    return None
+                converted = image.resize(size, Image.LANCZOS) if resized else image
+                has_alpha = "A" in converted.getbands() or (
+                    converted.mode == "P" and "transparency" in converted.info
+                )
+                output = io.BytesIO()
+                if has_alpha:
+                    converted.save(output, "PNG", optimize=True)
+                    mime_type = "image/png"
+                else:
+                    converted.convert("RGB").save(
+                        output, "JPEG", quality=JPEG_QUALITY, optimize=True
+                    )
+                    mime_type = "image/jpeg"
+        except (OSError, ValueError) as error:
+            LOGGER.warning(
+                "Could not downscale image; sending original",
+                image_path=image_path,
+                error=str(error),
+            )
+            return None
+
+        data = output.getvalue()
+        if not resized and len(data) >= len(raw):
+            return None
+        return data, mime_type
+
+    @classmethod
+    def _shared_disk_cache(cls) -> ResponseCache:
+        cache_dir = cls._config.get_cache_dir() / "images"
+        with cls._cache_lock:
+            if cls._disk_cache is None or cls._disk_cache.cache_dir != cache_dir:
+                cls._disk_cache = ResponseCache(
+                    cache_dir,
+                    max_bytes=int(cls._config.image_disk_cache_max_mb * 1024 * 1024)
+                    or None,
+                )
+            return cls._disk_cache
+
+    @classmethod
+    def _remember(cls, key: tuple, encoded: EncodedImage) -> None:
+        max_bytes = int(cls._config.image_cache_max_mb * 1024 * 1024)
+        size = len(encoded.data)
+        if size > max_bytes:
+            return
+        with cls._cache_lock:
+            if key in cls._cache:
+                return
+            cls._cache[key] = encoded
+            cls._cache_bytes += size
+            while cls._cache_bytes > max_bytes:
+                _, evicted = cls._cache.popitem(last=False)
+                cls._cache_bytes -= len(evicted.data)
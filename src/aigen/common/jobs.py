@@ -0,0 +1,202 @@
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import structlog
+import yaml
+
+from aigen.common.hooks import NodeHook
+from aigen.common.pipeline import process_actions
+from aigen.common.plan import ExecutionPlan
+
+LOGGER = structlog.get_logger(__name__)
+
+
+@dataclass
+class JobItemResult:
+    """Outcome of running the plan on one item of a job."""
+
+    index: int
+    ok: bool
+    duration_seconds: float
+    outputs: dict[str, Any] | None = None
+    error: str | None = None
+    traceback: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def compile_batch_plan(yaml_text: str, var_name: str) -> ExecutionPlan:
+    """Compile pipeline YAML once for items that bind `var_name` per context.
+
+    `{{var_name}}` is an alias for `${var_name}`. The value is rendered into
+    node params at run time, as text; a placeholder in a node name or a param
+    key is not substituted.
+    """
+    yaml_text = yaml_text.replace(f"{{{{{var_name}}}}}", f"${{{var_name}}}")
+    return ExecutionPlan.compile(yaml.safe_load(yaml_text) or [])
+
+
+class Job:
+    """A plan run over many contexts; results are recorded as items finish."""
+
+    def __init__(self, job_id: str, total: int) -> None:
+        self._id = job_id
+        self._total = total
+        self._created_at = time.time()
+        self._results: list[JobItemResult] = []
+        self._futures: list[Future] = []
+        self._cancelled = False
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        if total == 0:
+            self._finished.set()
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    @property
+    def status(self) -> str:
+        if self._finished.is_set():
+            return "cancelled" if self._cancelled else "completed"
+        return "cancelling" if self._cancelled else "running"
+
+    def progress(self) -> dict[str, Any]:
+        with self._lock:
+            finished = len(self._results)
+            succeeded = sum(1 for result in self._results if result.ok)
+        return {
+            "job_id": self._id,
+            "status": self.status,
+            "total": self._total,
+            "finished": finished,
+            "succeeded": succeeded,
+            "failed": finished - succeeded,
+            "created_at": self._created_at,
+        }
+
+    def results(self, offset: int = 0) -> list[dict[str, Any]]:
+        """Finished items in completion order, starting at `offset`."""
+        with self._lock:
+            return [result.to_dict() for result in self._results[offset:]]
+
+    def cancel(self) -> None:
+        """Skip items that have not started; running items still finish."""
+        with self._lock:
+            self._cancelled = True
+            futures = list(self._futures)
+        cancelled = sum(1 for future in futures if future.cancel())
+        LOGGER.info("Job cancelled", job_id=self._id, skipped=cancelled)
+        self._check_finished()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def _add_future(self, future: Future) -> None:
+        with self._lock:
+            self._futures.append(future)
+
+    def _record(self, result: JobItemResult) -> None:
+        with self._lock:
+            self._results.append(result)
+
+    def _check_finished(self) -> None:
+        with self._lock:
+            done = len(self._futures) == self._total and all(
+                future.done() for future in self._futures
+            )
+        if done:
+            self._finished.set()
+
+
+class JobQueue:
+    """Runs jobs on one bounded worker pool shared by all jobs.
+
+    Only the most recent `max_jobs` jobs are kept for progress queries.
+    `hook` receives the node events of every item, e.g. for metrics.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 4,
+        max_jobs: int = 100,
+        hook: NodeHook | None = None,
+    ) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="aigen-job"
+        )
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._max_jobs = max_jobs
+        self._hook = hook
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        plan: ExecutionPlan,
+        contexts: list[dict[str, Any]],
+        *,
+        step_workers: int = 1,
+    ) -> Job:
+        """Enqueue one item per context and return immediately."""
+        job = Job(uuid.uuid4().hex, len(contexts))
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._max_jobs:
+                self._jobs.popitem(last=False)
+
+        for index, context in enumerate(contexts):
+            future = self._executor.submit(
+                self._run_item, job, index, plan, context, step_workers, self._hook
+            )
+            job._add_future(future)
+            future.add_done_callback(lambda _, job=job: job._check_finished())
+        LOGGER.info("Job submitted", job_id=job.id, total=job.total)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    @staticmethod
+    def _run_item(
+        job: Job,
+        index: int,
+        plan: ExecutionPlan,
+        context: dict[str, Any],
+        step_workers: int,
+        hook: NodeHook | None = None,
+    ) -> None:
+        started = time.perf_counter()
+        try:
+            process_actions(context, plan, max_workers=step_workers, hook=hook)
+            result = JobItemResult(
+                index=index,
+                ok=True,
+                duration_seconds=round(time.perf_counter() - started, 3),
+                outputs=context,
+            )
+        except Exception as error:
+            LOGGER.exception("Job item failed", job_id=job.id, index=index)
+            result = JobItemResult(
+                index=index,
+                ok=False,
+                duration_seconds=round(time.perf_counter() - started, 3),
+                error=str(error),
+                traceback=traceback.format_exc(),
+            )
+        job._record(result)
@@ -0,0 +1,105 @@
+from typing import Any
+
+_TYPES: dict[str, tuple[type, ...]] = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+
+def _matches_type(value: Any, name: str) -> bool:
+    if name not in _TYPES:
+        raise ValueError(f"Unsupported JSON schema type: {name}")
+    if isinstance(value, bool) and name in ("integer", "number"):
+        return False
+    if name == "integer" and isinstance(value, float):
+        return value.is_integer()
+    return isinstance(value, _TYPES[name])
+
+
+def _resolve_ref(ref: str, root: dict[str, Any]) -> dict[str, Any]:
+    if not ref.startswith("#/"):
+        raise ValueError(f"Only local schema references are supported: {ref}")
+    target: Any = root
+    for part in ref[2:].split("/"):
+        part = part.replace("~1", "/").replace("~0", "~")
+        if not isinstance(target, dict) or part not in target:
+            raise ValueError(f"Unresolved schema reference: {ref}")
+        target = target[part]
+    return target
+
+
+def _errors(
+    value: Any, schema: dict[str, Any], root: dict[str, Any], path: str
+) -> list[str]:
+    if "$ref" in schema:
+        return _errors(value, _resolve_ref(schema["$ref"], root), root, path)
+    if "anyOf" in schema:
+        if not any(
+            not _errors(value, option, root, path) for option in schema["anyOf"]
+        ):
+            return [f"{path}: does not match any allowed schema"]
+        return []
+
+    expected = schema.get("type")
+    if expected is not None:
+        names = expected if isinstance(expected, list) else [expected]
+        if not any(_matches_type(value, name) for name in names):
+            return [
+                f"{path}: expected {' or '.join(names)}, got {type(value).__name__}"
+            ]
+    if "enum" in schema and value not in schema["enum"]:
+        return [f"{path}: {value!r} is not one of {schema['enum']!r}"]
+    if "const" in schema and value != schema["const"]:
+        return [f"{path}: expected {schema['const']!r}"]
+
+    errors: list[str] = []
+    if isinstance(value, dict):
+        properties = schema.get("properties") or {}
+        for key in schema.get("required") or ():
+            if key not in value:
+                errors.append(f"{path}: missing required property '{key}'")
+        additional = schema.get("additionalProperties", True)
+        for key, item in value.items():
+            if key in properties:
+                errors.extend(_errors(item, properties[key], root, f"{path}.{key}"))
+            elif additional is False:
+                errors.append(f"{path}: unexpected property '{key}'")
+            elif isinstance(additional, dict):
+                errors.extend(_errors(item, additional, root, f"{path}.{key}"))
+    elif isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            errors.append(f"{path}: expected at least {schema['minItems']} items")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            errors.append(f"{path}: expected at most {schema['maxItems']} items")
+        items = schema.get("items")
+        if isinstance(items, dict):
+            for index, item in enumerate(value):
+                errors.extend(_errors(item, items, root, f"{path}[{index}]"))
+    return errors
+
+
+def validate_json(value: Any, schema: dict[str, Any]) -> None:
+    """Check `value` against the JSON schema subset used for structured outputs.
+
+    Supports `type`, `properties`, `required`, `additionalProperties`, `items`,
+    `minItems`/`maxItems`, `enum`, `const`, `anyOf` and local `$ref`s. Raises
+    `ValueError` listing every mismatch.
+    """
+    errors = _errors(value, schema, schema, "$")
+    if errors:
+        raise ValueError("JSON does not match schema: " + "; ".join(errors))
+
+
+def json_schema_format(
+    schema: dict[str, Any], *, name: str = "response", strict: bool = True
+) -> dict[str, Any]:
+    """Build a chat completions `response_format` for `schema`."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "schema": schema, "strict": strict},
+    }
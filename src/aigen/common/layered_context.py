@@ -0,0 +1,103 @@
+from collections.abc import ItemsView, Iterator, KeysView, Mapping, ValuesView
+from types import MappingProxyType
+from typing import Any
+
+_MISSING = object()
+
+
+class LayeredContext(dict):
+    """Context dict that falls back to a shared, read-only base.
+
+    The dict itself holds the per-article values; keys it lacks are looked up
+    in `base`, so the base can be shared by every article of a run without
+    being copied into each context. Writes never reach the base, and deleting
+    a key that only exists in the base raises `KeyError`. Iteration, `items()`,
+    `len()`, equality and JSON serialization see the merged view (except
+    `json.dumps` of a context with no values of its own, which C-encodes as
+    `{}`; serialize `dict(context)` when that can happen).
+    """
+
+    def __init__(
+        self,
+        overlay: Mapping[str, Any] | None = None,
+        base: Mapping[str, Any] | None = None,
+    ) -> None:
+        super().__init__(overlay or {})
+        if base is None:
+            base = MappingProxyType({})
+        elif not isinstance(base, MappingProxyType):
+            base = MappingProxyType(base)
+        self._base = base
+
+    @property
+    def overlay(self) -> dict[str, Any]:
+        """Copy of the values set on this context, without the base."""
+        return dict(super().items())
+
+    @property
+    def base(self) -> Mapping[str, Any]:
+        return self._base
+
+    def __missing__(self, key: str) -> Any:
+        return self._base[key]
+
+    def __contains__(self, key: object) -> bool:
+        return super().__contains__(key) or key in self._base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from super().__iter__()
+        for key in self._base:
+            if not super().__contains__(key):
+                yield key
+
+    def __len__(self) -> int:
+        return super().__len__() + sum(
+            1 for key in self._base if not dict.__contains__(self, key)
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({super().__repr__()}, base={dict(self._base)!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> KeysView:  # type: ignore[override]
+        return KeysView(self)
+
+    def items(self) -> ItemsView:  # type: ignore[override]
+        return ItemsView(self)
+
+    def values(self) -> ValuesView:  # type: ignore[override]
+        return ValuesView(self)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: str, default: Any = _MISSING) -> Any:
+        if super().__contains__(key):
+            return super().pop(key)
+        if default is not _MISSING:
+            return default
+        raise KeyError(key)
+
+    def copy(self) -> "LayeredContext":
+        return type(self)(self.overlay, self._base)
+
+    def __reduce__(self):
+        return type(self), (self.overlay, dict(self._base))
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
 from typing import Any
 
 from pydantic_settings import BaseSettings
@@ -6,6 +8,36 @@ from pydantic_settings import BaseSettings
 from aigen.config import AigenConfig
 
 
+@dataclass
+class GenerationStats:
+    """Timing and usage of one `generate` call."""
+
+    latency_seconds: float
+    ttft_seconds: float | None = None
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    cached_tokens: int | None = None
+    streamed: bool = False
+    retries: int = 0
+
+    @property
+    def cached_ratio(self) -> float | None:
+        """Share of prompt tokens served from the provider's prefix cache."""
+        if not self.prompt_tokens or self.cached_tokens is None:
+            return None
+        return self.cached_tokens / self.prompt_tokens
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """Output rate, measured after the first token when streaming."""
+        if not self.completion_tokens:
+            return None
+        duration = self.latency_seconds - (self.ttft_seconds or 0.0)
+        if duration <= 0:
+            return None
+        return self.completion_tokens / duration
+
+
 class LLMClient(ABC):
     """Base client for LLM interactions."""
 
@@ -17,6 +49,7 @@ class LLMClient(ABC):
         self._model: str | None = model
         self._client: Any | None = None
         self._max_tokens: int | None = max_tokens
+        self.last_stats: GenerationStats | None = None
 
     @property
     def model(self) -> str | None:
@@ -30,3 +63,19 @@ class LLMClient(ABC):
     def generate(
         self, content: list[dict[str, Any]] | dict[str, Any] | str, **kwargs
     ) -> str | None: ...
+
+
+_CLIENT_FACTORY: Callable[..., LLMClient] | None = None
+
+
+def set_llm_client_factory(factory: Callable[..., LLMClient] | None) -> None:
+    """Make LLM nodes build clients with `factory(model=..., max_tokens=...)`.
+
+    Applies process-wide (all worker threads); `None` restores the default.
+    """
+    global _CLIENT_FACTORY
+    _CLIENT_FACTORY = factory
+
+
+def get_llm_client_factory() -> Callable[..., LLMClient] | None:
+    return _CLIENT_FACTORY
@@ -1,31 +1,154 @@
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from typing import Any
 
-from aigen.common.utils import replace_vars
+from aigen.common.utils import CompiledTemplate, compile_template, find_vars
+
+# Pseudo-variables for side effects outside the context, so that file and
+# console access keep their relative order when steps run in parallel.
+FILES_RESOURCE = "@files"
+STDOUT_RESOURCE = "@stdout"
+
+
+@dataclass(frozen=True)
+class NodeDependencies:
+    """Context variables a node reads and writes, used to order parallel steps.
+
+    `None` means the node may touch any variable. `renders` lists variables whose
+    values are rendered as `${var}` templates at run time, `value_refs` maps a
+    written variable to the variables referenced by the template it receives
+    (`None` if unknown; omitted if it is plain text) and `copies` maps a written
+    variable to the variable it is copied from.
+    """
+
+    reads: frozenset[str] | None = None
+    writes: frozenset[str] | None = None
+    renders: frozenset[str] = frozenset()
+    value_refs: Mapping[str, frozenset[str] | None] = field(default_factory=dict)
+    copies: Mapping[str, str] = field(default_factory=dict)
 
 
 class Node(ABC):
+    """Base class for instruction steps.
+
+    Param templates are compiled once in `__init__` and node instances may be
+    shared across contexts and threads, so `run` must keep per-run state local.
+    """
+
     def __init__(self, params: dict[str, Any]) -> None:
         self._params: dict[str, Any] = params.copy()
+        self._compiled_params: dict[str, Any] = {}
+        for key, value in self._params.items():
+            compiled = self._compile_value(value)
+            if compiled is not None:
+                self._compiled_params[key] = compiled
+
+    @property
+    def templated_params(self) -> tuple[str, ...]:
+        """Names of params that contain `${var}` references."""
+        return tuple(self._compiled_params)
 
     @property
     def params(self) -> dict[str, Any]:
         return self._params
 
-    def format_params(self, context: dict[str, Any]) -> dict[str, Any]:
-        return {
-            key: self._format_value(value, context)
-            for key, value in self._params.items()
-        }
+    @classmethod
+    def dependencies(cls, params: dict[str, Any]) -> NodeDependencies:
+        """Variables touched by a step with `params`; unknown by default."""
+        return NodeDependencies()
+
+    @classmethod
+    def shared_default(cls, params: dict[str, Any]) -> tuple[str, Any] | None:
+        """Variable and value a step only sets when missing, if they are static.
+
+        Such defaults are the same for every context, so a plan can keep them
+        once in a shared base instead of writing them into each context.
+        """
+        return None
+
+    @classmethod
+    def estimate_seconds(cls, params: dict[str, Any]) -> float:
+        """Rough duration of a step, used to find the critical path."""
+        return 0.001
 
-    def _format_value(self, value: Any, context: dict[str, Any]) -> Any:
+    @staticmethod
+    def referenced_vars(value: Any) -> frozenset[str]:
+        """Return `${var}` names used anywhere in a (nested) param value."""
         if isinstance(value, str):
-            return replace_vars(value, context)
+            return frozenset(find_vars(value))
+        if isinstance(value, list):
+            return frozenset().union(*(Node.referenced_vars(v) for v in value))
+        if isinstance(value, dict):
+            return frozenset().union(*(Node.referenced_vars(v) for v in value.values()))
+        return frozenset()
+
+    @staticmethod
+    def variable_names(*values: Any) -> frozenset[str] | None:
+        """Return param values used as variable names, or None if templated."""
+        names = set()
+        for value in values:
+            if value is None or value == "":
+                continue
+            if not isinstance(value, str) or find_vars(value):
+                return None
+            names.add(value)
+        return frozenset(names)
+
+    @staticmethod
+    def combine_reads(
+        names: frozenset[str] | None, *extra: frozenset[str]
+    ) -> frozenset[str] | None:
+        if names is None:
+            return None
+        return names.union(*extra)
+
+    @classmethod
+    def _compile_value(cls, value: Any) -> Any:
+        """Compile a param value, or return None if it has no `${var}`."""
+        if isinstance(value, str):
+            compiled = compile_template(value)
+            return compiled if compiled.variables else None
+        if isinstance(value, list):
+            items = [cls._compile_value(item) for item in value]
+            if all(item is None for item in items):
+                return None
+            return [
+                original if item is None else item
+                for original, item in zip(value, items)
+            ]
+        if isinstance(value, dict):
+            entries = {key: cls._compile_value(item) for key, item in value.items()}
+            if all(item is None for item in entries.values()):
+                return None
+            return {
+                key: value[key] if item is None else item
+                for key, item in entries.items()
+            }
+        return None
+
+    def format_params(self, context: dict[str, Any]) -> dict[str, Any]:
+        params = dict(self._params)
+        if not self._compiled_params:
+            return params
+        # The context does not change while params are formatted, so list/dict
+        # values referenced by several params are serialized once.
+        json_cache: dict[int, str] = {}
+        for key, compiled in self._compiled_params.items():
+            params[key] = self._render_value(compiled, context, json_cache)
+        return params
+
+    def _render_value(
+        self, value: Any, context: dict[str, Any], json_cache: dict[int, str]
+    ) -> Any:
+        if isinstance(value, CompiledTemplate):
+            return value.render(context, json_cache)
         if isinstance(value, list):
-            return [self._format_value(item, context) for item in value]
+            return [self._render_value(item, context, json_cache) for item in value]
         if isinstance(value, dict):
             return {
-                key: self._format_value(item, context) for key, item in value.items()
+                key: self._render_value(item, context, json_cache)
+                for key, item in value.items()
             }
         return value
 
@@ -1,19 +1,43 @@
+from collections.abc import Collection
 from typing import Any
 
 import aigen.nodes  # noqa: F401  # Ensure node decorators populate NODE_REGISTRY.
 
+from aigen.common.graph import PipelineGraph
+from aigen.common.hooks import NodeHook
 from aigen.common.node_registry import NODE_REGISTRY
+from aigen.common.plan import ExecutionPlan
 
 
 def is_node_registered(node: str) -> bool:
     return node in NODE_REGISTRY
 
 
-def process_actions(context: dict[str, Any], instructions: list[dict]) -> None:
-    for action in instructions:
-        node_name = action.get("node")
-        if not node_name or not is_node_registered(node_name):
-            raise ValueError(f"Node '{node_name}' is not registered.")
-        params = action.get("params", {})
-        node = NODE_REGISTRY[node_name](params)
-        node.run(context)
+def process_actions(
+    context: dict[str, Any],
+    instructions: list[dict] | ExecutionPlan,
+    *,
+    max_workers: int = 1,
+    hook: NodeHook | None = None,
+    completed: Collection[int] = (),
+) -> None:
+    """Run instruction steps against `context`.
+
+    Pass an `ExecutionPlan` to reuse compiled instructions across contexts.
+    With `max_workers` > 1, independent steps run concurrently following the
+    inferred dependency graph; the resulting context matches a sequential run.
+    `hook` receives a `NodeEvent` when each step starts and finishes; it may be
+    called from worker threads. Steps whose index is in `completed` are skipped,
+    e.g. when resuming from a checkpoint.
+    """
+    plan = (
+        instructions
+        if isinstance(instructions, ExecutionPlan)
+        else ExecutionPlan.compile(instructions)
+    )
+    if max_workers > 1:
+        PipelineGraph.build(plan, context).run(
+            context, max_workers=max_workers, hook=hook, completed=completed
+        )
+        return
+    plan.run(context, hook=hook, completed=completed)
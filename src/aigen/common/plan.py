@@ -0,0 +1,154 @@
+import copy
+import hashlib
+import json
+from collections.abc import Collection, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+import aigen.nodes  # noqa: F401  # Ensure node decorators populate NODE_REGISTRY.
+from aigen.common.hooks import NodeHook, run_step
+from aigen.common.layered_context import LayeredContext
+from aigen.common.node import Node, NodeDependencies
+from aigen.common.node_registry import NODE_REGISTRY
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    """A compiled instruction step: its node instance and static analysis."""
+
+    index: int
+    node_name: str
+    node: Node
+    dependencies: NodeDependencies
+    estimated_seconds: float
+
+    @property
+    def params(self) -> dict[str, Any]:
+        return self.node.params
+
+
+class ExecutionPlan:
+    """Instructions validated and compiled once, then run on many contexts.
+
+    Node classes are resolved, param templates parsed and dependencies
+    analysed at compile time; running the plan only executes the nodes.
+    """
+
+    def __init__(self, steps: tuple[PlanStep, ...]) -> None:
+        self._steps = steps
+        self._shared_defaults = MappingProxyType(_shared_defaults(steps))
+        self._digest: str | None = None
+
+    @classmethod
+    def compile(cls, instructions: list[dict]) -> "ExecutionPlan":
+        if not isinstance(instructions, list):
+            raise TypeError("Instructions must be a list of steps.")
+
+        steps: list[PlanStep] = []
+        for index, action in enumerate(instructions):
+            node_name = action.get("node") if isinstance(action, dict) else None
+            if not node_name or node_name not in NODE_REGISTRY:
+                raise ValueError(f"Node '{node_name}' is not registered.")
+            # Deep copy so later edits to the instructions cannot leak in.
+            params = copy.deepcopy(action.get("params", {}))
+            node_cls: type[Node] = NODE_REGISTRY[node_name]
+            steps.append(
+                PlanStep(
+                    index=index,
+                    node_name=node_name,
+                    node=node_cls(params),
+                    dependencies=node_cls.dependencies(params),
+                    estimated_seconds=node_cls.estimate_seconds(params),
+                )
+            )
+        return cls(tuple(steps))
+
+    @property
+    def steps(self) -> tuple[PlanStep, ...]:
+        return self._steps
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the steps' node names and params.
+
+        Plans compiled from equal instructions share a digest, so saved state
+        such as a checkpoint can tell whether it belongs to this plan.
+        """
+        if self._digest is None:
+            data = json.dumps(
+                [[step.node_name, step.params] for step in self._steps],
+                sort_keys=True,
+                default=str,
+            )
+            self._digest = hashlib.sha256(data.encode()).hexdigest()
+        return self._digest
+
+    @property
+    def shared_defaults(self) -> Mapping[str, Any]:
+        """Static `if_missing` defaults that hold for every context."""
+        return self._shared_defaults
+
+    def new_context(self, values: dict[str, Any] | None = None) -> LayeredContext:
+        """Context whose `values` overlay the plan's shared defaults.
+
+        Running the plan on it gives the same result as running it on a plain
+        dict of `values`, without copying the defaults into each context.
+        """
+        return LayeredContext(values, self._shared_defaults)
+
+    def run(
+        self,
+        context: dict[str, Any],
+        *,
+        hook: NodeHook | None = None,
+        completed: Collection[int] = (),
+    ) -> None:
+        """Run every step in order against `context`, reporting to `hook`.
+
+        Steps listed in `completed` already ran on this context and are skipped.
+        """
+        for step in self._steps:
+            if step.index not in completed:
+                run_step(step, context, hook)
+
+
+def _shared_defaults(steps: tuple[PlanStep, ...]) -> dict[str, Any]:
+    # A default may only be set up front if no earlier step could read the
+    # variable while it is still missing, directly or through a `${var}` left
+    # in a value it renders. `refs` holds the names a variable's value may
+    # reference, or None if unknown (e.g. values from the row or a file).
+    defaults: dict[str, Any] = {}
+    read_before: set[str] = set()
+    refs: dict[str, frozenset[str] | None] = {}
+
+    def value_refs(names: frozenset[str] | None) -> frozenset[str] | None:
+        # A missing variable renders as written, so both the names and
+        # whatever their values reference may end up in the text.
+        if names is None or any(refs.get(name) is None for name in names):
+            return None
+        return names.union(*(refs[name] for name in names))
+
+    for step in steps:
+        default = type(step.node).shared_default(step.params)
+        if default is not None and default[0] not in read_before:
+            defaults.setdefault(*default)
+        deps = step.dependencies
+        if deps.reads is None or deps.writes is None:
+            break
+        rendered = [refs.get(var) for var in deps.renders]
+        if any(var_refs is None for var_refs in rendered):
+            break
+        read_before.update(deps.reads, *rendered)
+        refs.update(
+            {
+                var: refs.get(deps.copies[var])
+                if var in deps.copies
+                else value_refs(deps.value_refs.get(var, frozenset()))
+                for var in deps.writes
+            }
+        )
+    return defaults
@@ -30,7 +30,9 @@ class Prompt(ABC):
     def add_text(self, text: str) -> None: ...
 
     @abstractmethod
-    def add_image(self, image_path: str, detailed=True) -> None: ...
+    def add_image(
+        self, image_path: str, detailed=True, downscale: bool | None = None
+    ) -> None: ...
 
     def to_dict(
         self, type_filter: str | list[str] | None = None
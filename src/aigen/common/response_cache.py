@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from aigen.config import AigenConfig
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of LLM responses.
+
+    Entries are keyed by a hash of the normalized request and evicted by age
+    (`ttl_seconds`) and, least recently used first, by total size (`max_bytes`).
+    """
+
+    _config = AigenConfig()
+    _shared: "ResponseCache | None" = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        *,
+        max_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        self._cache_dir = Path(cache_dir)
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def shared(cls) -> "ResponseCache":
+        """Process-wide cache under `AigenConfig.get_cache_dir()`."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(
+                    cls._config.get_cache_dir() / "responses",
+                    max_bytes=int(cls._config.response_cache_max_mb * 1024 * 1024)
+                    or None,
+                    ttl_seconds=cls._config.response_cache_ttl_seconds or None,
+                )
+            return cls._shared
+
+    @classmethod
+    def default_mode(cls) -> str:
+        return cls._config.response_cache
+
+    @property
+    def cache_dir(self) -> Path:
+        return self._cache_dir
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+    @staticmethod
+    def make_key(request: dict[str, Any]) -> str:
+        """Hash a request; key order and whitespace do not affect the key."""
+        normalized = json.dumps(
+            request, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+        )
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self._cache_dir / key[:2] / f"{key}.json"
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return bool(self._ttl_seconds) and now - created_at > self._ttl_seconds
+
+    def _read_entry(self, path: Path) -> dict[str, Any] | None:
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except OSError:
+            return None
+        except ValueError:
+            entry = None
+        if not isinstance(entry, dict):
+            # Writes are atomic, so anything but a JSON object is corrupt.
+            self._remove(path)
+            return None
+        return entry
+
+    def get(self, key: str) -> str | None:
+        path = self._entry_path(key)
+        now = time.time()
+        entry = self._read_entry(path)
+        if entry is not None and self._is_expired(entry.get("created_at", 0), now):
+            self._remove(path)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        try:
+            # mtime doubles as the last-used time for LRU eviction.
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        return entry.get("response")
+
+    def put(self, key: str, response: str) -> None:
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps(
+            {"created_at": time.time(), "response": response}, ensure_ascii=False
+        ).encode("utf-8")
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(payload)
+        previous_size = path.stat().st_size if path.exists() else 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(payload) - previous_size
+            # Checked and evicted under one lock, so concurrent writers do not
+            # both scan and evict for the same overflow.
+            if (
+                self._max_bytes is not None
+                and self._current_size_locked() > self._max_bytes
+            ):
+                self._evict_locked()
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones until under size."""
+        with self._lock:
+            return self._evict_locked()
+
+    def _evict_locked(self) -> int:
+        now = time.time()
+        removed = 0
+        entries = []
+        for path in self._cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = 0
+        survivors = []
+        for mtime, size, path in entries:
+            # Entries are never created after their last use, so an entry
+            # unused for longer than the TTL is expired; the rest are
+            # checked against their creation time on read.
+            if self._ttl_seconds and now - mtime > self._ttl_seconds:
+                if self._remove(path):
+                    removed += 1
+                continue
+            survivors.append((mtime, size, path))
+            total += size
+
+        if self._max_bytes is not None:
+            for _, size, path in sorted(survivors, key=lambda e: e[0]):
+                if total <= self._max_bytes:
+                    break
+                if self._remove(path):
+                    removed += 1
+                    total -= size
+        self._total_bytes = total
+        return removed
+
+    def _current_size_locked(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(
+                path.stat().st_size for path in self._cache_dir.glob("*/*.json")
+            )
+        return self._total_bytes
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
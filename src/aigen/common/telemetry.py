@@ -0,0 +1,248 @@
+import json
+import math
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+from aigen.common.hooks import NODE_FINISHED, NodeEvent, NodeHook
+
+# Counters summed per node type, in report and table order.
+_TOTALS = (
+    "llm_calls",
+    "llm_retries",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+    "bytes_read",
+    "bytes_written",
+)
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Linearly interpolated `q` percentile (0-100) of `values`."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class _NodeStats:
+    def __init__(self, max_samples: int | None) -> None:
+        self.runs = 0
+        self.failed = 0
+        self.wall_seconds = 0.0
+        self.llm_seconds = 0.0
+        self.llm_runs = 0
+        self.output_bytes = 0
+        self.totals = dict.fromkeys(_TOTALS, 0)
+        self.durations: deque[float] = deque(maxlen=max_samples)
+        self.llm_durations: deque[float] = deque(maxlen=max_samples)
+
+    def add(self, event: NodeEvent) -> None:
+        metrics = event.metrics
+        self.runs += 1
+        self.failed += 0 if event.ok else 1
+        self.wall_seconds += event.duration_seconds or 0.0
+        self.llm_seconds += metrics.llm_seconds
+        self.output_bytes += event.output_bytes or 0
+        for name in _TOTALS:
+            self.totals[name] += getattr(metrics, name)
+        self.durations.append(event.duration_seconds or 0.0)
+        if metrics.llm_calls:
+            self.llm_runs += 1
+            self.llm_durations.append(metrics.llm_seconds)
+
+    def to_dict(self) -> dict[str, Any]:
+        durations = list(self.durations)
+        llm_durations = list(self.llm_durations)
+        return {
+            "runs": self.runs,
+            "failed": self.failed,
+            "wall_seconds": {
+                "count": self.runs,
+                "total": round(self.wall_seconds, 6),
+                "p50": _round(percentile(durations, 50)),
+                "p95": _round(percentile(durations, 95)),
+                "max": _round(max(durations, default=None)),
+            },
+            "llm_seconds": {
+                "count": self.llm_runs,
+                "total": round(self.llm_seconds, 6),
+                "p50": _round(percentile(llm_durations, 50)),
+                "p95": _round(percentile(llm_durations, 95)),
+            },
+            "output_bytes": self.output_bytes,
+            **self.totals,
+        }
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 6)
+
+
+class RunReport:
+    """Collects node events of a run into per-node-type and per-article totals.
+
+    Use `hook(article)` as the hook of each pipeline run. Percentiles are taken
+    over the last `max_samples` runs of each node type (all runs by default),
+    so a long-lived process can keep one report without growing without bound.
+    """
+
+    def __init__(self, *, max_samples: int | None = None) -> None:
+        self._max_samples = max_samples
+        self._nodes: dict[str, _NodeStats] = {}
+        self._articles: dict[Any, dict[str, Any]] = {}
+        self._started = time.time()
+        self._lock = threading.Lock()
+
+    def hook(self, article: Any = None) -> NodeHook:
+        """Hook recording events under `article` (e.g. the CSV row index)."""
+        return lambda event: self.record(event, article)
+
+    def record(self, event: NodeEvent, article: Any = None) -> None:
+        if event.type != NODE_FINISHED:
+            return
+        with self._lock:
+            stats = self._nodes.get(event.node_name)
+            if stats is None:
+                stats = self._nodes[event.node_name] = _NodeStats(self._max_samples)
+            stats.add(event)
+            if article is None:
+                return
+            totals = self._articles.setdefault(
+                article,
+                {"nodes": 0, "wall_seconds": 0.0, "llm_seconds": 0.0}
+                | dict.fromkeys(_TOTALS, 0),
+            )
+            totals["nodes"] += 1
+            totals["wall_seconds"] += event.duration_seconds or 0.0
+            totals["llm_seconds"] += event.metrics.llm_seconds
+            for name in _TOTALS:
+                totals[name] += getattr(event.metrics, name)
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            nodes = {name: stats.to_dict() for name, stats in self._nodes.items()}
+            articles = [
+                {
+                    "article": article,
+                    **totals,
+                    "wall_seconds": round(totals["wall_seconds"], 6),
+                    "llm_seconds": round(totals["llm_seconds"], 6),
+                }
+                for article, totals in self._articles.items()
+            ]
+        return {
+            "started_at": self._started,
+            "elapsed_seconds": round(time.time() - self._started, 3),
+            "nodes": nodes,
+            "articles": articles,
+        }
+
+    def write_json(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(self.summary(), indent=2, default=str), encoding="utf-8"
+        )
+
+    def format_table(self) -> str:
+        """Per-node-type table with p50/p95 wall time and LLM latency."""
+        header = (
+            f"{'node':<24}{'runs':>6}{'fail':>6}{'p50 s':>9}{'p95 s':>9}"
+            f"{'llm p50':>9}{'llm p95':>9}{'retries':>9}{'prompt':>10}"
+            f"{'cached':>10}{'compl':>10}"
+        )
+        lines = [header, "-" * len(header)]
+        for name, stats in sorted(self.summary()["nodes"].items()):
+            wall = stats["wall_seconds"]
+            llm = stats["llm_seconds"]
+            lines.append(
+                f"{name[:24]:<24}{stats['runs']:>6}{stats['failed']:>6}"
+                f"{_cell(wall['p50'])}{_cell(wall['p95'])}"
+                f"{_cell(llm['p50'])}{_cell(llm['p95'])}"
+                f"{stats['llm_retries']:>9}{stats['prompt_tokens']:>10}"
+                f"{stats['cached_tokens']:>10}{stats['completion_tokens']:>10}"
+            )
+        return "\n".join(lines)
+
+    def to_prometheus(self) -> str:
+        """Render the totals in the Prometheus text exposition format."""
+        nodes = self.summary()["nodes"]
+        lines: list[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples) -> None:
+            lines.append(f"# HELP aigen_{name} {help_text}")
+            lines.append(f"# TYPE aigen_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(
+                    f'{key}="{_escape_label(str(label))}"'
+                    for key, label in labels.items()
+                )
+                lines.append(f"aigen_{name}{{{label_text}}} {_number(value)}")
+
+        metric(
+            "node_runs_total",
+            "counter",
+            "Finished node runs.",
+            [
+                ({"node": name, "status": status}, count)
+                for name, stats in nodes.items()
+                for status, count in (
+                    ("ok", stats["runs"] - stats["failed"]),
+                    ("failed", stats["failed"]),
+                )
+            ],
+        )
+        for name, key, help_text in (
+            ("node_duration_seconds", "wall_seconds", "Node wall time."),
+            ("node_llm_seconds", "llm_seconds", "LLM latency per node run."),
+        ):
+            samples = []
+            for node, stats in nodes.items():
+                values = stats[key]
+                samples.extend(
+                    ({"node": node, "quantile": quantile}, values[field])
+                    for quantile, field in (("0.5", "p50"), ("0.95", "p95"))
+                    if values[field] is not None
+                )
+            metric(name, "summary", help_text, samples)
+            for suffix, field in (("sum", "total"), ("count", "count")):
+                lines.extend(
+                    f'aigen_{name}_{suffix}{{node="{_escape_label(node)}"}} '
+                    f"{_number(stats[key][field])}"
+                    for node, stats in nodes.items()
+                )
+        for total in _TOTALS:
+            metric(
+                f"{total}_total",
+                "counter",
+                f"Sum of {total.replace('_', ' ')} per node type.",
+                [({"node": node}, stats[total]) for node, stats in nodes.items()],
+            )
+        metric(
+            "output_bytes_total",
+            "counter",
+            "Bytes written to the context per node type.",
+            [({"node": node}, stats["output_bytes"]) for node, stats in nodes.items()],
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _cell(value: float | None) -> str:
+    return f"{'-':>9}" if value is None else f"{value:>9.3f}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,42 @@
+import math
+from typing import Any
+
+# Rough OpenAI accounting: ~4 characters per token, a few tokens of framing per
+# message, and a fixed cost per image depending on its detail level.
+CHARS_PER_TOKEN = 4
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+LOW_DETAIL_IMAGE_TOKENS = 85
+HIGH_DETAIL_IMAGE_TOKENS = 765
+
+
+def estimate_text_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def estimate_content_tokens(content: Any) -> int:
+    """Estimate tokens of a message `content` (text or a list of parts)."""
+    if isinstance(content, str):
+        return estimate_text_tokens(content)
+    if not isinstance(content, list):
+        return 0
+    tokens = 0
+    for part in content:
+        if not isinstance(part, dict):
+            continue
+        if part.get("type") == "text":
+            tokens += estimate_text_tokens(str(part.get("text", "")))
+        elif part.get("type") == "image_url":
+            detail = (part.get("image_url") or {}).get("detail")
+            tokens += (
+                LOW_DETAIL_IMAGE_TOKENS if detail == "low" else HIGH_DETAIL_IMAGE_TOKENS
+            )
+    return tokens
+
+
+def estimate_message_tokens(messages: list[dict[str, Any]]) -> int:
+    """Estimate prompt tokens of chat messages without a tokenizer."""
+    tokens = TOKENS_PER_REPLY
+    for message in messages:
+        tokens += TOKENS_PER_MESSAGE + estimate_content_tokens(message.get("content"))
+    return tokens
@@ -1,26 +1,106 @@
 import json
 import re
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any
 
+VAR_PATTERN = r"\$\{(\w+)\}"
+# Very large templates (whole HTML pages) are usually rendered once per article,
+# so caching them would only pin memory.
+MAX_CACHED_TEMPLATE_CHARS = 16 * 1024
 
-def replace_vars(template: str, params: dict, pattern=r"\$\{(\w+)\}") -> str:
-    """Replace ${var} in template with values from params."""
 
-    def repl(match):
-        var_name = match.group(1)
-        if var_name not in params:
-            return match.group(0)
+class CompiledTemplate:
+    """A template parsed once into literal text and `${var}` segments."""
+
+    __slots__ = ("_segments", "_text", "_variables")
+
+    def __init__(self, text: str, pattern: str = VAR_PATTERN) -> None:
+        segments: list[str | tuple[str, str]] = []
+        position = 0
+        for match in re.compile(pattern).finditer(text):
+            if match.start() > position:
+                segments.append(text[position : match.start()])
+            segments.append((match.group(1), match.group(0)))
+            position = match.end()
+        if position < len(text):
+            segments.append(text[position:])
+
+        self._text = text
+        self._segments = tuple(segments)
+        self._variables = tuple(
+            segment[0] for segment in segments if isinstance(segment, tuple)
+        )
+
+    @property
+    def variables(self) -> tuple[str, ...]:
+        """Variable names in order of appearance, including repeats."""
+        return self._variables
+
+    def render(
+        self, params: Mapping[str, Any], json_cache: dict[int, str] | None = None
+    ) -> str:
+        """Substitute known variables; unknown ones are left as written.
+
+        `json_cache` memoizes list/dict serialization by object id and must
+        only be shared while the values it has seen are not mutated.
+        """
+        if not self._variables:
+            return self._text
+
+        parts: list[str] = []
+        for segment in self._segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
+            var_name, raw = segment
+            if var_name not in params:
+                parts.append(raw)
+                continue
+            value = params[var_name]
+            if isinstance(value, (list, dict)):
+                parts.append(_dump_json(value, json_cache))
+            else:
+                parts.append(str(value))
+        return "".join(parts)
 
-        value = params[var_name]
-        if isinstance(value, (list, dict)):
-            return json.dumps(value, ensure_ascii=False)
-        return str(value)
 
-    return re.sub(pattern, repl, template)
+def _dump_json(value: list | dict, json_cache: dict[int, str] | None) -> str:
+    if json_cache is None:
+        return json.dumps(value, ensure_ascii=False)
+    key = id(value)
+    dumped = json_cache.get(key)
+    if dumped is None:
+        dumped = json_cache[key] = json.dumps(value, ensure_ascii=False)
+    return dumped
+
+
+@lru_cache(maxsize=4096)
+def _compile_cached(template: str, pattern: str) -> CompiledTemplate:
+    return CompiledTemplate(template, pattern)
+
+
+def compile_template(template: str, pattern: str = VAR_PATTERN) -> CompiledTemplate:
+    """Return the compiled form of `template`, cached per template (LRU)."""
+    if len(template) > MAX_CACHED_TEMPLATE_CHARS:
+        return CompiledTemplate(template, pattern)
+    return _compile_cached(template, pattern)
+
+
+def replace_vars(
+    template: str,
+    params: Mapping[str, Any],
+    pattern: str = VAR_PATTERN,
+    *,
+    json_cache: dict[int, str] | None = None,
+) -> str:
+    """Replace ${var} in template with values from params."""
+    return compile_template(template, pattern).render(params, json_cache)
 
 
-def find_vars(template: str, pattern=r"\$\{(\w+)\}") -> list[str]:
+def find_vars(template: str, pattern: str = VAR_PATTERN) -> list[str]:
     """Return a list of variable names found in the template."""
-    return re.findall(pattern, template)
+    return list(compile_template(template, pattern).variables)
 
 
 def format_string(template: str, params: dict) -> str:
@@ -11,6 +11,31 @@ class AigenConfig(BaseSettings):
     cache_dir: str = Field(alias="AIGEN_CACHE_DIR", default="")
     config_root_dir: str = Field(alias="CONFIGS_ROOT_DIR", default="")
     openai_api_key: str = Field(alias="OPENAI_API_KEY", default="")
+    openai_base_url: str = Field(alias="OPENAI_BASE_URL", default="")
+    openai_max_connections: int = Field(alias="OPENAI_MAX_CONNECTIONS", default=32)
+    openai_max_keepalive_connections: int = Field(
+        alias="OPENAI_MAX_KEEPALIVE_CONNECTIONS", default=16
+    )
+    openai_rpm_limit: int = Field(alias="OPENAI_RPM_LIMIT", default=0)
+    openai_tpm_limit: int = Field(alias="OPENAI_TPM_LIMIT", default=0)
+    batch_max_requests: int = Field(alias="AIGEN_BATCH_MAX_REQUESTS", default=50000)
+    batch_flush_seconds: float = Field(alias="AIGEN_BATCH_FLUSH_SECONDS", default=2.0)
+    batch_poll_seconds: float = Field(alias="AIGEN_BATCH_POLL_SECONDS", default=30.0)
+    job_workers: int = Field(alias="AIGEN_JOB_WORKERS", default=4)
+    response_cache: str = Field(alias="AIGEN_RESPONSE_CACHE", default="off")
+    response_cache_max_mb: float = Field(
+        alias="AIGEN_RESPONSE_CACHE_MAX_MB", default=512.0
+    )
+    response_cache_ttl_seconds: float = Field(
+        alias="AIGEN_RESPONSE_CACHE_TTL_SECONDS", default=0.0
+    )
+
+    image_downscale: bool = Field(alias="AIGEN_IMAGE_DOWNSCALE", default=False)
+    image_cache_max_mb: float = Field(alias="AIGEN_IMAGE_CACHE_MAX_MB", default=256.0)
+    image_disk_cache_max_mb: float = Field(
+        alias="AIGEN_IMAGE_DISK_CACHE_MAX_MB", default=512.0
+    )
+    image_encode_workers: int = Field(alias="AIGEN_IMAGE_ENCODE_WORKERS", default=4)
 
     def get_cache_dir(self) -> Path:
         """Returns the cache directory path, using a temporary directory if not set."""
@@ -70,3 +70,21 @@ class TemperaturePresets(float, Enum):
     ANALYSIS = 0.3
     CREATIVITY = 0.85
     GENERAL = 0.7
+
+
+class CacheMode(str, Enum):
+    READ = "read"
+    WRITE = "write"
+    OFF = "off"
+
+    @staticmethod
+    def get(value: "str | bool | None") -> "CacheMode":
+        # YAML 1.1 loads bare on/off/yes/no as booleans.
+        if isinstance(value, bool):
+            return CacheMode.READ if value else CacheMode.OFF
+        if not value:
+            return CacheMode.OFF
+        normalized = str(value).strip().lower()
+        if normalized not in {m.value for m in CacheMode}:
+            raise ValueError(f"Unsupported cache mode: {value}")
+        return CacheMode(normalized)
@@ -1,6 +1,6 @@
 from typing import Any
 
-from aigen.common.node import Node
+from aigen.common.node import Node, NodeDependencies
 from aigen.common.node_registry import register_node
 
 import structlog
@@ -13,6 +13,19 @@ class CopyVariableNode(Node):
     def __init__(self, params: dict[str, Any]) -> None:
         super().__init__(params)
 
+    @classmethod
+    def dependencies(cls, params: dict[str, Any]) -> NodeDependencies:
+        source = params.get("input")
+        target = params.get("output")
+        writes = cls.variable_names(target)
+        return NodeDependencies(
+            reads=cls.combine_reads(
+                cls.variable_names(source), cls.referenced_vars(params)
+            ),
+            writes=writes,
+            copies={target: source} if writes and cls.variable_names(source) else {},
+        )
+
     def run(self, context: dict[str, Any]) -> None:
         params = self.format_params(context)
         source = params.get("input")
@@ -1,48 +1,371 @@
+import json
+import os
+from contextlib import nullcontext
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+import structlog
 
 from aigen.client.openai import OpenAIClient
 from aigen.common.chat_session import ChatSession
 from aigen.common.file_handler import FileHandler
-from aigen.common.node import Node
+from aigen.common.history_store import ChatHistoryStore
+from aigen.common.history_window import drop_old_images, transcript, window_start
+from aigen.common.hooks import record_llm_call
+from aigen.common.json_schema import json_schema_format, validate_json
+from aigen.common.llm_client import get_llm_client_factory
+from aigen.common.node import FILES_RESOURCE, Node, NodeDependencies
 from aigen.common.node_registry import register_node
+from aigen.common.response_cache import ResponseCache
 from aigen.common.utils import replace_vars
 from aigen.constants import MAX_TOKENS
-from aigen.models import GPTModel, Role
+from aigen.models import CacheMode, GPTModel, Role
 from aigen.prompt.openai import OpenAIPrompt
 
-import structlog
+if TYPE_CHECKING:
+    from typing_extensions import Self
 
 LOGGER = structlog.get_logger(__name__)
 
+SUMMARY_PROMPT = (
+    "Summarize the conversation below for your own later reference. Keep "
+    "facts, decisions, names and open questions; drop pleasantries. Reply "
+    "with the summary only."
+)
+SUMMARY_MAX_TOKENS = 300
+
+
+class _StreamSink:
+    """Mirrors streamed deltas into a context variable and/or a file.
+
+    Use it as a context manager: the file is open inside the `with` block, and
+    leaving the block with an exception restores the context variable.
+    """
+
+    _MISSING = object()
+
+    def __init__(
+        self,
+        context: dict[str, Any],
+        context_key: str | None,
+        file_path: str | None,
+    ) -> None:
+        self.received: list[str] = []
+        self._context = context
+        self._context_key = context_key
+        self._file_path = file_path
+        self._previous = (
+            context.get(context_key, self._MISSING) if context_key else None
+        )
+        self._file = None
+
+    def __enter__(self) -> "Self":
+        if self._file_path:
+            Path(self._file_path).parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self._file_path, "w", encoding="utf-8")
+        if self._context_key:
+            self._context[self._context_key] = ""
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close(failed=exc_type is not None)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.received)
+
+    def __call__(self, delta: str) -> None:
+        self.received.append(delta)
+        if self._file is not None:
+            self._file.write(delta)
+            self._file.flush()
+        if self._context_key:
+            self._context[self._context_key] += delta
+
+    def close(self, failed: bool = False) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if failed and self._context_key:
+            # Leave the context as a failed non-streaming call would.
+            if self._previous is self._MISSING:
+                self._context.pop(self._context_key, None)
+            else:
+                self._context[self._context_key] = self._previous
+
+
+@lru_cache(maxsize=64)
+def _load_schema(path: str, mtime_ns: int, size: int) -> Any:
+    # Keyed by mtime and size, so a schema shared by many calls is parsed once
+    # and an edited one is read again. Callers must not mutate the result.
+    return FileHandler.read_yaml(path)
+
 
 @register_node("GPTChat")
 class GPTChatNode(Node):
     def __init__(self, params: dict[str, Any]) -> None:
         super().__init__(params)
-        self._chat_session = ChatSession()
 
-    def _load_history(self, chat_history_key: str, context: dict[str, Any]) -> bool:
-        if Path(chat_history_key).is_file():
-            self._chat_session.load_from_file(chat_history_key)
+    @classmethod
+    def dependencies(cls, params: dict[str, Any]) -> NodeDependencies:
+        writes = cls.variable_names(params.get("output"))
+        if writes is not None and params.get("response_schema"):
+            parsed = cls.variable_names(cls._parsed_output(params))
+            writes = None if parsed is None else writes | parsed
+        history_key = params.get("chat_history") or params.get("input")
+        history = cls.variable_names(history_key)
+        if writes is None or history is None:
+            return NodeDependencies()
+
+        reads = set(cls.referenced_vars(params)) | history
+        renders: set[str] = set()
+        prompt_items = params.get("prompt", [])
+        prompt_items = prompt_items if isinstance(prompt_items, list) else []
+        system_items = cls._system_items(params.get("system"))
+        for item in system_items + prompt_items:
+            if not isinstance(item, dict):
+                continue
+            content = item.get("content")
+            for value in content if isinstance(content, list) else [content]:
+                if not isinstance(value, str):
+                    continue
+                # A templated value may name any context key once rendered.
+                if cls.variable_names(value) is None:
+                    return NodeDependencies(reads=None, writes=writes | history)
+                renders.add(value)
+            if item.get("type") == "image":
+                reads.add(FILES_RESOURCE)
+
+        if isinstance(params.get("response_schema"), str):
+            reads.add(FILES_RESOURCE)
+        if params.get("history_summarize"):
+            summary_key = cls._summary_key(params, str(history_key))
+            summary = cls.variable_names(summary_key)
+            if summary is None:
+                return NodeDependencies(reads=None, writes=None)
+            reads |= summary
+            history = history | summary
+        if (
+            isinstance(history_key, str) and not history_key.isidentifier()
+        ) or params.get("stream_file"):
+            # History keys that are not variable names refer to files.
+            reads.add(FILES_RESOURCE)
+            history = history | {FILES_RESOURCE}
+        return NodeDependencies(
+            reads=frozenset(reads | renders),
+            writes=writes | history,
+            renders=frozenset(renders),
+        )
+
+    @classmethod
+    def estimate_seconds(cls, params: dict[str, Any]) -> float:
+        try:
+            max_tokens = int(params.get("max_tokens", MAX_TOKENS))
+        except (TypeError, ValueError):
+            max_tokens = MAX_TOKENS
+        # Round-trip latency plus a generous generation rate.
+        return 0.5 + max_tokens / 50.0
+
+    def _load_history(
+        self,
+        chat_session: ChatSession,
+        chat_history_key: str,
+        context: dict[str, Any],
+    ) -> bool:
+        if Path(chat_history_key).is_file() or ChatHistoryStore.handles(
+            chat_history_key
+        ):
+            chat_session.load_from_file(chat_history_key)
             LOGGER.info(
                 "Loaded GPT chat history from file",
                 history_key=chat_history_key,
-                history_size=len(self._chat_session.history),
+                history_size=len(chat_session.history),
             )
             return True
 
         history = context.get(chat_history_key, [])
         if not isinstance(history, list):
             raise ValueError(f"History '{chat_history_key}' must be a list.")
-        self._chat_session.set_history(history)
+        chat_session.set_history(history)
         LOGGER.info(
             "Loaded GPT chat history from context variable",
             history_key=chat_history_key,
-            history_size=len(self._chat_session.history),
+            history_size=len(chat_session.history),
         )
         return False
 
+    @staticmethod
+    def _system_items(system: Any) -> list[dict[str, Any]]:
+        if not system:
+            return []
+        if isinstance(system, list):
+            return system
+        return [{"type": "text", "content": system}]
+
+    @staticmethod
+    def _summary_key(params: dict[str, Any], history_key: str) -> str | None:
+        """Context key of the rolling summary; `None` means a file next to
+        a file history."""
+        if params.get("history_summary_key"):
+            return params["history_summary_key"]
+        if history_key.isidentifier():
+            return f"{history_key}_summary"
+        return None
+
+    @staticmethod
+    def _load_summary(
+        summary_key: str | None, history_key: str, context: dict[str, Any]
+    ) -> dict[str, Any]:
+        if summary_key is not None:
+            summary = context.get(summary_key)
+        else:
+            try:
+                summary = json.loads(
+                    Path(f"{history_key}.summary.json").read_text(encoding="utf-8")
+                )
+            except (OSError, ValueError):
+                summary = None
+        if not isinstance(summary, dict):
+            return {"text": "", "messages": 0}
+        return summary
+
+    @staticmethod
+    def _save_summary(
+        summary: dict[str, Any],
+        summary_key: str | None,
+        history_key: str,
+        context: dict[str, Any],
+    ) -> None:
+        if summary_key is not None:
+            context[summary_key] = summary
+            return
+        Path(f"{history_key}.summary.json").write_text(
+            json.dumps(summary, ensure_ascii=False), encoding="utf-8"
+        )
+
+    def _summarize(
+        self, previous: str, messages: list[dict[str, Any]], params: dict[str, Any]
+    ) -> str:
+        model = params.get("history_summary_model") or params.get("model")
+        model = model or GPTModel.best().value
+        max_tokens = int(params.get("history_summary_max_tokens", SUMMARY_MAX_TOKENS))
+        client_factory = get_llm_client_factory() or OpenAIClient
+        client = client_factory(model=model, max_tokens=max_tokens)
+        sections = [SUMMARY_PROMPT]
+        if previous:
+            sections.append(f"Summary so far:\n{previous}")
+        sections.append(f"Conversation:\n{transcript(messages)}")
+        summary = client.generate(
+            content=[{"role": Role.USER.value, "content": "\n\n".join(sections)}],
+            model=model,
+            max_tokens=max_tokens,
+            temperature=0.2,
+        )
+        record_llm_call(getattr(client, "last_stats", None))
+        if not summary:
+            raise ValueError("Model returned empty history summary.")
+        return str(summary)
+
+    def _bounded_history(
+        self,
+        params: dict[str, Any],
+        chat_session: ChatSession,
+        chat_history_key: str | None,
+        context: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        """Messages to send: earlier turns cut to the history budget, then the
+        new message. A rolling summary of evicted turns goes first."""
+        history = chat_session.history
+        window = history[:-1]
+        summarize = bool(params.get("history_summarize")) and chat_history_key
+        summary: dict[str, Any] = {"text": "", "messages": 0}
+        summary_key = None
+        if summarize:
+            summary_key = self._summary_key(params, str(chat_history_key))
+            summary = self._load_summary(summary_key, str(chat_history_key), context)
+            if not 0 <= int(summary.get("messages", 0)) <= len(window):
+                # The history was replaced; its old summary does not apply.
+                summary = {"text": "", "messages": 0}
+            window = window[int(summary["messages"]) :]
+
+        if params.get("history_image_turns") is not None:
+            window = drop_old_images(window, int(params["history_image_turns"]))
+        if params.get("history_max_tokens") is not None:
+            max_tokens = int(params["history_max_tokens"])
+            evicted = window_start(window, max_tokens)
+            if evicted and summarize:
+                # Evict down to half the budget so the next turns fit without
+                # another summary call.
+                evicted = window_start(window, max_tokens // 2)
+                summary = {
+                    "text": self._summarize(
+                        str(summary.get("text") or ""), window[:evicted], params
+                    ),
+                    "messages": int(summary["messages"]) + evicted,
+                }
+                self._save_summary(summary, summary_key, str(chat_history_key), context)
+            if evicted:
+                LOGGER.info(
+                    "Evicted GPT chat history from request",
+                    evicted_messages=evicted,
+                    kept_messages=len(window) - evicted,
+                    summarized=bool(summarize),
+                )
+            window = window[evicted:]
+
+        messages = chat_session.request_history([*window, history[-1]])
+        if summary.get("text"):
+            messages = [
+                {
+                    "role": Role.SYSTEM.value,
+                    "content": f"Summary of the earlier conversation:\n{summary['text']}",
+                },
+                *messages,
+            ]
+        return messages
+
+    @staticmethod
+    def _parsed_output(params: dict[str, Any]) -> Any:
+        output = params.get("output")
+        return params.get("parsed_output") or (output and f"{output}_obj")
+
+    @staticmethod
+    def _response_format(params: dict[str, Any]) -> dict[str, Any] | None:
+        schema = params.get("response_schema")
+        if not schema:
+            return None
+        if isinstance(schema, str):
+            stat = os.stat(schema)
+            schema = _load_schema(
+                str(Path(schema).resolve()), stat.st_mtime_ns, stat.st_size
+            )
+        if not isinstance(schema, dict):
+            raise TypeError("Response schema must be a mapping or a schema file.")
+        return json_schema_format(
+            schema,
+            name=str(params.get("schema_name") or "response"),
+            strict=GPTChatNode._flag(params.get("schema_strict", True)),
+        )
+
+    @staticmethod
+    def _flag(raw_value: Any) -> bool:
+        # YAML and CSV values may spell booleans as text, e.g. "false".
+        if isinstance(raw_value, str):
+            return raw_value.strip().lower() in {"1", "true", "yes", "on"}
+        return bool(raw_value)
+
+    @staticmethod
+    def _parse_structured(response: str, response_format: dict[str, Any]) -> Any:
+        try:
+            data = json.loads(response)
+        except json.JSONDecodeError as error:
+            raise ValueError(
+                f"Structured response is not valid JSON: {error}"
+            ) from error
+        validate_json(data, response_format["json_schema"]["schema"])
+        return data
+
     def _resolve_image_paths(self, image_path: str) -> list[str]:
         path = Path(image_path)
         if path.is_dir():
@@ -55,13 +378,18 @@ class GPTChatNode(Node):
         self,
         prompt_items: list[dict[str, Any]],
         context: dict[str, Any],
+        role: str = Role.USER.value,
     ) -> dict[str, Any]:
-        prompt = OpenAIPrompt(role=Role.USER.value)
+        prompt = OpenAIPrompt(role=role)
+        json_cache: dict[int, str] = {}
         for item in prompt_items:
             item_type = item.get("type")
             content = item.get("content")
             if item_type == "image":
+                if role == Role.SYSTEM.value:
+                    raise ValueError("System prompt supports text items only.")
                 detailed = bool(item.get("detailed", True))
+                downscale = item.get("downscale")
                 resolved_content = (
                     context.get(content, content)
                     if isinstance(content, str)
@@ -72,27 +400,34 @@ class GPTChatNode(Node):
                     if isinstance(resolved_content, list)
                     else [resolved_content]
                 )
+                image_paths: list[str] = []
                 for value in values:
                     if not value:
                         continue
                     if not isinstance(value, str):
                         raise ValueError("Wrong content format.")
-                    image_path = replace_vars(str(context.get(value, value)), context)
-                    for resolved_path in self._resolve_image_paths(image_path):
-                        prompt.add_image(resolved_path, detailed=detailed)
+                    image_path = replace_vars(
+                        str(context.get(value, value)), context, json_cache=json_cache
+                    )
+                    image_paths.extend(self._resolve_image_paths(image_path))
+                prompt.add_images(
+                    image_paths,
+                    detailed=detailed,
+                    downscale=None if downscale is None else bool(downscale),
+                )
             elif item_type == "text":
                 values = content if isinstance(content, list) else [content]
                 for value in values:
                     if not isinstance(value, str):
                         raise ValueError("Wrong content format.")
                     resolved_text = replace_vars(
-                        str(context.get(value, value)), context
+                        str(context.get(value, value)), context, json_cache=json_cache
                     )
                     prompt.add_text(resolved_text)
             else:
                 raise ValueError(f"Unsupported prompt item type: {item_type}")
 
-        return {"role": Role.USER.value, "content": prompt.to_dict()}
+        return {"role": role, "content": prompt.to_dict()}
 
     def run(self, context: dict[str, Any]) -> None:
         params = self.format_params(context)
@@ -101,54 +436,148 @@ class GPTChatNode(Node):
         if not output:
             raise ValueError("Output is empty.")
 
+        chat_session = ChatSession()
         chat_history_key = params.get("chat_history") or params.get("input")
         history_from_file = False
         if chat_history_key:
-            history_from_file = self._load_history(str(chat_history_key), context)
+            history_from_file = self._load_history(
+                chat_session, str(chat_history_key), context
+            )
 
         prompt_items = params.get("prompt", [])
         if not isinstance(prompt_items, list):
             raise ValueError("Prompt must be a list.")
         user_message = self._build_user_message(prompt_items, context)
-        self._chat_session.add_dict(user_message)
+        chat_session.add_dict(user_message)
 
+        request_messages = self._bounded_history(
+            params, chat_session, chat_history_key, context
+        )
+        system_items = self._system_items(params.get("system"))
+        if system_items:
+            # Static instructions go first so requests share a cacheable prefix;
+            # the system message is not stored in the chat history.
+            system_message = self._build_user_message(
+                system_items, context, role=Role.SYSTEM.value
+            )
+            request_messages = [system_message, *request_messages]
         model = params.get("model") or GPTModel.best().value
         max_tokens = int(params.get("max_tokens", MAX_TOKENS))
-        client = OpenAIClient(model=model, max_tokens=max_tokens)
-
-        response = client.generate(
-            content=self._chat_session.history,
-            model=model,
-            max_tokens=max_tokens,
-            temperature=params.get("temperature"),
+        temperature = params.get("temperature")
+        response_format = self._response_format(params)
+        cache_mode = CacheMode.get(
+            params["cache"] if "cache" in params else ResponseCache.default_mode()
         )
+
+        response = None
+        parsed = None
+        cache_key = None
+        if cache_mode != CacheMode.OFF:
+            cache_key = ResponseCache.make_key(
+                {
+                    "model": model,
+                    "messages": request_messages,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                    **({"response_format": response_format} if response_format else {}),
+                }
+            )
+        if cache_mode == CacheMode.READ:
+            cache = ResponseCache.shared()
+            response = cache.get(cache_key)
+            LOGGER.info(
+                "GPTChat response cache lookup",
+                hit=response is not None,
+                hit_rate=round(cache.hit_rate, 3),
+                hits=cache.hits,
+                misses=cache.misses,
+            )
+
+        stream = bool(params.get("stream", False))
+        stream_file = str(params["stream_file"]) if params.get("stream_file") else None
+        sink: _StreamSink | None = None
+        stats = None
         if response is None:
-            raise ValueError("Model returned empty response.")
+            client_factory = get_llm_client_factory() or OpenAIClient
+            client = client_factory(model=model, max_tokens=max_tokens)
+            generate_kwargs: dict[str, Any] = {}
+            if params.get("prompt_cache_key"):
+                generate_kwargs["prompt_cache_key"] = str(params["prompt_cache_key"])
+            if response_format:
+                generate_kwargs["response_format"] = response_format
+            stream_sink = (
+                _StreamSink(
+                    context,
+                    str(output) if params.get("stream_context") else None,
+                    stream_file,
+                )
+                if stream
+                else nullcontext()
+            )
+            with stream_sink as sink:
+                if sink is not None:
+                    generate_kwargs.update(stream=True, on_delta=sink)
+                response = client.generate(
+                    content=request_messages,
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **generate_kwargs,
+                )
+                stats = getattr(client, "last_stats", None)
+                record_llm_call(stats)
+                if response is None:
+                    raise ValueError("Model returned empty response.")
+            if response_format:
+                # Validate before caching so a bad reply is never reused.
+                parsed = self._parse_structured(str(response), response_format)
+            if cache_key is not None:
+                ResponseCache.shared().put(cache_key, str(response))
+
+        if stream_file and (sink is None or sink.text != str(response)):
+            # Cache hits and clients without streaming deliver the text at once.
+            Path(stream_file).write_text(str(response), encoding="utf-8")
 
         LOGGER.info(
             "GPTChat response received",
             response_chars=len(str(response)),
             response=str(response),
+            streamed=bool(sink and sink.received),
+            latency_seconds=round(stats.latency_seconds, 3) if stats else None,
+            ttft_seconds=(
+                round(stats.ttft_seconds, 3)
+                if stats and stats.ttft_seconds is not None
+                else None
+            ),
+            prompt_tokens=stats.prompt_tokens if stats else None,
+            cached_tokens=stats.cached_tokens if stats else None,
+            tokens_per_second=(
+                round(stats.tokens_per_second, 1)
+                if stats and stats.tokens_per_second
+                else None
+            ),
         )
 
-        self._chat_session.add_dict(
-            {"role": Role.ASSISTANT.value, "content": str(response)}
-        )
+        chat_session.add_dict({"role": Role.ASSISTANT.value, "content": str(response)})
         context[str(output)] = str(response)
+        if response_format:
+            if parsed is None:
+                parsed = self._parse_structured(str(response), response_format)
+            context[str(self._parsed_output(params))] = parsed
 
         if chat_history_key:
             chat_history_key = str(chat_history_key)
             if history_from_file:
-                self._chat_session.save_to_file(chat_history_key)
+                chat_session.save_to_file(chat_history_key)
                 LOGGER.info(
                     "Saved GPT chat history to file",
                     history_key=chat_history_key,
-                    history_size=len(self._chat_session.history),
+                    history_size=len(chat_session.history),
                 )
             else:
-                context[chat_history_key] = list(self._chat_session.history)
+                context[chat_history_key] = list(chat_session.history)
                 LOGGER.info(
                     "Saved GPT chat history to context variable",
                     history_key=chat_history_key,
-                    history_size=len(self._chat_session.history),
+                    history_size=len(chat_session.history),
                 )
@@ -2,7 +2,7 @@ from typing import Any
 
 import structlog
 
-from aigen.common.node import Node
+from aigen.common.node import Node, NodeDependencies
 from aigen.common.node_registry import register_node
 
 LOGGER = structlog.get_logger(__name__)
@@ -13,6 +13,16 @@ class JsonToContextNode(Node):
     def __init__(self, params: dict[str, Any]) -> None:
         super().__init__(params)
 
+    @classmethod
+    def dependencies(cls, params: dict[str, Any]) -> NodeDependencies:
+        # The merged keys are only known once the payload exists.
+        return NodeDependencies(
+            reads=cls.combine_reads(
+                cls.variable_names(params.get("input")), cls.referenced_vars(params)
+            ),
+            writes=None,
+        )
+
     def run(self, context: dict[str, Any]) -> None:
         params = self.format_params(context)
         input_var = params.get("input")
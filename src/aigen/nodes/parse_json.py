@@ -4,7 +4,7 @@ from typing import Any
 
 import structlog
 
-from aigen.common.node import Node
+from aigen.common.node import Node, NodeDependencies
 from aigen.common.node_registry import register_node
 
 LOGGER = structlog.get_logger(__name__)
@@ -15,6 +15,19 @@ class ParseJSONNode(Node):
     def __init__(self, params: dict[str, Any]) -> None:
         super().__init__(params)
 
+    @classmethod
+    def dependencies(cls, params: dict[str, Any]) -> NodeDependencies:
+        input_var = params.get("input")
+        output_var = params.get("output")
+        if not output_var and isinstance(input_var, str):
+            output_var = f"{input_var}_obj"
+        return NodeDependencies(
+            reads=cls.combine_reads(
+                cls.variable_names(input_var), cls.referenced_vars(params)
+            ),
+            writes=cls.variable_names(output_var),
+        )
+
     def _parse_json_payload(self, payload: str) -> dict[str, Any]:
         text = payload.strip()
         if text.startswith("```"):
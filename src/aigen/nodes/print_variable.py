@@ -2,7 +2,8 @@ from typing import Any
 
 import structlog
 
-from aigen.common.node import Node
+from aigen.common.hooks import record_output
+from aigen.common.node import STDOUT_RESOURCE, Node, NodeDependencies
 from aigen.common.node_registry import register_node
 
 LOGGER = structlog.get_logger(__name__)
@@ -16,6 +17,15 @@ class PrintVariableNode(Node):
     def __init__(self, params: dict[str, Any]) -> None:
         super().__init__(params)
 
+    @classmethod
+    def dependencies(cls, params: dict[str, Any]) -> NodeDependencies:
+        return NodeDependencies(
+            reads=cls.combine_reads(
+                cls.variable_names(params.get("input")), cls.referenced_vars(params)
+            ),
+            writes=frozenset({STDOUT_RESOURCE}),
+        )
+
     def run(self, context: dict[str, Any]):
         params = self.format_params(context)
         input_var = params.get("input")
@@ -26,3 +36,4 @@ class PrintVariableNode(Node):
         print(
             f"Print variable: {BLUE}{input_var}{RESET}={PURPLE}{context[input_var]}{RESET}"
         )
+        record_output(f"Print variable: {input_var}={context[input_var]}")
@@ -4,7 +4,7 @@ from typing import Any
 import structlog
 
 from aigen.common.file_handler import FileHandler
-from aigen.common.node import Node
+from aigen.common.node import FILES_RESOURCE, Node, NodeDependencies
 from aigen.common.node_registry import register_node
 
 LOGGER = structlog.get_logger(__name__)
@@ -15,6 +15,17 @@ class ReadFileNode(Node):
     def __init__(self, params: dict[str, Any]) -> None:
         super().__init__(params)
 
+    @classmethod
+    def dependencies(cls, params: dict[str, Any]) -> NodeDependencies:
+        output = params.get("output")
+        writes = cls.variable_names(output)
+        return NodeDependencies(
+            reads=cls.referenced_vars(params) | {FILES_RESOURCE},
+            writes=writes,
+            # File contents may hold ${var} placeholders rendered later on.
+            value_refs={output: None} if writes else {},
+        )
+
     def run(self, context: dict[str, Any]) -> None:
         params = self.format_params(context)
         filepath = params.get("filepath") or params.get("file_path", "")
@@ -4,7 +4,7 @@ from typing import Any
 
 import structlog
 
-from aigen.common.node import Node
+from aigen.common.node import Node, NodeDependencies
 from aigen.common.node_registry import register_node
 
 LOGGER = structlog.get_logger(__name__)
@@ -15,63 +15,164 @@ class ReplaceBetweenNode(Node):
     def __init__(self, params: dict[str, Any]) -> None:
         super().__init__(params)
 
-    def run(self, context: dict[str, Any]) -> None:
-        params = self.format_params(context)
+    @classmethod
+    def dependencies(cls, params: dict[str, Any]) -> NodeDependencies:
         input_var = params.get("input")
         output_var = params.get("output") or input_var
-        start_marker = params.get("start_marker")
-        end_marker = params.get("end_marker")
-        replacement_ref = params.get("replacement")
-
-        if not input_var:
-            raise ValueError("Input variable name cannot be empty.")
-        if input_var not in context:
-            raise ValueError(f"Input variable '{input_var}' does not exist in context.")
-        if not output_var:
-            raise ValueError("Output variable name cannot be empty.")
-        if not start_marker or not end_marker:
-            raise ValueError("start_marker and end_marker are required.")
-        if replacement_ref is None:
-            raise ValueError("replacement is required.")
-
-        source_text = str(context[input_var])
-        replacement_text = (
-            str(context[replacement_ref])
-            if isinstance(replacement_ref, str) and replacement_ref in context
-            else str(replacement_ref)
+        sections = params.get("sections")
+        replacements = (
+            [section.get("replacement") for section in sections]
+            if isinstance(sections, list)
+            and all(isinstance(section, dict) for section in sections)
+            else [params.get("replacement")]
+        )
+        names = cls.variable_names(input_var)
+        for replacement in replacements:
+            if isinstance(replacement, str) and names is not None:
+                # The replacement is a context key when such a variable exists.
+                replacement_names = cls.variable_names(replacement)
+                names = None if replacement_names is None else names | replacement_names
+        writes = cls.variable_names(output_var)
+        return NodeDependencies(
+            reads=cls.combine_reads(names, cls.referenced_vars(params)),
+            writes=writes,
+            value_refs={output_var: None} if writes else {},
         )
 
-        start_index = source_text.find(start_marker)
-        if start_index == -1:
-            raise ValueError(f"start_marker not found: {start_marker}")
-        replace_start = start_index + len(start_marker)
+    @staticmethod
+    def _sections(params: dict[str, Any]) -> list[tuple[str, str, Any]]:
+        sections = params.get("sections")
+        if sections is None:
+            sections = [params]
+        elif not isinstance(sections, list):
+            raise TypeError("sections must be a non-empty list.")
+        elif not sections:
+            raise ValueError("sections must be a non-empty list.")
 
-        end_index = source_text.find(end_marker, replace_start)
-        if end_index == -1:
-            raise ValueError(f"end_marker not found: {end_marker}")
+        resolved = []
+        for section in sections:
+            if not isinstance(section, dict):
+                raise TypeError("Each section must be a mapping.")
+            start_marker = section.get("start_marker")
+            end_marker = section.get("end_marker")
+            if not start_marker or not end_marker:
+                raise ValueError("start_marker and end_marker are required.")
+            if section.get("replacement") is None:
+                raise ValueError("replacement is required.")
+            resolved.append(
+                (str(start_marker), str(end_marker), section["replacement"])
+            )
+        starts = [start for start, _, _ in resolved]
+        if len(set(starts)) != len(starts):
+            raise ValueError("Each section needs its own start_marker.")
+        return resolved
 
+    @staticmethod
+    def _indented_fragment(
+        source_text: str, start_index: int, replacement_text: str
+    ) -> str:
         line_start = source_text.rfind("\n", 0, start_index) + 1
         marker_line_prefix = source_text[line_start:start_index]
         indent_match = re.match(r"[ \t]*", marker_line_prefix)
         indent = indent_match.group(0) if indent_match else ""
 
         fragment = textwrap.dedent(replacement_text.strip("\n"))
-        indented_fragment = "\n".join(
+        return "\n".join(
             f"{indent}{line}" if line else "" for line in fragment.splitlines()
         )
 
-        updated_text = (
-            source_text[:replace_start]
-            + "\n"
-            + indented_fragment
-            + "\n"
-            + source_text[end_index:]
+    def _replace_sections(
+        self,
+        source_text: str,
+        sections: list[tuple[str, str, str]],
+    ) -> str:
+        """Replace every section in one left-to-right pass over `source_text`.
+
+        Start markers are matched with a single alternation, so the document is
+        scanned once however many sections there are, and the output is joined
+        from a list of segments instead of being rebuilt per section.
+        """
+        by_start = {start: (end, text) for start, end, text in sections}
+        # Longest first, so a marker that is a prefix of another does not win.
+        pattern = re.compile(
+            "|".join(re.escape(start) for start in sorted(by_start, key=len)[::-1])
         )
-        context[output_var] = updated_text
-        LOGGER.info(
-            "Replaced template section",
-            input=input_var,
-            output=output_var,
-            start_marker=start_marker,
-            end_marker=end_marker,
+        segments: list[str] = []
+        missing_ends: list[str] = []
+        done: set[str] = set()
+        copied = 0
+        position = 0
+        while len(done) + len(missing_ends) < len(by_start):
+            match = pattern.search(source_text, position)
+            if match is None:
+                break
+            start_marker = match.group(0)
+            position = match.end()
+            if start_marker in done or start_marker in missing_ends:
+                continue
+            end_marker, replacement_text = by_start[start_marker]
+            end_index = source_text.find(end_marker, position)
+            if end_index == -1:
+                missing_ends.append(start_marker)
+                continue
+            segments.append(source_text[copied:position])
+            segments.append("\n")
+            segments.append(
+                self._indented_fragment(source_text, match.start(), replacement_text)
+            )
+            segments.append("\n")
+            copied = position = end_index
+            done.add(start_marker)
+
+        errors = [
+            f"start_marker not found: {start}"
+            for start in by_start
+            if start not in done and start not in missing_ends
+        ]
+        errors.extend(
+            f"end_marker not found: {by_start[start][0]}" for start in missing_ends
         )
+        if errors:
+            raise ValueError("; ".join(errors))
+        segments.append(source_text[copied:])
+        return "".join(segments)
+
+    def run(self, context: dict[str, Any]) -> None:
+        params = self.format_params(context)
+        input_var = params.get("input")
+        output_var = params.get("output") or input_var
+
+        if not input_var:
+            raise ValueError("Input variable name cannot be empty.")
+        if input_var not in context:
+            raise ValueError(f"Input variable '{input_var}' does not exist in context.")
+        if not output_var:
+            raise ValueError("Output variable name cannot be empty.")
+
+        sections = [
+            (
+                start_marker,
+                end_marker,
+                str(context[replacement_ref])
+                if isinstance(replacement_ref, str) and replacement_ref in context
+                else str(replacement_ref),
+            )
+            for start_marker, end_marker, replacement_ref in self._sections(params)
+        ]
+        context[output_var] = self._replace_sections(str(context[input_var]), sections)
+        if len(sections) == 1:
+            # Same event as before `sections` existed, for existing log readers.
+            LOGGER.info(
+                "Replaced template section",
+                input=input_var,
+                output=output_var,
+                start_marker=sections[0][0],
+                end_marker=sections[0][1],
+            )
+        else:
+            LOGGER.info(
+                "Replaced template sections",
+                input=input_var,
+                output=output_var,
+                sections=len(sections),
+            )
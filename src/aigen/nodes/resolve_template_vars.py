@@ -2,7 +2,7 @@ from typing import Any
 
 import structlog
 
-from aigen.common.node import Node
+from aigen.common.node import Node, NodeDependencies
 from aigen.common.node_registry import register_node
 from aigen.common.utils import find_vars, replace_vars
 
@@ -14,6 +14,17 @@ class ResolveTemplateVars(Node):
     def __init__(self, params: dict[str, Any]) -> None:
         super().__init__(params)
 
+    @classmethod
+    def dependencies(cls, params: dict[str, Any]) -> NodeDependencies:
+        # Rendering may pull any variable from the context.
+        output_var = params.get("output")
+        writes = cls.variable_names(output_var)
+        return NodeDependencies(
+            reads=None,
+            writes=writes,
+            value_refs={output_var: None} if writes else {},
+        )
+
     def run(self, context: dict[str, Any]) -> None:
         params = self.format_params(context)
         input_var = params.get("input")
@@ -2,7 +2,7 @@ from typing import Any
 
 import structlog
 
-from aigen.common.node import Node
+from aigen.common.node import Node, NodeDependencies
 from aigen.common.node_registry import register_node
 
 LOGGER = structlog.get_logger(__name__)
@@ -13,15 +13,48 @@ class SetVariableNode(Node):
     def __init__(self, params: dict[str, Any]) -> None:
         super().__init__(params)
 
+    @classmethod
+    def dependencies(cls, params: dict[str, Any]) -> NodeDependencies:
+        name = params.get("name")
+        names = cls.variable_names(name)
+        if names is None:
+            return NodeDependencies()
+        value = params.get("value", "")
+        # if_missing checks whether the variable is already set.
+        reads = cls.referenced_vars(params)
+        if params.get("if_missing"):
+            reads = reads | names
+        return NodeDependencies(
+            reads=reads,
+            writes=names,
+            value_refs={name: cls.referenced_vars(value)} if names else {},
+        )
+
+    @classmethod
+    def shared_default(cls, params: dict[str, Any]) -> tuple[str, Any] | None:
+        name = params.get("name")
+        value = params.get("value", "")
+        if (
+            not cls._if_missing(params.get("if_missing", False))
+            or not name
+            or cls.referenced_vars(params)
+            # Only immutable values may be shared between contexts.
+            or not isinstance(value, (str, int, float, bool, type(None)))
+        ):
+            return None
+        return str(name), value
+
+    @staticmethod
+    def _if_missing(raw_if_missing: Any) -> bool:
+        if isinstance(raw_if_missing, str):
+            return raw_if_missing.strip().lower() in {"1", "true", "yes", "on"}
+        return bool(raw_if_missing)
+
     def run(self, context: dict[str, Any]) -> None:
         params = self.format_params(context)
         name = params.get("name")
         value = params.get("value", "")
-        raw_if_missing = params.get("if_missing", False)
-        if isinstance(raw_if_missing, str):
-            if_missing = raw_if_missing.strip().lower() in {"1", "true", "yes", "on"}
-        else:
-            if_missing = bool(raw_if_missing)
+        if_missing = self._if_missing(params.get("if_missing", False))
 
         if not name:
             raise ValueError("Incorrect name. Name cannot be empty.")
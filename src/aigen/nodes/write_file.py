@@ -3,7 +3,7 @@ from typing import Any
 import structlog
 
 from aigen.common.file_handler import FileHandler
-from aigen.common.node import Node
+from aigen.common.node import FILES_RESOURCE, Node, NodeDependencies
 from aigen.common.node_registry import register_node
 
 LOGGER = structlog.get_logger(__name__)
@@ -14,6 +14,17 @@ class WriteFileNode(Node):
     def __init__(self, params: dict[str, Any]) -> None:
         super().__init__(params)
 
+    @classmethod
+    def dependencies(cls, params: dict[str, Any]) -> NodeDependencies:
+        return NodeDependencies(
+            reads=cls.combine_reads(
+                cls.variable_names(params.get("input")),
+                cls.referenced_vars(params),
+                {FILES_RESOURCE},
+            ),
+            writes=frozenset({FILES_RESOURCE}),
+        )
+
     def run(self, context: dict[str, Any]):
         params = self.format_params(context)
         file_path = params.get("file_path")
@@ -17,19 +17,27 @@ class OpenAIPrompt(Prompt):
             raise TypeError("Text expects a str")
         self._content.append({"type": "text", "text": text})
 
-    def add_image(self, image_path: str, detailed=True) -> None:
-        base64_image = ImageEncoder.encode_image(image_path)
-        mime_type = ImageEncoder.get_mime_type(image_path)
+    def add_image(
+        self, image_path: str, detailed=True, downscale: bool | None = None
+    ) -> None:
+        self.add_images([image_path], detailed=detailed, downscale=downscale)
 
+    def add_images(
+        self, image_paths: list[str], detailed=True, downscale: bool | None = None
+    ) -> None:
+        """Add images in order; they are encoded in parallel."""
         details = "low"
         if detailed:
             details = "high"
-        self._content.append(
-            {
-                "type": "image_url",
-                "image_url": {
-                    "url": f"data:{mime_type};base64,{base64_image}",
-                    "detail": details,
-                },
-            }
-        )
+        for encoded in ImageEncoder.encode_many(
+            image_paths, detail=details, downscale=downscale
+        ):
+            self._content.append(
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": encoded.data_url,
+                        "detail": details,
+                    },
+                }
+            )
@@ -1,6 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar
+
 import pytest
 
-from aigen.cli.article_generator import build_parser, reserve_generation_dir
+from aigen.article.fingerprint import MANIFEST_FILE
+from aigen.cli.article_generator import (
+    build_parser,
+    find_latest_checkpoint,
+    reserve_generation_dir,
+    run_articles,
+    summarize_results,
+)
+from aigen.common.checkpoint import CHECKPOINT_FILE, Checkpoint
 
 pytestmark = pytest.mark.unit
 
@@ -50,3 +61,231 @@ def test_build_parser_accepts_optional_default_instructions_flag():
 
     assert args.instructions == "pipeline/artcabbage_article_html_pipeline.yaml"
     assert args.articles_csv == "examples/articles/articles.csv"
+
+
+def test_build_parser_accepts_workers_flag():
+    parser = build_parser()
+    args = parser.parse_args(["--workers", "8", "examples/articles/articles.csv"])
+
+    assert args.workers == 8
+    assert parser.parse_args(["articles.csv"]).workers == 1
+    with pytest.raises(SystemExit):
+        parser.parse_args(["--workers", "0", "articles.csv"])
+
+
+def test_build_parser_accepts_batch_flag():
+    parser = build_parser()
+
+    assert parser.parse_args(["--batch", "local", "a.csv"]).batch == "local"
+    assert parser.parse_args(["a.csv"]).batch is None
+    with pytest.raises(SystemExit):
+        parser.parse_args(["--batch", "nope", "a.csv"])
+
+
+def test_reserve_generation_dir_is_unique_under_concurrency(tmp_path):
+    article_dir = tmp_path / "article-gamma"
+    article_dir.mkdir(parents=True)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        dirs = list(
+            executor.map(lambda _: reserve_generation_dir(article_dir), range(16))
+        )
+
+    assert len(set(dirs)) == 16
+    assert max(d.name for d in dirs) == "v016"
+
+
+def test_run_articles_isolates_contexts_and_reports_failures(tmp_path, monkeypatch):
+    def fake_process_actions(context, instructions, **kwargs):
+        if context["article_name"] == "broken":
+            raise RuntimeError("boom")
+        context["result"] = f"done-{context['article_name']}"
+
+    monkeypatch.setattr(
+        "aigen.cli.article_generator.process_actions", fake_process_actions
+    )
+
+    contexts = [
+        {"article_path": str(tmp_path / name), "article_name": name}
+        for name in ("alpha", "broken", "gamma")
+    ]
+    results = run_articles(contexts, workers=3, default_instructions=[])
+
+    assert [result.index for result in results] == [1, 2, 3]
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[1].error == "RuntimeError: boom"
+    assert contexts[0]["result"] == "done-alpha"
+    assert contexts[2]["result"] == "done-gamma"
+    assert "result" not in contexts[1]
+    assert contexts[0]["generation_dir"] != contexts[2]["generation_dir"]
+
+    summary = summarize_results(results, elapsed_seconds=30.0)
+    assert summary["total"] == 3
+    assert summary["succeeded"] == 2
+    assert summary["failed"] == 1
+    assert summary["articles_per_minute"] == 4.0
+
+
+class FlakyClient:
+    prompts: ClassVar[list[str]] = []
+    fail_on: ClassVar[str | None] = None
+
+    def __init__(self, model=None, max_tokens=None, **kwargs) -> None:
+        pass
+
+    def generate(self, content, **kwargs):
+        prompt = content[-1]["content"][0]["text"]
+        if prompt == FlakyClient.fail_on:
+            raise RuntimeError("rate limited")
+        FlakyClient.prompts.append(prompt)
+        return f"reply to {prompt}"
+
+
+RESUME_INSTRUCTIONS = [
+    {"node": "SetVariable", "params": {"name": "topic", "value": "cats"}},
+    {
+        "node": "GPTChat",
+        "params": {
+            "prompt": [{"type": "text", "content": "Outline ${topic}"}],
+            "output": "outline",
+        },
+    },
+    {
+        "node": "GPTChat",
+        "params": {
+            "prompt": [{"type": "text", "content": "Write ${outline}"}],
+            "output": "article",
+        },
+    },
+]
+
+
+@pytest.mark.parametrize("step_workers", [1, 3])
+def test_run_articles_resume_skips_finished_steps(monkeypatch, tmp_path, step_workers):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", FlakyClient)
+    FlakyClient.prompts = []
+    FlakyClient.fail_on = "Write reply to Outline cats"
+
+    def run(resume):
+        context = {"article_path": str(tmp_path / "article")}
+        results = run_articles(
+            [context],
+            default_instructions=RESUME_INSTRUCTIONS,
+            step_workers=step_workers,
+            resume=resume,
+        )
+        return results[0], context
+
+    failed, _ = run(resume=False)
+    checkpoint = Checkpoint.load(
+        tmp_path / "article" / "aigen" / "v001" / CHECKPOINT_FILE
+    )
+    assert not failed.ok
+    assert checkpoint.completed == {0, 1}
+    # Inputs are only fingerprinted for --incremental runs.
+    assert not (tmp_path / "article" / "aigen" / "v001" / MANIFEST_FILE).exists()
+    assert checkpoint.context["outline"] == "reply to Outline cats"
+
+    FlakyClient.fail_on = None
+    resumed, context = run(resume=True)
+    assert resumed.ok
+    assert resumed.generation_dir == failed.generation_dir
+    assert context["article"] == "reply to Write reply to Outline cats"
+    assert FlakyClient.prompts == ["Outline cats", "Write reply to Outline cats"]
+
+    skipped, context = run(resume=True)
+    assert skipped.ok
+    assert context["article"] == "reply to Write reply to Outline cats"
+    assert len(FlakyClient.prompts) == 2
+    assert not (tmp_path / "article" / "aigen" / "v002").exists()
+
+
+def test_run_articles_resume_restarts_when_instructions_change(monkeypatch, tmp_path):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", FlakyClient)
+    FlakyClient.prompts = []
+    FlakyClient.fail_on = "Write reply to Outline cats"
+    article_path = str(tmp_path / "article")
+
+    failed = run_articles(
+        [{"article_path": article_path}], default_instructions=RESUME_INSTRUCTIONS
+    )[0]
+    # Same number of steps, but the first one now sets a different topic.
+    edited = [
+        {"node": "SetVariable", "params": {"name": "topic", "value": "dogs"}},
+        *RESUME_INSTRUCTIONS[1:],
+    ]
+    context = {"article_path": article_path}
+    resumed = run_articles([context], default_instructions=edited, resume=True)[0]
+
+    assert not failed.ok
+    assert resumed.ok
+    assert resumed.generation_dir.endswith("v002")
+    assert context["outline"] == "reply to Outline dogs"
+
+
+def test_find_latest_checkpoint_ignores_older_versions(tmp_path):
+    article_path = tmp_path / "article"
+    older = article_path / "aigen" / "v001"
+    older.mkdir(parents=True)
+    Checkpoint(older / CHECKPOINT_FILE).start({"a": 1}, 1, "plan")
+
+    assert find_latest_checkpoint(article_path).context == {"a": 1}
+    (article_path / "aigen" / "v002").mkdir()
+    assert find_latest_checkpoint(article_path) is None
+
+
+def test_run_articles_incremental_compares_only_the_latest_version(
+    monkeypatch, tmp_path
+):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", FlakyClient)
+    FlakyClient.prompts = []
+    FlakyClient.fail_on = None
+
+    def run():
+        return run_articles(
+            [{"article_path": str(tmp_path / "article")}],
+            default_instructions=RESUME_INSTRUCTIONS,
+            incremental=True,
+        )[0]
+
+    run()
+    # A newer generation without a manifest, e.g. one that failed part-way.
+    (tmp_path / "article" / "aigen" / "v002").mkdir()
+    rerun = run()
+
+    assert not rerun.skipped
+    assert rerun.generation_dir.endswith("v003")
+
+
+def test_run_articles_incremental_skips_unchanged_inputs(monkeypatch, tmp_path):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", FlakyClient)
+    FlakyClient.prompts = []
+    FlakyClient.fail_on = None
+    images = tmp_path / "images"
+    images.mkdir()
+    (images / "cover.png").write_bytes(b"cover-v1")
+    template = tmp_path / "template.html"
+    template.write_text("<html></html>", encoding="utf-8")
+
+    def run():
+        context = {
+            "article_path": str(tmp_path / "article"),
+            "images_path": str(images),
+            "template_path": str(template),
+        }
+        return run_articles(
+            [context], default_instructions=RESUME_INSTRUCTIONS, incremental=True
+        )[0]
+
+    first = run()
+    unchanged = run()
+    assert unchanged.skipped
+    assert unchanged.generation_dir == first.generation_dir
+    assert len(FlakyClient.prompts) == 2
+
+    (images / "cover.png").write_bytes(b"cover-v2")
+    changed = run()
+    assert changed.ok and not changed.skipped
+    assert changed.generation_dir.endswith("v002")
+    assert len(FlakyClient.prompts) == 4
+    assert summarize_results([first, unchanged, changed], 1.0)["skipped"] == 1
@@ -0,0 +1,153 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+from openai import OpenAIError
+
+from aigen.client.batch import (
+    BatchClient,
+    BatchDispatcher,
+    LocalBatchBackend,
+    parse_batch_output,
+)
+from aigen.common.llm_client import set_llm_client_factory
+from aigen.common.pipeline import process_actions
+
+pytestmark = pytest.mark.unit
+
+
+class CountingBackend(LocalBatchBackend):
+    def __init__(self, responder) -> None:
+        super().__init__(responder)
+        self.submitted: list[Path] = []
+
+    def submit(self, input_path: Path) -> str:
+        self.submitted.append(input_path)
+        return super().submit(input_path)
+
+
+def _echo(body: dict[str, Any]) -> str:
+    return f"{body['model']}: {body['messages'][-1]['content']}"
+
+
+def test_batch_dispatcher_groups_concurrent_requests(tmp_path):
+    backend = CountingBackend(_echo)
+    dispatcher = BatchDispatcher(
+        backend, batch_dir=tmp_path, flush_seconds=0.2, poll_seconds=0
+    )
+    replies: dict[int, str | None] = {}
+
+    def worker(index: int) -> None:
+        client = dispatcher.client(model="gpt-4o-mini", max_tokens=16)
+        replies[index] = client.generate(f"article {index}")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    dispatcher.close()
+
+    assert replies == {i: f"gpt-4o-mini: article {i}" for i in range(5)}
+    assert len(backend.submitted) == 1
+    lines = backend.submitted[0].read_text(encoding="utf-8").splitlines()
+    request = json.loads(lines[0])
+    assert len(lines) == 5
+    assert request["url"] == "/v1/chat/completions"
+    assert request["body"]["max_tokens"] == 16
+
+
+def test_batch_dispatcher_splits_at_max_requests(tmp_path):
+    backend = CountingBackend(_echo)
+    dispatcher = BatchDispatcher(
+        backend, batch_dir=tmp_path, max_requests=2, flush_seconds=5, poll_seconds=0
+    )
+
+    futures = [
+        dispatcher.submit({"model": "m", "messages": [{"content": str(i)}]})
+        for i in range(3)
+    ]
+    dispatcher.close()
+
+    assert [future.result(timeout=5) for future in futures] == ["m: 0", "m: 1", "m: 2"]
+    assert len(backend.submitted) == 2
+
+
+def test_batch_request_errors_reach_the_caller(tmp_path):
+    def responder(body: dict[str, Any]) -> str:
+        raise OpenAIError("model overloaded")
+
+    dispatcher = BatchDispatcher(
+        LocalBatchBackend(responder), batch_dir=tmp_path, flush_seconds=0
+    )
+    client = BatchClient(dispatcher, model="gpt-4o-mini")
+
+    with pytest.raises(ValueError, match="model overloaded"):
+        client.generate("hi")
+    dispatcher.close()
+    assert client.last_stats is not None
+    assert client.last_stats.latency_seconds >= 0
+
+
+def test_parse_batch_output_reports_http_errors():
+    output = "\n".join(
+        [
+            json.dumps(
+                {
+                    "custom_id": "request-1",
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"content": "ok"}}]},
+                    },
+                    "error": None,
+                }
+            ),
+            json.dumps(
+                {
+                    "custom_id": "request-2",
+                    "response": {
+                        "status_code": 400,
+                        "body": {"error": {"message": "bad request"}},
+                    },
+                    "error": None,
+                }
+            ),
+        ]
+    )
+
+    results = parse_batch_output(output)
+
+    assert results["request-1"] == "ok"
+    assert isinstance(results["request-2"], ValueError)
+    assert "bad request" in str(results["request-2"])
+
+
+def test_gpt_chat_uses_installed_client_factory(tmp_path):
+    dispatcher = BatchDispatcher(
+        LocalBatchBackend(_echo), batch_dir=tmp_path, flush_seconds=0
+    )
+    set_llm_client_factory(dispatcher.client)
+    try:
+        context: dict[str, Any] = {"question": "Name a color"}
+        process_actions(
+            context,
+            [
+                {
+                    "node": "GPTChat",
+                    "params": {
+                        "model": "gpt-4o-mini",
+                        "prompt": [{"type": "text", "content": "question"}],
+                        "output": "answer",
+                    },
+                }
+            ],
+        )
+    finally:
+        set_llm_client_factory(None)
+        dispatcher.close()
+
+    assert context["answer"] == (
+        "gpt-4o-mini: [{'type': 'text', 'text': 'Name a color'}]"
+    )
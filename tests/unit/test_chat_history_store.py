@@ -0,0 +1,106 @@
+import json
+from typing import ClassVar
+
+import pytest
+
+from aigen.common.chat_session import ChatSession
+from aigen.common.history_store import ChatHistoryStore, _BlobCache
+from aigen.nodes.gpt_chat import GPTChatNode
+
+pytestmark = pytest.mark.unit
+
+DATA_URL = "data:image/png;base64,aGVsbG8="
+
+
+def _image_message(text: str) -> dict:
+    return {
+        "role": "user",
+        "content": [
+            {"type": "text", "text": text},
+            {"type": "image_url", "image_url": {"url": DATA_URL, "detail": "low"}},
+        ],
+    }
+
+
+def test_history_store_keeps_images_as_blob_references(tmp_path):
+    store = ChatHistoryStore(tmp_path / "history.jsonl")
+
+    stored = store.append([_image_message("one"), _image_message("two")])
+
+    text = store.path.read_text(encoding="utf-8")
+    assert "base64" not in text
+    assert len(text.splitlines()) == 2
+    assert stored == store.load()
+    blobs = [p for p in (tmp_path / "history.jsonl.blobs").rglob("*") if p.is_file()]
+    assert len(blobs) == 1
+    assert store.rehydrate(stored[0]) == _image_message("one")
+
+
+def test_chat_session_appends_only_new_messages(tmp_path):
+    path = str(tmp_path / "history.jsonl")
+    first = ChatSession()
+    first.load_from_file(path)
+    first.add_dict(_image_message("first"))
+    first.add_dict({"role": "assistant", "content": "ok"})
+    first.save_to_file(path)
+    saved = (tmp_path / "history.jsonl").read_text(encoding="utf-8")
+
+    second = ChatSession()
+    second.load_from_file(path)
+    second.add_dict({"role": "user", "content": "again"})
+    second.save_to_file(path)
+
+    text = (tmp_path / "history.jsonl").read_text(encoding="utf-8")
+    assert text.startswith(saved)
+    assert json.loads(text.splitlines()[-1]) == {"role": "user", "content": "again"}
+    assert second.request_history()[0] == _image_message("first")
+
+
+def test_blob_cache_stays_within_its_byte_limit(tmp_path):
+    cache = _BlobCache(max_bytes=10)
+    paths = []
+    for name, data in [("a", "1234"), ("b", "5678"), ("c", "90ab"), ("d", "x" * 11)]:
+        path = tmp_path / name
+        path.write_text(data, encoding="ascii")
+        paths.append(str(path))
+
+    assert [cache.read(path) for path in paths] == ["1234", "5678", "90ab", "x" * 11]
+    # The oldest blob was evicted and the oversized one never cached.
+    assert cache.size_bytes == 8
+
+
+class RecordingClient:
+    requests: ClassVar[list] = []
+
+    def __init__(self, model=None, max_tokens=None, **kwargs) -> None:
+        pass
+
+    def generate(self, content, **kwargs):
+        RecordingClient.requests.append(content)
+        return f"reply {len(RecordingClient.requests)}"
+
+
+def test_gpt_chat_node_uses_jsonl_history(monkeypatch, tmp_path):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", RecordingClient)
+    RecordingClient.requests = []
+    image = tmp_path / "photo.png"
+    image.write_bytes(b"hello")
+    history = tmp_path / "chat" / "history.jsonl"
+    params = {
+        "prompt": [
+            {"type": "text", "content": "Describe"},
+            {"type": "image", "content": str(image), "detailed": False},
+        ],
+        "chat_history": str(history),
+        "output": "answer",
+    }
+
+    GPTChatNode(params).run({})
+    GPTChatNode(params).run({})
+
+    assert len(history.read_text(encoding="utf-8").splitlines()) == 4
+    assert "base64" not in history.read_text(encoding="utf-8")
+    second_request = RecordingClient.requests[1]
+    assert len(second_request) == 3
+    image_part = second_request[0]["content"][1]["image_url"]
+    assert image_part["url"] == DATA_URL
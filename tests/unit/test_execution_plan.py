@@ -0,0 +1,191 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aigen.common.checkpoint import Checkpoint
+from aigen.common.pipeline import process_actions
+from aigen.common.plan import ExecutionPlan
+from aigen.nodes.set_variable import SetVariableNode
+
+pytestmark = pytest.mark.unit
+
+
+class EchoClient:
+    def __init__(self, model=None, max_tokens=None, **kwargs) -> None:
+        self.model = model
+
+    def generate(self, content, **kwargs):
+        return "echo: " + content[-1]["content"][0]["text"]
+
+
+def test_execution_plan_validates_all_steps_before_running():
+    instructions = [
+        {"node": "SetVariable", "params": {"name": "a", "value": "1"}},
+        {"node": "Unknown"},
+    ]
+    context: dict = {}
+
+    with pytest.raises(ValueError, match="'Unknown' is not registered"):
+        process_actions(context, instructions)
+    assert context == {}
+
+
+def test_execution_plan_is_isolated_from_instruction_edits():
+    instructions = [
+        {"node": "SetVariable", "params": {"name": "greeting", "value": "hi ${who}"}}
+    ]
+    plan = ExecutionPlan.compile(instructions)
+    instructions[0]["params"]["value"] = "changed"
+
+    context = {"who": "there"}
+    plan.run(context)
+    assert context["greeting"] == "hi there"
+    assert len(plan) == 1
+    assert plan.steps[0].dependencies.writes == frozenset({"greeting"})
+
+
+def test_node_precompiles_only_templated_params():
+    node = SetVariableNode(
+        {"name": "title", "value": "Hello ${name}", "if_missing": True}
+    )
+
+    assert node.templated_params == ("value",)
+    assert node.format_params({"name": "Ada"}) == {
+        "name": "title",
+        "value": "Hello Ada",
+        "if_missing": True,
+    }
+
+
+def test_execution_plan_runs_shared_nodes_on_many_contexts(monkeypatch):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", EchoClient)
+    plan = ExecutionPlan.compile(
+        [
+            {
+                "node": "SetVariable",
+                "params": {"name": "prompt", "value": "row ${row}"},
+            },
+            {
+                "node": "GPTChat",
+                "params": {
+                    "prompt": [{"type": "text", "content": "prompt"}],
+                    "chat_history": "history",
+                    "output": "answer",
+                },
+            },
+        ]
+    )
+    contexts = [{"row": str(n)} for n in range(20)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda context: process_actions(context, plan), contexts))
+
+    for n, context in enumerate(contexts):
+        assert context["answer"] == f"echo: row {n}"
+        assert len(context["history"]) == 2
+
+
+LAYERED_INSTRUCTIONS = [
+    {"node": "SetVariable", "params": {"name": "early", "value": "${title} by ${who}"}},
+    {
+        "node": "SetVariable",
+        "params": {"name": "who", "value": "anon", "if_missing": True},
+    },
+    {
+        "node": "SetVariable",
+        "params": {"name": "title", "value": "Untitled", "if_missing": True},
+    },
+    {
+        "node": "SetVariable",
+        "params": {"name": "year", "value": "2026", "if_missing": "yes"},
+    },
+    {"node": "SetVariable", "params": {"name": "line", "value": "${title} (${year})"}},
+    {"node": "JsonToContext", "params": {"input": "meta"}},
+]
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_layered_context_matches_plain_dict_run(max_workers):
+    plan = ExecutionPlan.compile(LAYERED_INSTRUCTIONS)
+    rows = [{"meta": {"mood": "calm"}}, {"meta": {}, "title": "Dusk", "year": "1999"}]
+
+    for row in rows:
+        plain = dict(row)
+        process_actions(plain, plan, max_workers=max_workers)
+        overlay = dict(row)
+        layered = plan.new_context(overlay)
+        process_actions(layered, plan, max_workers=max_workers)
+
+        assert dict(layered) == plain
+        assert "year" not in layered.overlay or "year" in row
+        assert overlay == row
+
+    # "who" and "title" are read by the first step before their defaults run.
+    assert dict(plan.shared_defaults) == {"year": "2026"}
+    with pytest.raises(TypeError):
+        plan.shared_defaults["year"] = "2000"  # type: ignore[index]
+
+
+def test_layered_context_is_a_drop_in_dict(tmp_path):
+    plan = ExecutionPlan.compile(LAYERED_INSTRUCTIONS)
+    layered = plan.new_context({"title": "Dusk", "meta": {}})
+    process_actions(layered, plan)
+    expected = {"title": "Dusk", "meta": {}, "early": "Dusk by ${who}"}
+    expected.update(who="anon", year="2026", line="Dusk (2026)")
+
+    assert isinstance(layered, dict)
+    assert layered == expected
+    assert json.loads(json.dumps(layered)) == expected
+    assert {**layered} == expected
+    assert layered.setdefault("year", "2000") == "2026"
+    with pytest.raises(KeyError):
+        del layered["year"]
+
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json")
+    checkpoint.save(layered)
+    assert Checkpoint.load(tmp_path / "checkpoint.json").context == expected
+
+
+def test_execution_plan_rejects_non_list_instructions():
+    with pytest.raises(TypeError, match="must be a list of steps"):
+        ExecutionPlan.compile({"node": "SetVariable"})  # type: ignore[arg-type]
+
+
+def _rendering_plan(draft_value: str | None) -> ExecutionPlan:
+    steps = [
+        {
+            "node": "GPTChat",
+            "params": {
+                "prompt": [{"type": "text", "content": "draft"}],
+                "output": "answer",
+            },
+        },
+        {
+            "node": "SetVariable",
+            "params": {"name": "foo", "value": "default", "if_missing": True},
+        },
+    ]
+    if draft_value is not None:
+        steps.insert(
+            0,
+            {"node": "SetVariable", "params": {"name": "draft", "value": draft_value}},
+        )
+    return ExecutionPlan.compile(steps)
+
+
+def test_shared_defaults_skip_names_an_earlier_render_may_reach(monkeypatch):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", EchoClient)
+    # `draft` comes from the row, so its `${foo}` is only known at run time.
+    from_row = _rendering_plan(None)
+    plain = {"draft": "About ${foo}"}
+    process_actions(plain, from_row)
+    layered = from_row.new_context({"draft": "About ${foo}"})
+    process_actions(layered, from_row)
+
+    assert dict(from_row.shared_defaults) == {}
+    assert dict(layered) == plain
+    assert plain["answer"] == "echo: About ${foo}"
+    # A value an earlier step set without templates cannot reach `foo`.
+    assert dict(_rendering_plan("About cats").shared_defaults) == {"foo": "default"}
+    assert dict(_rendering_plan("About ${topic}").shared_defaults) == {}
@@ -1,3 +1,5 @@
+import os
+
 import pytest
 
 from aigen.common.file_handler import FileHandler
@@ -11,3 +13,41 @@ def test_file_handler():
     )
     assert len(images) == 2
     print(images)
+
+
+def test_search_images_filters_and_caches_listings(tmp_path, monkeypatch):
+    FileHandler.clear_dir_cache()
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "a.png").write_bytes(b"a")
+    (tmp_path / "notes.txt").write_text("x")
+    (tmp_path / "nested" / "b.JPG").write_bytes(b"b")
+    scans = []
+    original = os.scandir
+
+    def counting_scandir(path):
+        scans.append(path)
+        return original(path)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+
+    first = FileHandler.search_images(str(tmp_path))
+    assert first == [str(tmp_path / "nested" / "b.JPG"), str(tmp_path / "a.png")]
+    assert FileHandler.search_images(str(tmp_path)) == first
+    assert len(scans) == 2
+
+    (tmp_path / "c.webp").write_bytes(b"c")
+    stat = tmp_path.stat()
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert str(tmp_path / "c.webp") in FileHandler.search_images(str(tmp_path))
+    assert len(scans) == 3
+
+
+def test_search_images_dir_cache_is_bounded(tmp_path, monkeypatch):
+    FileHandler.clear_dir_cache()
+    monkeypatch.setattr("aigen.common.file_handler._DIR_CACHE_MAX_ENTRIES", 2)
+    for name in ("a", "b", "c"):
+        (tmp_path / name).mkdir()
+        FileHandler.search_images(str(tmp_path / name))
+
+    assert list(FileHandler._dir_cache) == [str(tmp_path / "b"), str(tmp_path / "c")]
+    FileHandler.clear_dir_cache()
@@ -1,6 +1,9 @@
+import json
+
 import pytest
 import yaml
 
+from aigen.common.file_handler import FileHandler
 from aigen.nodes.gpt_chat import GPTChatNode
 
 pytestmark = pytest.mark.unit
@@ -138,3 +141,302 @@ def test_gpt_chat_node_resolves_deferred_template_text(monkeypatch):
     assert first_msg["content"] == [
         {"type": "text", "text": "Using critique: moody blue mountains at sunset"}
     ]
+
+
+def test_gpt_chat_node_cache_hit_skips_client(monkeypatch, tmp_path):
+    from aigen.common.response_cache import ResponseCache
+
+    calls = []
+
+    class CountingClient(StubOpenAIClient):
+        def generate(self, content, **kwargs):
+            calls.append(content)
+            return f"response-{len(calls)}"
+
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", CountingClient)
+    monkeypatch.setattr(ResponseCache, "_shared", ResponseCache(tmp_path))
+
+    params = {
+        "prompt": [{"type": "text", "content": "cache me"}],
+        "output": "answer",
+        "model": "gpt-4o-mini",
+        "temperature": 0.2,
+        "cache": "read",
+    }
+    first_context = {}
+    GPTChatNode(params).run(first_context)
+    second_context = {}
+    GPTChatNode(params).run(second_context)
+    GPTChatNode({**params, "cache": "write"}).run({})
+    GPTChatNode({**params, "cache": False}).run({})
+
+    assert first_context["answer"] == "response-1"
+    assert second_context["answer"] == "response-1"
+    assert len(calls) == 3
+    assert ResponseCache._shared.hit_rate == 0.5
+
+
+class StreamingStubClient:
+    def __init__(self, model=None, max_tokens=None, **kwargs) -> None:
+        self.model = model
+
+    def generate(self, content, **kwargs):
+        deltas = ["Hello", ", ", "world"]
+        if kwargs.get("stream"):
+            for delta in deltas:
+                kwargs["on_delta"](delta)
+        return "".join(deltas)
+
+
+def test_gpt_chat_node_streams_into_file_and_context(monkeypatch, tmp_path):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", StreamingStubClient)
+    stream_file = tmp_path / "out" / "body.md"
+    params = {
+        "prompt": [{"type": "text", "content": "hi"}],
+        "output": "answer",
+        "stream": True,
+        "stream_context": True,
+        "stream_file": str(stream_file),
+    }
+    streamed_context: dict = {}
+    plain_context: dict = {}
+
+    GPTChatNode(params).run(streamed_context)
+    GPTChatNode({"prompt": params["prompt"], "output": "answer"}).run(plain_context)
+
+    assert streamed_context == plain_context
+    assert stream_file.read_text(encoding="utf-8") == "Hello, world"
+
+
+class FailingStreamClient(StreamingStubClient):
+    def generate(self, content, **kwargs):
+        kwargs["on_delta"]("Hel")
+        raise ConnectionError("stream dropped")
+
+
+def test_gpt_chat_node_restores_context_when_stream_fails(monkeypatch, tmp_path):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", FailingStreamClient)
+    params = {
+        "prompt": [{"type": "text", "content": "hi"}],
+        "output": "answer",
+        "stream": True,
+        "stream_context": True,
+        "stream_file": str(tmp_path / "body.md"),
+    }
+    context = {"answer": "previous"}
+
+    with pytest.raises(ConnectionError):
+        GPTChatNode(params).run(context)
+
+    assert context == {"answer": "previous"}
+
+
+def test_gpt_chat_node_sends_system_prefix_first(monkeypatch):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", StubOpenAIClient)
+    params = {
+        "system": [{"type": "text", "content": "instructions"}],
+        "prompt": [{"type": "text", "content": "Write about ${topic}"}],
+        "chat_history": "chat_buffer",
+        "prompt_cache_key": "articles",
+        "output": "answer",
+    }
+    requests = []
+    for topic in ("cats", "dogs"):
+        context = {"instructions": "Long shared style guide.", "topic": topic}
+        GPTChatNode(params).run(context)
+        requests.append(StubOpenAIClient.last_content)
+
+    assert requests[0][0] == requests[1][0]
+    assert requests[0][0]["role"] == "system"
+    assert requests[0][0]["content"] == [
+        {"type": "text", "text": "Long shared style guide."}
+    ]
+    assert requests[1][1]["content"] == [{"type": "text", "text": "Write about dogs"}]
+    assert StubOpenAIClient.last_kwargs["prompt_cache_key"] == "articles"
+    assert [message["role"] for message in context["chat_buffer"]] == [
+        "user",
+        "assistant",
+    ]
+
+
+META_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "article_title": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["article_title", "tags"],
+    "additionalProperties": False,
+}
+
+
+def test_gpt_chat_node_structured_output_writes_parsed_object(monkeypatch):
+    class JsonClient(StubOpenAIClient):
+        def generate(self, content, **kwargs):
+            StubOpenAIClient.last_kwargs = kwargs
+            return '{"article_title": "Dusk", "tags": ["light"]}'
+
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", JsonClient)
+    params = {
+        "prompt": [{"type": "text", "content": "meta"}],
+        "response_schema": META_SCHEMA,
+        "schema_name": "article_meta",
+        "output": "article_meta_json",
+    }
+    context: dict = {}
+
+    GPTChatNode(params).run(context)
+
+    response_format = StubOpenAIClient.last_kwargs["response_format"]
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["name"] == "article_meta"
+    assert response_format["json_schema"]["strict"] is True
+    assert context["article_meta_json_obj"] == {
+        "article_title": "Dusk",
+        "tags": ["light"],
+    }
+    assert "article_meta_json_obj" in GPTChatNode.dependencies(params).writes
+
+
+def test_gpt_chat_node_reads_schema_file_once_and_parses_strict_flag(
+    monkeypatch, tmp_path
+):
+    class JsonClient(StubOpenAIClient):
+        def generate(self, content, **kwargs):
+            StubOpenAIClient.last_kwargs = kwargs
+            return '{"article_title": "Dusk", "tags": ["light"]}'
+
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", JsonClient)
+    schema_path = tmp_path / "meta.schema.json"
+    schema_path.write_text(json.dumps(META_SCHEMA), encoding="utf-8")
+    reads = []
+    read_yaml = FileHandler.read_yaml
+
+    def counting_read_yaml(path):
+        reads.append(path)
+        return read_yaml(path)
+
+    monkeypatch.setattr(FileHandler, "read_yaml", counting_read_yaml)
+    params = {
+        "prompt": [{"type": "text", "content": "meta"}],
+        "response_schema": str(schema_path),
+        "schema_strict": "false",
+        "output": "meta",
+    }
+
+    GPTChatNode(params).run({})
+    GPTChatNode(params).run({})
+
+    assert (
+        StubOpenAIClient.last_kwargs["response_format"]["json_schema"]["strict"]
+        is False
+    )
+    assert len(reads) == 1
+
+
+def test_gpt_chat_node_rejects_reply_not_matching_schema(monkeypatch):
+    class WrongClient(StubOpenAIClient):
+        def generate(self, content, **kwargs):
+            return '{"article_title": 3, "extra": true}'
+
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", WrongClient)
+    params = {
+        "prompt": [{"type": "text", "content": "meta"}],
+        "response_schema": META_SCHEMA,
+        "output": "meta",
+        "parsed_output": "meta_obj",
+    }
+
+    with pytest.raises(ValueError) as error:
+        GPTChatNode(params).run({})
+
+    message = str(error.value)
+    assert "$.article_title: expected string" in message
+    assert "missing required property 'tags'" in message
+    assert "unexpected property 'extra'" in message
+
+
+def test_gpt_chat_node_rejects_non_mapping_schema(monkeypatch):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", StubOpenAIClient)
+    params = {
+        "prompt": [{"type": "text", "content": "meta"}],
+        "response_schema": ["not", "a", "schema"],
+        "output": "meta",
+    }
+
+    with pytest.raises(TypeError, match="Response schema must be a mapping"):
+        GPTChatNode(params).run({})
+
+
+def _turns(count: int) -> list[dict]:
+    history = []
+    for index in range(count):
+        history.append(
+            {"role": "user", "content": [{"type": "text", "text": f"q{index} " * 20}]}
+        )
+        history.append({"role": "assistant", "content": f"a{index} " * 20})
+    return history
+
+
+def test_gpt_chat_node_bounds_history_and_drops_old_images(monkeypatch):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", StubOpenAIClient)
+    image = {"type": "image_url", "image_url": {"url": "data:image/png;base64,AA"}}
+    history = _turns(6)
+    history[0]["content"].append(image)
+    history[8]["content"].append(image)
+    history[10]["content"].append(image)
+    context = {"chat_buffer": history}
+    params = {
+        "prompt": [{"type": "text", "content": "next"}],
+        "chat_history": "chat_buffer",
+        "history_max_tokens": 850,
+        "history_image_turns": 1,
+        "output": "answer",
+    }
+
+    GPTChatNode(params).run(context)
+
+    sent = StubOpenAIClient.last_content
+    assert sent[0]["role"] == "user"
+    assert sent[0]["content"][0]["text"].startswith("q4 ")
+    assert sent[0]["content"][1] == {"type": "text", "text": "[image omitted]"}
+    assert sent[2]["content"][1] == image
+    assert sent[-1]["content"] == [{"type": "text", "text": "next"}]
+    assert len(context["chat_buffer"]) == 14
+    assert context["chat_buffer"][0]["content"][1] == image
+
+
+def test_gpt_chat_node_summarizes_evicted_turns(monkeypatch):
+    summaries = []
+
+    class SummarizingClient(StubOpenAIClient):
+        def generate(self, content, **kwargs):
+            text = str(content[-1]["content"])
+            if text.startswith("Summarize the conversation"):
+                summaries.append(text)
+                return f"summary {len(summaries)}"
+            StubOpenAIClient.last_content = content
+            return "a " * 60
+
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", SummarizingClient)
+    context = {"chat_buffer": _turns(4)}
+    params = {
+        "prompt": [{"type": "text", "content": "next"}],
+        "chat_history": "chat_buffer",
+        "history_max_tokens": 100,
+        "history_summarize": True,
+        "output": "answer",
+    }
+
+    for _ in range(3):
+        GPTChatNode(params).run(context)
+
+    sent = StubOpenAIClient.last_content
+    assert sent[0] == {
+        "role": "system",
+        "content": "Summary of the earlier conversation:\nsummary 2",
+    }
+    assert len(summaries) == 2
+    assert "Summary so far:\nsummary 1" in summaries[1]
+    assert context["chat_buffer_summary"]["messages"] == 10
+    assert "chat_buffer_summary" in GPTChatNode.dependencies(params).writes
@@ -0,0 +1,147 @@
+import base64
+import io
+import os
+
+import pytest
+
+from aigen.common.image_encoder import EncodedImage, ImageEncoder
+from aigen.config import AigenConfig
+from aigen.prompt.openai import OpenAIPrompt
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        ImageEncoder, "_config", AigenConfig(AIGEN_CACHE_DIR=str(tmp_path / "cache"))
+    )
+    ImageEncoder.clear_cache()
+    yield
+    ImageEncoder.clear_cache()
+
+
+def test_encode_reuses_payload_until_file_changes(tmp_path, monkeypatch):
+    image = tmp_path / "image.png"
+    image.write_bytes(b"first")
+    reads = []
+    original = ImageEncoder.encode_image
+
+    def counting_encode(image_path):
+        reads.append(image_path)
+        return original(image_path)
+
+    monkeypatch.setattr(ImageEncoder, "encode_image", staticmethod(counting_encode))
+
+    first = ImageEncoder.encode(str(image))
+    assert ImageEncoder.encode(str(image), detail="low") is first
+    assert first == EncodedImage("image/png", base64.b64encode(b"first").decode())
+    assert len(reads) == 1
+
+    image.write_bytes(b"second!")
+    stat = image.stat()
+    os.utime(image, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert ImageEncoder.encode(str(image)).data == base64.b64encode(b"second!").decode()
+    assert len(reads) == 2
+
+
+def test_encode_cache_stays_within_its_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        ImageEncoder,
+        "_config",
+        AigenConfig(
+            AIGEN_CACHE_DIR=str(tmp_path / "cache"),
+            AIGEN_IMAGE_CACHE_MAX_MB=20 / (1024 * 1024),
+        ),
+    )
+    for index in range(4):
+        image = tmp_path / f"image_{index}.png"
+        image.write_bytes(b"123456789")
+        ImageEncoder.encode(str(image))
+
+    assert len(ImageEncoder._cache) == 1
+    assert ImageEncoder._cache_bytes == len(base64.b64encode(b"123456789"))
+
+
+def test_target_size_follows_detail_level():
+    assert ImageEncoder.target_size(4000, 3000, "low") == (512, 384)
+    assert ImageEncoder.target_size(4000, 3000, "high") == (1024, 768)
+    assert ImageEncoder.target_size(400, 300, "high") == (400, 300)
+
+
+def test_add_image_builds_data_url(tmp_path):
+    image = tmp_path / "image.png"
+    image.write_bytes(b"png")
+
+    prompt = OpenAIPrompt()
+    prompt.add_image(str(image), detailed=False, downscale=False)
+
+    image_url = prompt.to_dict()[0]["image_url"]
+    assert image_url["detail"] == "low"
+    assert (
+        image_url["url"] == "data:image/png;base64," + base64.b64encode(b"png").decode()
+    )
+
+
+def test_add_images_encodes_in_parallel_and_keeps_order(tmp_path):
+    paths = []
+    for index in range(6):
+        image = tmp_path / f"image_{index}.png"
+        image.write_bytes(f"png-{index}".encode())
+        paths.append(str(image))
+
+    prompt = OpenAIPrompt()
+    prompt.add_images(paths, downscale=False)
+
+    assert [item["image_url"]["url"] for item in prompt.to_dict()] == [
+        "data:image/png;base64," + base64.b64encode(f"png-{i}".encode()).decode()
+        for i in range(6)
+    ]
+    assert ImageEncoder._executor is not None
+
+
+def test_encode_downscales_and_caches_on_disk(tmp_path):
+    pil_image = pytest.importorskip("PIL.Image")
+    image = tmp_path / "large.png"
+    pil_image.new("RGB", (2000, 1000), color=(200, 30, 30)).save(image)
+
+    encoded = ImageEncoder.encode(str(image), detail="low", downscale=True)
+
+    assert encoded.mime_type == "image/jpeg"
+    with pil_image.open(io.BytesIO(base64.b64decode(encoded.data))) as resized:
+        assert resized.size == (512, 256)
+    disk_entries = list((tmp_path / "cache" / "images").rglob("*.json"))
+    assert len(disk_entries) == 1
+
+    ImageEncoder.clear_cache()
+    assert ImageEncoder.encode(str(image), detail="low", downscale=True) == encoded
+
+
+def test_encode_disk_cache_stays_within_its_limit(tmp_path, monkeypatch):
+    pil_image = pytest.importorskip("PIL.Image")
+    monkeypatch.setattr(
+        ImageEncoder,
+        "_config",
+        AigenConfig(
+            AIGEN_CACHE_DIR=str(tmp_path / "cache"),
+            AIGEN_IMAGE_DISK_CACHE_MAX_MB=3000 / (1024 * 1024),
+        ),
+    )
+    for index in range(4):
+        image = tmp_path / f"large_{index}.png"
+        pil_image.new("RGB", (1200, 600), color=(index * 60, 30, 30)).save(image)
+        ImageEncoder.encode(str(image), detail="low", downscale=True)
+
+    entries = list((tmp_path / "cache" / "images").rglob("*.json"))
+    assert 0 < len(entries) < 4
+    assert sum(entry.stat().st_size for entry in entries) <= 3000
+
+
+def test_encode_keeps_transparency_as_png(tmp_path):
+    pil_image = pytest.importorskip("PIL.Image")
+    image = tmp_path / "alpha.png"
+    pil_image.new("RGBA", (1024, 1024), color=(0, 0, 0, 0)).save(image)
+
+    encoded = ImageEncoder.encode(str(image), detail="low", downscale=True)
+
+    assert encoded.mime_type == "image/png"
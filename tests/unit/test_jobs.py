@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+
+from aigen.common.jobs import JobQueue, compile_batch_plan
+from aigen.common.node import Node, NodeDependencies
+from aigen.common.plan import ExecutionPlan, PlanStep
+
+pytestmark = pytest.mark.unit
+
+
+PLAN = ExecutionPlan.compile(
+    [
+        {
+            "node": "SetVariable",
+            "params": {"name": "greeting", "value": "Hello, ${who}!"},
+        },
+        {"node": "CopyVariable", "params": {"input": "${who}", "output": "copied"}},
+    ]
+)
+
+
+def _single_step_plan(node) -> ExecutionPlan:
+    return ExecutionPlan(
+        (PlanStep(0, type(node).__name__, node, NodeDependencies(), 0.0),)
+    )
+
+
+def test_job_queue_runs_each_value_with_one_plan():
+    queue = JobQueue(max_workers=2)
+    job = queue.submit(PLAN, [{"who": "who", "x": 1}, {"who": "missing"}])
+
+    assert job.wait(timeout=5)
+    queue.shutdown()
+
+    progress = job.progress()
+    assert progress["status"] == "completed"
+    assert (progress["finished"], progress["succeeded"], progress["failed"]) == (
+        2,
+        1,
+        1,
+    )
+    results = {result["index"]: result for result in job.results()}
+    assert results[0]["outputs"]["greeting"] == "Hello, who!"
+    assert results[0]["outputs"]["copied"] == "who"
+    assert results[1]["ok"] is False
+    assert "missing" in results[1]["error"]
+    assert queue.get(job.id) is job
+
+
+def test_job_results_are_available_before_the_job_finishes():
+    release = threading.Event()
+
+    class Gate(Node):
+        def run(self, context):
+            if context["slow"]:
+                release.wait(timeout=5)
+            context["done"] = True
+
+    queue = JobQueue(max_workers=2)
+    job = queue.submit(_single_step_plan(Gate({})), [{"slow": True}, {"slow": False}])
+
+    for _ in range(100):
+        if job.progress()["finished"] == 1:
+            break
+        time.sleep(0.01)
+    assert job.status == "running"
+    assert [result["index"] for result in job.results()] == [1]
+
+    release.set()
+    assert job.wait(timeout=5)
+    assert [result["index"] for result in job.results(offset=1)] == [0]
+    queue.shutdown()
+
+
+def test_job_cancel_skips_pending_items():
+    release = threading.Event()
+
+    class Block(Node):
+        def run(self, context):
+            release.wait(timeout=5)
+
+    queue = JobQueue(max_workers=1)
+    job = queue.submit(_single_step_plan(Block({})), [{} for _ in range(5)])
+
+    job.cancel()
+    assert job.status == "cancelling"
+    release.set()
+    assert job.wait(timeout=5)
+    assert job.status == "cancelled"
+    assert job.progress()["finished"] == 1
+    queue.shutdown()
+
+
+def test_compile_batch_plan_binds_the_variable_in_params_only():
+    plan = compile_batch_plan(
+        """
+- node: SetVariable
+  params: {name: greeting, value: "Hello, {{who}}!"}
+- node: SetVariable
+  params:
+    name: count
+    value: ${who}
+""",
+        "who",
+    )
+    queue = JobQueue(max_workers=1)
+    job = queue.submit(plan, [{"who": "Ada"}, {"who": 3}])
+
+    assert job.wait(timeout=5)
+    queue.shutdown()
+    outputs = {result["index"]: result["outputs"] for result in job.results()}
+    assert outputs[0]["greeting"] == "Hello, Ada!"
+    # Values are rendered as text, even into a param that looks numeric.
+    assert outputs[1]["count"] == "3"
+    with pytest.raises(ValueError, match="not registered"):
+        compile_batch_plan("- node: '{{who}}'", "who")
@@ -0,0 +1,215 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from aigen.client.openai import (
+    AsyncOpenAIClient,
+    OpenAIClient,
+    reset_shared_clients,
+)
+from aigen.client.rate_limiter import RateLimiter
+from aigen.config import AigenConfig
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(autouse=True)
+def fake_config(monkeypatch):
+    config = AigenConfig(OPENAI_API_KEY="test-key", OPENAI_MAX_CONNECTIONS=4)
+    monkeypatch.setattr(OpenAIClient, "_config", config)
+    monkeypatch.setattr(AsyncOpenAIClient, "_config", config)
+    reset_shared_clients()
+    RateLimiter.reset_shared()
+    yield config
+    reset_shared_clients()
+    RateLimiter.reset_shared()
+
+
+def _completion(text: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))]
+    )
+
+
+def _rate_limit_error() -> RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers={"retry-after-ms": "10"}, request=request)
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+def test_openai_clients_share_one_connection_pool():
+    first = OpenAIClient(model="gpt-4o-mini")
+    second = OpenAIClient(model="gpt-4o", max_tokens=32)
+    separate_pool = OpenAIClient(max_connections=2)
+
+    assert first._client is second._client
+    assert separate_pool._client is not first._client
+
+
+def test_openai_client_generate_uses_request_params():
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return _completion("hello")
+
+    client = OpenAIClient(model="gpt-4o-mini", max_tokens=64)
+    client._client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+    assert client.generate("hi", temperature=0.1) == "hello"
+    assert calls[0]["model"] == "gpt-4o-mini"
+    assert calls[0]["max_tokens"] == 64
+    assert calls[0]["temperature"] == 0.1
+    assert calls[0]["messages"] == [{"content": "hi", "role": "user"}]
+
+
+def test_async_openai_client_generate_retries_rate_limits(monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr("aigen.client.openai.asyncio.sleep", fake_sleep)
+
+    attempts = []
+
+    async def create(**kwargs):
+        attempts.append(kwargs)
+        if len(attempts) == 1:
+            raise _rate_limit_error()
+        return _completion("async hello")
+
+    async def scenario():
+        client = AsyncOpenAIClient(model="gpt-4o-mini")
+        shared = client.client
+        assert AsyncOpenAIClient().client is shared
+        client._client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        )
+        text = await client.generate([{"role": "user", "content": "hi"}])
+        assert client.last_stats.retries == 1
+        return text
+
+    assert asyncio.run(scenario()) == "async hello"
+    assert len(attempts) == 2
+    # The retry waits out the pause shared by every client on this model.
+    assert sleeps == [pytest.approx(0.5, abs=0.05)]
+
+
+def test_openai_client_refunds_tokens_of_rate_limited_attempts(monkeypatch):
+    monkeypatch.setattr("aigen.client.openai.time.sleep", lambda seconds: None)
+    limiter = RateLimiter.shared("test-key", "gpt-4o-mini", tokens_per_minute=10000)
+    attempts = []
+
+    def create(**kwargs):
+        attempts.append(kwargs)
+        if len(attempts) < 3:
+            raise _rate_limit_error()
+        return _completion("hello")
+
+    client = OpenAIClient(model="gpt-4o-mini", max_tokens=1000)
+    client._client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+    assert client.generate("hi") == "hello"
+    assert len(attempts) == 3
+    # Only the attempt that went through holds a reservation.
+    tokens = client._estimated_tokens([{"role": "user", "content": "hi"}], attempts[0])
+    assert limiter._tokens.level == pytest.approx(10000 - tokens, abs=5)
+
+
+def test_openai_client_adapts_to_rate_limit_headers():
+    headers = {
+        "x-ratelimit-limit-requests": "60",
+        "x-ratelimit-remaining-requests": "59",
+        "x-ratelimit-limit-tokens": "100000",
+        "x-ratelimit-remaining-tokens": "50",
+    }
+
+    def create(**kwargs):
+        return SimpleNamespace(parse=lambda: _completion("hello"), headers=headers)
+
+    client = OpenAIClient(model="gpt-4o-mini", max_tokens=64)
+    client._client = SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(
+                with_raw_response=SimpleNamespace(create=create)
+            )
+        )
+    )
+
+    assert client.generate("hi") == "hello"
+    limiter = RateLimiter.shared("test-key", "gpt-4o-mini")
+    assert limiter.requests_per_minute == 60
+    assert limiter.tokens_per_minute == 100000
+    # Only 50 tokens are left, so the next prompt has to wait for a refill.
+    assert limiter.reserve(1000) > 0
+
+
+def test_openai_client_records_cached_prompt_tokens():
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        completion = _completion("hello")
+        completion.usage = SimpleNamespace(
+            prompt_tokens=2048,
+            completion_tokens=5,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1536),
+        )
+        return completion
+
+    client = OpenAIClient(model="gpt-4o-mini")
+    client._client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+    assert client.generate("hi", prompt_cache_key="article-v1") == "hello"
+    assert calls[0]["prompt_cache_key"] == "article-v1"
+    assert client.last_stats.cached_tokens == 1536
+    assert client.last_stats.cached_ratio == 0.75
+
+
+def test_openai_client_streams_deltas_and_records_stats():
+    def chunk(text=None, usage=None):
+        choices = (
+            []
+            if text is None
+            else [SimpleNamespace(delta=SimpleNamespace(content=text))]
+        )
+        return SimpleNamespace(choices=choices, usage=usage)
+
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return iter(
+            [
+                chunk(""),
+                chunk("Hel"),
+                chunk("lo"),
+                chunk(usage=SimpleNamespace(prompt_tokens=7, completion_tokens=2)),
+            ]
+        )
+
+    client = OpenAIClient(model="gpt-4o-mini")
+    client._client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    deltas = []
+
+    assert client.generate("hi", stream=True, on_delta=deltas.append) == "Hello"
+    assert deltas == ["Hel", "lo"]
+    assert calls[0]["stream"] is True
+    assert calls[0]["stream_options"] == {"include_usage": True}
+    stats = client.last_stats
+    assert stats.streamed
+    assert stats.ttft_seconds is not None
+    assert stats.ttft_seconds <= stats.latency_seconds
+    assert (stats.prompt_tokens, stats.completion_tokens) == (7, 2)
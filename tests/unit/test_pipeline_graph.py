@@ -0,0 +1,126 @@
+import threading
+from typing import Any
+
+import pytest
+
+from aigen.common.graph import PipelineGraph
+from aigen.common.pipeline import process_actions
+
+pytestmark = pytest.mark.unit
+
+
+class BarrierClient:
+    """Stub client whose calls only return once two of them run together."""
+
+    barrier: threading.Barrier | None = None
+
+    def __init__(self, model=None, max_tokens=None, **kwargs) -> None:
+        self.model = model
+
+    def generate(self, content, **kwargs):
+        if BarrierClient.barrier is not None:
+            BarrierClient.barrier.wait(timeout=5)
+        return "reply to " + content[-1]["content"][0]["text"]
+
+
+INSTRUCTIONS = [
+    {"node": "SetVariable", "params": {"name": "topic", "value": "mountains"}},
+    {
+        "node": "SetVariable",
+        "params": {"name": "prompt_a", "value": "Describe ${topic}"},
+    },
+    {
+        "node": "SetVariable",
+        "params": {"name": "prompt_b", "value": "Title for ${topic}"},
+    },
+    {
+        "node": "GPTChat",
+        "params": {
+            "prompt": [{"type": "text", "content": "prompt_a"}],
+            "output": "answer_a",
+        },
+    },
+    {
+        "node": "GPTChat",
+        "params": {
+            "prompt": [{"type": "text", "content": "prompt_b"}],
+            "output": "answer_b",
+        },
+    },
+    {
+        "node": "SetVariable",
+        "params": {"name": "combined", "value": "${answer_a} | ${answer_b}"},
+    },
+]
+
+
+def test_pipeline_graph_infers_independent_branches():
+    graph = PipelineGraph.build(INSTRUCTIONS)
+
+    requires = [set(step.requires) for step in graph.steps]
+    assert requires[3] == {1}
+    assert requires[4] == {2}
+    assert requires[5] == {3, 4}
+    assert graph.levels() == [1, 2, 2, 3, 3, 4]
+
+    path, seconds = graph.critical_path()
+    assert path[0] == 0 and path[-1] == 5
+    assert seconds > 0
+    assert "Critical path" in graph.describe()
+
+
+def test_pipeline_graph_respects_deferred_template_references():
+    instructions = [
+        {
+            "node": "SetVariable",
+            "params": {"name": "prompt", "value": "Use ${critique}"},
+        },
+        {"node": "SetVariable", "params": {"name": "critique", "value": "bold"}},
+        {
+            "node": "GPTChat",
+            "params": {
+                "prompt": [{"type": "text", "content": "prompt"}],
+                "output": "answer",
+            },
+        },
+        {"node": "SetVariable", "params": {"name": "critique", "value": "muted"}},
+    ]
+    graph = PipelineGraph.build(instructions)
+
+    assert set(graph.steps[1].requires) == {0}
+    assert set(graph.steps[2].requires) == {1}
+    # Overwriting a variable the GPT prompt renders must wait for the call.
+    assert set(graph.steps[3].requires) == {2}
+
+
+def test_process_actions_parallel_matches_sequential(monkeypatch):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", BarrierClient)
+
+    sequential: dict[str, Any] = {}
+    BarrierClient.barrier = None
+    process_actions(sequential, INSTRUCTIONS)
+
+    parallel: dict[str, Any] = {}
+    # Both GPT steps must be in flight at the same time to pass the barrier.
+    BarrierClient.barrier = threading.Barrier(2)
+    process_actions(parallel, INSTRUCTIONS, max_workers=4)
+    BarrierClient.barrier = None
+
+    assert parallel == sequential
+    assert parallel["combined"] == (
+        "reply to Describe mountains | reply to Title for mountains"
+    )
+
+
+def test_process_actions_parallel_raises_earliest_failure():
+    instructions = [
+        {"node": "CopyVariable", "params": {"input": "missing", "output": "x"}},
+        {"node": "SetVariable", "params": {"name": "ok", "value": "1"}},
+    ]
+    with pytest.raises(ValueError, match="missing"):
+        process_actions({}, instructions, max_workers=2)
+
+
+def test_pipeline_graph_rejects_unknown_nodes():
+    with pytest.raises(ValueError, match="not registered"):
+        PipelineGraph.build([{"node": "Nope"}])
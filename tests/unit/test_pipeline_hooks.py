@@ -0,0 +1,88 @@
+import pytest
+
+from aigen.common.hooks import NODE_FINISHED, NODE_STARTED, NodeEvent
+from aigen.common.llm_client import GenerationStats
+from aigen.common.pipeline import process_actions
+
+pytestmark = pytest.mark.unit
+
+
+class StatsClient:
+    def __init__(self, model=None, max_tokens=None, **kwargs) -> None:
+        self.last_stats = None
+
+    def generate(self, content, **kwargs):
+        self.last_stats = GenerationStats(
+            latency_seconds=0.25, prompt_tokens=12, completion_tokens=3
+        )
+        return "short answer"
+
+
+INSTRUCTIONS = [
+    {"node": "SetVariable", "params": {"name": "question", "value": "Why?"}},
+    {
+        "node": "GPTChat",
+        "params": {
+            "prompt": [{"type": "text", "content": "question"}],
+            "output": "answer",
+        },
+    },
+]
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_process_actions_reports_node_events(monkeypatch, max_workers):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", StatsClient)
+    events: list[NodeEvent] = []
+
+    process_actions({}, INSTRUCTIONS, max_workers=max_workers, hook=events.append)
+
+    assert [(event.type, event.index) for event in events] == [
+        (NODE_STARTED, 0),
+        (NODE_FINISHED, 0),
+        (NODE_STARTED, 1),
+        (NODE_FINISHED, 1),
+    ]
+    finished = events[-1]
+    assert finished.node_name == "GPTChat"
+    assert finished.ok is True
+    assert finished.duration_seconds >= 0
+    assert finished.output_bytes == len("short answer")
+    assert finished.metrics.llm_calls == 1
+    assert finished.metrics.prompt_tokens == 12
+    assert finished.metrics.completion_tokens == 3
+    assert events[1].metrics.llm_calls == 0
+
+
+def test_process_actions_reports_failed_node():
+    events: list[NodeEvent] = []
+
+    with pytest.raises(ValueError):
+        process_actions(
+            {},
+            [{"node": "CopyVariable", "params": {"input": "nope", "output": "x"}}],
+            hook=events.append,
+        )
+
+    assert [event.type for event in events] == [NODE_STARTED, NODE_FINISHED]
+    assert events[-1].ok is False
+    assert "nope" in events[-1].error
+    assert events[-1].to_dict()["metrics"]["llm_calls"] == 0
+
+
+def test_process_actions_attaches_printed_output_to_events(capsys):
+    events: list[NodeEvent] = []
+
+    process_actions(
+        {},
+        [
+            {"node": "SetVariable", "params": {"name": "title", "value": "Hello"}},
+            {"node": "PrintVariable", "params": {"input": "title"}},
+        ],
+        hook=events.append,
+    )
+
+    assert events[1].output is None
+    assert events[-1].output == "Print variable: title=Hello"
+    # The node still prints for runs without a hook.
+    assert "title" in capsys.readouterr().out
@@ -0,0 +1,86 @@
+import pytest
+
+from aigen.client.rate_limiter import RateLimiter, TokenBucket
+from aigen.common.tokens import estimate_message_tokens
+
+pytestmark = pytest.mark.unit
+
+
+def test_token_bucket_spaces_out_reservations():
+    bucket = TokenBucket(limit=60)
+
+    assert bucket.reserve(60, now=0.0) == 0.0
+    # One request per second refills; the next two queue behind each other.
+    assert bucket.reserve(1, now=0.0) == pytest.approx(1.0)
+    assert bucket.reserve(1, now=0.0) == pytest.approx(2.0)
+    assert bucket.reserve(1, now=10.0) == 0.0
+
+
+def test_token_bucket_without_limit_never_waits():
+    bucket = TokenBucket()
+
+    assert bucket.reserve(10**9, now=0.0) == 0.0
+
+
+def test_token_bucket_refund_restores_an_unused_reservation():
+    bucket = TokenBucket(limit=60)
+
+    bucket.reserve(60, now=0.0)
+    bucket.refund(60, now=0.0)
+
+    assert bucket.level == pytest.approx(60)
+    assert bucket.reserve(1, now=0.0) == 0.0
+    # A refund never lifts the level above the limit.
+    bucket.refund(100, now=0.0)
+    assert bucket.level == pytest.approx(60)
+
+
+def test_rate_limiter_learns_limits_from_headers():
+    limiter = RateLimiter(tokens_per_minute=1000)
+    assert limiter.reserve(10) == 0.0
+
+    limiter.update_from_headers(
+        {
+            "x-ratelimit-limit-requests": "500",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-limit-tokens": "30000",
+            "x-ratelimit-remaining-tokens": "29000",
+        }
+    )
+
+    assert limiter.requests_per_minute == 500
+    # The configured limit is lower than the account limit and wins.
+    assert limiter.tokens_per_minute == 1000
+    assert limiter.reserve(10) == pytest.approx(60 / 500, abs=0.01)
+
+
+def test_rate_limiter_pause_holds_back_all_callers():
+    limiter = RateLimiter()
+    limiter.pause(2.0)
+
+    assert limiter.reserve(1) == pytest.approx(2.0, abs=0.05)
+    assert limiter.reserve(1) == pytest.approx(2.0, abs=0.05)
+
+
+def test_rate_limiter_is_shared_per_key_and_model():
+    RateLimiter.reset_shared()
+    first = RateLimiter.shared("key", "gpt-4o")
+    assert RateLimiter.shared("key", "gpt-4o") is first
+    assert RateLimiter.shared("key", "gpt-4o-mini") is not first
+    RateLimiter.reset_shared()
+
+
+def test_estimate_message_tokens_counts_text_and_images():
+    messages = [
+        {"role": "system", "content": "x" * 40},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "y" * 8},
+                {"type": "image_url", "image_url": {"url": "", "detail": "low"}},
+                {"type": "image_url", "image_url": {"url": "", "detail": "high"}},
+            ],
+        },
+    ]
+
+    assert estimate_message_tokens(messages) == 3 + (4 + 10) + (4 + 2 + 85 + 765)
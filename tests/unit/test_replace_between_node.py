@@ -1,4 +1,5 @@
 import pytest
+from structlog.testing import capture_logs
 
 from aigen.nodes.replace_between import ReplaceBetweenNode
 
@@ -27,6 +28,25 @@ def test_replace_between_node():
     assert "old" not in context["rendered"]
 
 
+def test_replace_between_node_logs_single_section_markers():
+    context = {"template": "<!--A-->\nold\n<!--/A-->", "block": "new"}
+    node = ReplaceBetweenNode(
+        params={
+            "input": "template",
+            "start_marker": "<!--A-->",
+            "end_marker": "<!--/A-->",
+            "replacement": "block",
+        }
+    )
+
+    with capture_logs() as logs:
+        node.run(context)
+
+    assert logs[-1]["event"] == "Replaced template section"
+    assert logs[-1]["start_marker"] == "<!--A-->"
+    assert logs[-1]["end_marker"] == "<!--/A-->"
+
+
 def test_replace_between_node_preserves_marker_indent():
     context = {
         "template": (
@@ -68,3 +88,96 @@ def test_replace_between_node_errors_on_missing_markers():
 
     with pytest.raises(ValueError):
         node.run(context)
+
+
+def test_replace_between_node_fills_sections_in_one_pass():
+    context = {
+        "template": (
+            "<head><!--T-->x<!--/T--></head>\n"
+            "  <!--BODY-->\n  old\n  <!--/BODY-->\n"
+            "<!--T_EXTRA-->y<!--/T_EXTRA-->"
+        ),
+        "title": "Dusk",
+        "body": "<p>One</p>\n<p>Two</p>",
+    }
+    node = ReplaceBetweenNode(
+        params={
+            "input": "template",
+            "output": "rendered",
+            "sections": [
+                {
+                    "start_marker": "<!--BODY-->",
+                    "end_marker": "<!--/BODY-->",
+                    "replacement": "body",
+                },
+                {
+                    "start_marker": "<!--T-->",
+                    "end_marker": "<!--/T-->",
+                    "replacement": "title",
+                },
+                {
+                    "start_marker": "<!--T_EXTRA-->",
+                    "end_marker": "<!--/T_EXTRA-->",
+                    "replacement": "raw",
+                },
+            ],
+        }
+    )
+
+    node.run(context)
+
+    assert context["rendered"] == (
+        "<head><!--T-->\nDusk\n<!--/T--></head>\n"
+        "  <!--BODY-->\n  <p>One</p>\n  <p>Two</p>\n<!--/BODY-->\n"
+        "<!--T_EXTRA-->\nraw\n<!--/T_EXTRA-->"
+    )
+    assert {"template", "title", "body", "raw"} <= ReplaceBetweenNode.dependencies(
+        node.params
+    ).reads
+
+
+def test_replace_between_node_reports_all_missing_markers():
+    context = {"template": "<!--A-->\n<!--/A-->\n<!--B-->"}
+    node = ReplaceBetweenNode(
+        params={
+            "input": "template",
+            "sections": [
+                {
+                    "start_marker": "<!--A-->",
+                    "end_marker": "<!--/A-->",
+                    "replacement": "a",
+                },
+                {
+                    "start_marker": "<!--B-->",
+                    "end_marker": "<!--/B-->",
+                    "replacement": "b",
+                },
+                {
+                    "start_marker": "<!--C-->",
+                    "end_marker": "<!--/C-->",
+                    "replacement": "c",
+                },
+            ],
+        }
+    )
+
+    with pytest.raises(ValueError) as error:
+        node.run(context)
+
+    assert str(error.value) == (
+        "start_marker not found: <!--C-->; end_marker not found: <!--/B-->"
+    )
+    assert context["template"] == "<!--A-->\n<!--/A-->\n<!--B-->"
+
+
+def test_replace_between_node_rejects_malformed_sections():
+    context = {"template": "<!--A--><!--/A-->"}
+
+    with pytest.raises(TypeError, match="Each section must be a mapping"):
+        ReplaceBetweenNode(
+            params={"input": "template", "output": "out", "sections": ["A"]}
+        ).run(context)
+    with pytest.raises(ValueError, match="non-empty list"):
+        ReplaceBetweenNode(
+            params={"input": "template", "output": "out", "sections": []}
+        ).run(context)
@@ -0,0 +1,83 @@
+import os
+import time
+
+import pytest
+
+from aigen.common.response_cache import ResponseCache
+from aigen.models import CacheMode
+
+pytestmark = pytest.mark.unit
+
+
+def test_response_cache_key_ignores_dict_order():
+    first = ResponseCache.make_key({"model": "gpt-4o", "max_tokens": 10})
+    second = ResponseCache.make_key({"max_tokens": 10, "model": "gpt-4o"})
+    other = ResponseCache.make_key({"max_tokens": 11, "model": "gpt-4o"})
+
+    assert first == second
+    assert first != other
+
+
+def test_response_cache_round_trip_and_hit_rate(tmp_path):
+    cache = ResponseCache(tmp_path)
+    key = ResponseCache.make_key({"prompt": "hello"})
+
+    assert cache.get(key) is None
+    cache.put(key, "cached answer")
+    assert cache.get(key) == "cached answer"
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.hit_rate == 0.5
+
+
+@pytest.mark.parametrize("content", ['["not", "an", "entry"]', "{truncated"])
+def test_response_cache_treats_corrupt_entries_as_misses(tmp_path, content):
+    cache = ResponseCache(tmp_path)
+    key = ResponseCache.make_key({"prompt": "corrupt"})
+    path = cache._entry_path(key)
+    path.parent.mkdir(parents=True)
+    path.write_text(content, encoding="utf-8")
+
+    assert cache.get(key) is None
+    assert cache.misses == 1
+    assert not path.exists()
+
+
+def test_response_cache_expires_entries_after_ttl(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path, ttl_seconds=60)
+    key = ResponseCache.make_key({"prompt": "old"})
+    cache.put(key, "stale")
+
+    later = time.time() + 120
+    monkeypatch.setattr("aigen.common.response_cache.time.time", lambda: later)
+
+    assert cache.get(key) is None
+    assert not any(tmp_path.glob("*/*.json"))
+
+
+def test_response_cache_evicts_least_recently_used_over_size(tmp_path):
+    keys = [ResponseCache.make_key({"n": n}) for n in range(3)]
+    probe = ResponseCache(tmp_path / "probe")
+    probe.put(keys[0], "x" * 60)
+    entry_size = probe._entry_path(keys[0]).stat().st_size
+
+    cache = ResponseCache(tmp_path / "cache", max_bytes=entry_size * 3 + 10)
+    for age, key in enumerate(keys):
+        cache.put(key, "x" * 60)
+        stamp = time.time() - 100 + age
+        os.utime(cache._entry_path(key), (stamp, stamp))
+
+    cache.get(keys[0])
+    cache.put(ResponseCache.make_key({"n": 3}), "x" * 60)
+
+    assert cache.get(keys[0]) == "x" * 60
+    assert cache.get(keys[1]) is None
+
+
+def test_cache_mode_accepts_yaml_booleans():
+    assert CacheMode.get(False) == CacheMode.OFF
+    assert CacheMode.get(True) == CacheMode.READ
+    assert CacheMode.get("Write") == CacheMode.WRITE
+    assert CacheMode.get(None) == CacheMode.OFF
+    with pytest.raises(ValueError):
+        CacheMode.get("sometimes")
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from aigen.common.llm_client import GenerationStats
+from aigen.common.pipeline import process_actions
+from aigen.common.telemetry import RunReport, percentile
+
+pytestmark = pytest.mark.unit
+
+
+class StatsClient:
+    def __init__(self, model=None, max_tokens=None, **kwargs) -> None:
+        self.last_stats = None
+
+    def generate(self, content, **kwargs):
+        self.last_stats = GenerationStats(
+            latency_seconds=0.5,
+            prompt_tokens=100,
+            completion_tokens=10,
+            cached_tokens=64,
+            retries=1,
+        )
+        return "answer"
+
+
+def test_percentile_interpolates():
+    assert percentile([], 50) is None
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile(list(range(101)), 95) == 95
+
+
+def test_run_report_aggregates_nodes_and_articles(monkeypatch, tmp_path):
+    monkeypatch.setattr("aigen.nodes.gpt_chat.OpenAIClient", StatsClient)
+    source = tmp_path / "source.txt"
+    source.write_text("hello", encoding="utf-8")
+    instructions = [
+        {"node": "ReadFile", "params": {"filepath": str(source), "output": "text"}},
+        {
+            "node": "GPTChat",
+            "params": {
+                "prompt": [{"type": "text", "content": "text"}],
+                "output": "answer",
+            },
+        },
+    ]
+    report = RunReport()
+
+    for article in (1, 2):
+        process_actions({}, instructions, hook=report.hook(article))
+
+    summary = report.summary()
+    gpt = summary["nodes"]["GPTChat"]
+    assert gpt["runs"] == 2
+    assert gpt["llm_calls"] == 2
+    assert gpt["llm_retries"] == 2
+    assert gpt["cached_tokens"] == 128
+    assert gpt["llm_seconds"]["p95"] == 0.5
+    assert summary["nodes"]["ReadFile"]["bytes_read"] == 10
+    assert [article["article"] for article in summary["articles"]] == [1, 2]
+    assert summary["articles"][0]["prompt_tokens"] == 100
+
+    table = report.format_table()
+    assert table.splitlines()[0].startswith("node")
+    assert any(line.startswith("GPTChat") for line in table.splitlines())
+
+    report.write_json(tmp_path / "report.json")
+    assert json.loads((tmp_path / "report.json").read_text())["nodes"].keys() == {
+        "ReadFile",
+        "GPTChat",
+    }
+
+    metrics = report.to_prometheus()
+    assert 'aigen_node_runs_total{node="GPTChat",status="ok"} 2' in metrics
+    assert 'aigen_node_llm_seconds{node="GPTChat",quantile="0.95"} 0.5' in metrics
+    assert 'aigen_cached_tokens_total{node="GPTChat"} 128' in metrics
+    assert "# TYPE aigen_node_duration_seconds summary" in metrics
@@ -0,0 +1,110 @@
+import json
+
+import httpx
+import pytest
+
+from aigen.client.openai import OpenAIClient, reset_shared_clients
+from aigen.client.rate_limiter import RateLimiter
+from aigen.client.stub_server import LatencyModel, StubOpenAIServer, StubServerConfig
+from aigen.common.json_schema import json_schema_format, validate_json
+from aigen.config import AigenConfig
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    servers = []
+
+    def start(config: StubServerConfig) -> OpenAIClient:
+        server = StubOpenAIServer(config).start()
+        servers.append(server)
+        monkeypatch.setattr(
+            OpenAIClient,
+            "_config",
+            AigenConfig(OPENAI_API_KEY="stub", OPENAI_BASE_URL=server.url),
+        )
+        reset_shared_clients()
+        RateLimiter.reset_shared()
+        return OpenAIClient(model="gpt-4o-mini", max_tokens=32)
+
+    yield start
+    for server in servers:
+        server.stop()
+    reset_shared_clients()
+    RateLimiter.reset_shared()
+
+
+def test_latency_model_parses_specs():
+    assert LatencyModel("fixed:0.25").sample() == 0.25
+    assert 0.1 <= LatencyModel("uniform:0.1,0.2", seed=1).sample() <= 0.2
+    assert LatencyModel("lognormal:0.1,0.5", seed=1).sample() > 0
+    with pytest.raises(ValueError):
+        LatencyModel("uniform:1")
+
+
+def test_stub_server_returns_canned_and_deterministic_replies(stub_client):
+    client = stub_client(StubServerConfig(responses={"ping": "pong"}))
+
+    assert client.generate("please ping") == "pong"
+    first = client.generate("write something")
+    assert first == client.generate("write something")
+    assert client.last_stats.prompt_tokens > 0
+    assert client.last_stats.cached_tokens == 0
+
+
+def test_stub_server_streams_chunks_with_usage(stub_client):
+    client = stub_client(StubServerConfig(reply_tokens=5))
+    deltas = []
+
+    text = client.generate("hello", stream=True, on_delta=deltas.append)
+
+    assert text == "".join(deltas)
+    assert len(text.split()) == 5
+    assert client.last_stats.streamed
+    assert client.last_stats.completion_tokens
+
+
+def test_stub_server_rejects_over_limit_with_retry_after(stub_client):
+    client = stub_client(StubServerConfig(requests_per_minute=1))
+    client.generate("first")
+
+    response = httpx.post(
+        f"{client._client.base_url}chat/completions",
+        json={"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "x"}]},
+    )
+
+    assert response.status_code == 429
+    assert int(response.headers["retry-after-ms"]) > 0
+    assert response.headers["x-ratelimit-limit-requests"] == "1"
+    assert response.json()["error"]["code"] == "rate_limit_exceeded"
+
+
+def test_stub_server_injects_error_bursts(stub_client):
+    client = stub_client(StubServerConfig(error_every=3, error_burst=2))
+    url = f"{client._client.base_url}chat/completions"
+    body = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "x"}]}
+
+    statuses = [httpx.post(url, json=body).status_code for _ in range(6)]
+
+    assert statuses == [200, 503, 503, 200, 503, 503]
+
+
+def test_stub_server_fills_json_schema_response_format(stub_client):
+    client = stub_client(StubServerConfig())
+    schema = {
+        "type": "object",
+        "properties": {
+            "title": {"type": "string"},
+            "mood": {"type": "string", "enum": ["calm", "bold"]},
+            "scores": {"type": "array", "items": {"type": "integer"}},
+        },
+        "required": ["title", "mood", "scores"],
+        "additionalProperties": False,
+    }
+
+    text = client.generate(
+        "meta", response_format=json_schema_format(schema, name="meta")
+    )
+
+    validate_json(json.loads(text), schema)
@@ -1,8 +1,12 @@
 import csv
+from pathlib import Path
 
 import pytest
 
-from aigen.article.csv_context import read_article_contexts_from_csv
+from aigen.article.csv_context import (
+    iter_article_contexts_from_csv,
+    read_article_contexts_from_csv,
+)
 
 pytestmark = pytest.mark.unit
 
@@ -352,3 +356,60 @@ def test_read_article_contexts_from_csv_with_prompt_step_1(tmp_path):
         contexts[0]["prompt_step_1"]
         == "Describe these works in exactly three sentences."
     )
+
+
+def test_iter_article_contexts_from_csv_is_lazy(tmp_path):
+    csv_path = tmp_path / "articles.csv"
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["Article"])
+        writer.writeheader()
+        for index in range(3):
+            writer.writerow({"Article": str(tmp_path / f"article-{index:03d}")})
+
+    contexts = iter_article_contexts_from_csv(str(csv_path))
+    assert next(contexts)["article_name"] == "article-000"
+    assert [context["article_name"] for context in contexts] == [
+        "article-001",
+        "article-002",
+    ]
+    assert read_article_contexts_from_csv(str(csv_path))[0]["article_name"] == (
+        "article-000"
+    )
+
+
+def test_iter_article_contexts_from_csv_reports_missing_csv_eagerly(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        iter_article_contexts_from_csv(str(tmp_path / "missing.csv"))
+
+
+def test_iter_article_contexts_from_csv_resolves_shared_paths_once(
+    tmp_path, monkeypatch
+):
+    template = tmp_path / "template.html"
+    template.write_text("<html></html>", encoding="utf-8")
+    csv_path = tmp_path / "articles.csv"
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["Article", "Template"])
+        writer.writeheader()
+        for index in range(50):
+            writer.writerow(
+                {
+                    "Article": str(tmp_path / f"article-{index:03d}"),
+                    "Template": str(template),
+                }
+            )
+
+    expected = str(template.resolve())
+    calls = []
+    original_resolve = Path.resolve
+
+    def counting_resolve(self, *args, **kwargs):
+        calls.append(self)
+        return original_resolve(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "resolve", counting_resolve)
+    contexts = list(iter_article_contexts_from_csv(str(csv_path)))
+
+    assert len(contexts) == 50
+    assert {context["template_path"] for context in contexts} == {expected}
+    assert calls.count(template) == 1
@@ -0,0 +1,76 @@
+import json
+import re
+
+import pytest
+
+from aigen.common.utils import (
+    MAX_CACHED_TEMPLATE_CHARS,
+    compile_template,
+    find_vars,
+    replace_vars,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def legacy_replace_vars(template, params, pattern=r"\$\{(\w+)\}"):
+    def repl(match):
+        if match.group(1) not in params:
+            return match.group(0)
+        value = params[match.group(1)]
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False)
+        return str(value)
+
+    return re.sub(pattern, repl, template)
+
+
+PARAMS = {
+    "name": "world",
+    "count": 3,
+    "items": ["a", "ü"],
+    "meta": {"k": "v"},
+    "empty": "",
+}
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "",
+        "plain text",
+        "${name}",
+        "Hello ${name}!",
+        "${name}${count}${missing}",
+        "list=${items} dict=${meta} ${empty}.",
+        "$name ${ name } ${na-me} $${name}} ${",
+        "multi\nline ${name}\n${missing}\n",
+    ],
+)
+def test_replace_vars_matches_regex_implementation(template):
+    assert replace_vars(template, PARAMS) == legacy_replace_vars(template, PARAMS)
+    assert find_vars(template) == re.findall(r"\$\{(\w+)\}", template)
+
+
+def test_replace_vars_supports_custom_pattern():
+    template = "Hi {{name}} and ${name}"
+    pattern = r"\{\{(\w+)\}\}"
+    assert replace_vars(template, PARAMS, pattern) == "Hi world and ${name}"
+
+
+def test_compile_template_is_cached_except_for_large_templates():
+    assert compile_template("cached ${name}") is compile_template("cached ${name}")
+
+    large = "x" * (MAX_CACHED_TEMPLATE_CHARS + 1) + "${name}"
+    assert compile_template(large) is not compile_template(large)
+    assert replace_vars(large, PARAMS).endswith("world")
+
+
+def test_replace_vars_json_cache_serializes_each_value_once():
+    json_cache: dict[int, str] = {}
+    first = replace_vars("${items}", PARAMS, json_cache=json_cache)
+    second = replace_vars("again ${items}", PARAMS, json_cache=json_cache)
+
+    assert first == '["a", "ü"]'
+    assert second == 'again ["a", "ü"]'
+    assert json_cache == {id(PARAMS["items"]): first}